@@ -0,0 +1,160 @@
+"""
+analyze.py
+Batch analysis without a window. FEN or EPD lines stream in from a file or
+stdin, are analysed in batches on a process pool, and come out as JSON lines
+in input order. Only a fixed number of batches is ever in flight, so memory
+stays flat however long the input is.
+
+Each result has the legal move count and check/checkmate/stalemate status,
+plus the search's best move, score and PV when --depth or --movetime is given.
+
+python -m Engine.analyze [positions.epd | -] [--workers N] [--batch-size N] [--depth D] [--movetime MS]
+                         [--backend board|bitboard] [--output results.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+# pygame prints a banner to stdout on import, which would corrupt the JSON lines.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from Engine.backends import create_board, BACKENDS
+from Engine.fen_utils import move_to_uci, validate_fen
+from Engine.search import Search, MAX_DEPTH
+from Engine.transposition import TranspositionTable
+
+# One board and transposition table per worker process, reused for every position it is sent.
+worker_boards = {}
+worker_tables = {}
+
+def parse_line(line):
+    """
+    '<fen>' or '<epd position> <operations>' -> (fen, id). EPD positions
+    have no move counters; the id operation, if any, is kept for the output.
+    """
+    fields = line.split()
+    if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+        return ' '.join(fields[:6]), None
+    operations = ' '.join(fields[4:])
+    position_id = None
+    if 'id "' in operations:
+        position_id = operations.split('id "', 1)[1].split('"', 1)[0]
+    return ' '.join(fields[:4]), position_id
+
+def read_positions(stream):
+    """Yields (line number, fen, id) for every position line, skipping blanks and # comments."""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fen, position_id = parse_line(line)
+        yield number, fen, position_id
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def analyze_position(board, number, fen, position_id=None, depth=None, movetime=None, table=None):
+    result = {"line": number, "fen": fen}
+    if position_id is not None:
+        result["id"] = position_id
+    try:
+        validate_fen(fen)
+        board.setup_board(fen, assign=False)
+        moves = board.generate_moves()
+        check = board.in_check(board.turn)
+        result.update({
+            "turn": board.turn,
+            "legal_moves": len(moves),
+            "check": check,
+            "checkmate": check and not moves,
+            "stalemate": not check and not moves,
+        })
+        if (depth or movetime) and moves:
+            search = Search(board, table).search(max_depth=depth or MAX_DEPTH, time_limit=movetime / 1000 if movetime else None)
+            result["search"] = {
+                "bestmove": move_to_uci(*search.best_move),
+                "score": search.score,
+                "mate": search.mate_in,
+                "depth": search.depth,
+                "nodes": search.nodes,
+                "pv": [move_to_uci(*move) for move in search.pv],
+            }
+    except Exception as error:
+        # A malformed line is reported in place rather than stopping the whole run.
+        result["error"] = f"{type(error).__name__}: {error}"
+    return result
+
+def analyze_batch(batch, backend="board", depth=None, movetime=None):
+    """Worker: analyses a list of (line number, fen, id) on this process's board."""
+    if backend not in worker_boards:
+        worker_boards[backend] = create_board(backend=backend)
+    board = worker_boards[backend]
+    table = None
+    if depth or movetime:
+        if backend not in worker_tables:
+            worker_tables[backend] = TranspositionTable(16)
+        table = worker_tables[backend]
+    return [analyze_position(board, number, fen, position_id, depth, movetime, table) for number, fen, position_id in batch]
+
+def analyze_stream(lines, workers=None, batch_size=64, backend="board", depth=None, movetime=None):
+    """
+    Yields one result dict per position in lines, in input order. With
+    workers=1 everything runs in this process; otherwise at most two batches
+    per worker are queued ahead of the one being yielded.
+    """
+    batches = batched(read_positions(lines), batch_size)
+    if workers == 1:
+        for batch in batches:
+            yield from analyze_batch(batch, backend, depth, movetime)
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(analyze_batch, batch, backend, depth, movetime))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse FEN/EPD positions in bulk and write JSON lines.")
+    parser.add_argument("input", nargs="?", default="-", help="FEN/EPD file, or - for stdin")
+    parser.add_argument("--output", default="-", help="JSON lines file, or - for stdout")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--backend", choices=BACKENDS, default="board")
+    parser.add_argument("--depth", type=int, default=None, help="also search each position to this depth")
+    parser.add_argument("--movetime", type=int, default=None, help="also search each position for this many ms")
+    args = parser.parse_args(argv)
+    if (args.depth or args.movetime) and args.backend != "board":
+        parser.error("searching needs the board backend")
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    start_time = time.perf_counter()
+    count = 0
+    try:
+        for result in analyze_stream(source, args.workers, args.batch_size, args.backend, args.depth, args.movetime):
+            sink.write(json.dumps(result) + "\n")
+            count += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start_time
+    print(f"{count} positions in {elapsed:.2f}s ({count / elapsed if elapsed else 0:,.0f} positions/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
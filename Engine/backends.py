@@ -0,0 +1,19 @@
+"""
+backends.py
+Builds a position from FEN on either backend. Both answer the same calls
+(setup_board, generate_fen, assign_moves, get_legal_moves, in_check,
+in_checkmate, make_move/unmake_move, perft), so analysis code and tests can
+switch between them with one argument.
+"""
+from Engine.board import Board
+from Engine.bitboard import BitboardBoard
+from Engine.constants import DEFAULT_CONFIG
+
+BACKENDS = ("board", "bitboard")
+
+def create_board(config=DEFAULT_CONFIG, backend="board"):
+    if backend == "board":
+        return Board(600, 600, config=config, headless=True)
+    if backend == "bitboard":
+        return BitboardBoard(config)
+    raise ValueError(f"Unknown backend: {backend}")
@@ -0,0 +1,341 @@
+"""
+batch.py
+Move counts and attack maps for many positions at once, for dataset work.
+load_fens packs N positions into NumPy uint64 bitboards (one array per color
+and piece type, one entry per position), and every step after that is a
+whole-array operation: shifts for pawns, knights and kings, Kogge-Stone
+occluded fills for sliders. No Python loop runs per position or per piece.
+
+count_moves gives, per position, the squares the side to move attacks and is
+attacked on, whether it is in check and by how many pieces, its pseudo-legal
+move count (what Piece.get_moves returns) and its legal move count (what
+assign_moves keeps). Promotions count once per piece choice, as in
+generate_moves. Legality uses the same check and pin masks as assign_moves;
+en passant is played out on the bitboards, as leaves_king_safe does.
+
+Bit y * 8 + x is square (x, y), with y == 0 on rank 8, as in Engine/bitboard.py.
+
+    from Engine.batch import load_fens, count_moves
+    counts = count_moves(load_fens(fens))
+    counts.legal_moves, counts.in_check, counts.attacked
+"""
+try:
+    import numpy as np
+except ImportError:  # only batch analysis needs numpy
+    np = None
+from Engine.constants import key
+from Engine.mailbox import TYPE_CODES
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+# FEN letter -> (color, type index)
+FEN_PIECES = {}
+for letter, type_name in key.items():
+    FEN_PIECES[letter] = (WHITE, TYPE_CODES[type_name] - 1)
+    FEN_PIECES[letter.lower()] = (BLACK, TYPE_CODES[type_name] - 1)
+CASTLING_BITS = {'K': 1, 'Q': 2, 'k': 4, 'q': 8}
+# Every castling field in standard order -> its bits
+CASTLING_FIELDS = {''.join(letter for letter in "KQkq" if rights & CASTLING_BITS[letter]) or '-': rights for rights in range(16)}
+# En passant field -> bitboard
+EN_PASSANT_BITS = {'-': 0}
+for y in range(8):
+    for x in range(8):
+        EN_PASSANT_BITS[f"{chr(ord('a') + x)}{8 - y}"] = 1 << (y * 8 + x)
+
+if np is not None:
+    U64 = np.uint64
+    ALL = U64(0xFFFFFFFFFFFFFFFF)
+    ZERO = U64(0)
+    FILE_A = U64(0x0101010101010101)
+    NOT_A = ~FILE_A
+    NOT_H = ~U64(0x8080808080808080)
+    NOT_AB = ~U64(0x0303030303030303)
+    NOT_GH = ~U64(0xC0C0C0C0C0C0C0C0)
+    # (square offset, mask of squares a step in that direction can land on)
+    EAST, WEST, SOUTH, NORTH = (1, NOT_A), (-1, NOT_H), (8, ALL), (-8, ALL)
+    SOUTH_EAST, SOUTH_WEST, NORTH_EAST, NORTH_WEST = (9, NOT_A), (7, NOT_H), (-7, NOT_A), (-9, NOT_H)
+    ORTHOGONAL = (EAST, WEST, SOUTH, NORTH)
+    DIAGONAL = (SOUTH_EAST, SOUTH_WEST, NORTH_EAST, NORTH_WEST)
+    OPPOSITE = {EAST: WEST, WEST: EAST, SOUTH: NORTH, NORTH: SOUTH, SOUTH_EAST: NORTH_WEST, NORTH_WEST: SOUTH_EAST,
+                SOUTH_WEST: NORTH_EAST, NORTH_EAST: SOUTH_WEST}
+    KNIGHT_JUMPS = ((17, NOT_A), (15, NOT_H), (10, NOT_AB), (6, NOT_GH), (-6, NOT_AB), (-10, NOT_GH), (-15, NOT_A), (-17, NOT_H))
+    KING_STEPS = ORTHOGONAL + DIAGONAL
+    # Squares each placement character covers: a piece one, a digit that many, '/' none
+    SQUARE_WIDTHS = np.zeros(256, dtype=np.int64)
+    for letter in FEN_PIECES:
+        SQUARE_WIDTHS[ord(letter)] = 1
+    for n in range(1, 9):
+        SQUARE_WIDTHS[ord(str(n))] = n
+    # Per color: forward offset, pawn capture steps, rank a single push from the start lands on, last rank
+    PAWN_FORWARD = (-8, 8)
+    PAWN_CAPTURES = ((NORTH_WEST, NORTH_EAST), (SOUTH_WEST, SOUTH_EAST))
+    PUSH_RANK = (U64(0xFF << 40), U64(0xFF << 16))
+    LAST_RANK = (U64(0xFF), U64(0xFF << 56))
+    # Per color: (right bit, king square, rook square, squares that must be empty, squares the king crosses and lands on)
+    CASTLES = (
+        ((1, 60, 63, (61, 62), (61, 62)), (2, 60, 56, (57, 58, 59), (59, 58))),
+        ((4, 4, 7, (5, 6), (5, 6)), (8, 4, 0, (1, 2, 3), (3, 2))),
+    )
+
+def require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for batch move generation")
+
+def bit(sq):
+    return U64(1 << sq)
+
+def shift(bb, offset):
+    return bb << U64(offset) if offset > 0 else bb >> U64(-offset)
+
+def step(bb, direction):
+    offset, mask = direction
+    return shift(bb, offset) & mask
+
+def ray(gen, empty, direction):
+    """Squares the pieces in gen slide to along direction, up to and including the first occupied one."""
+    offset, mask = direction
+    propagate = empty & mask
+    gen = gen | (propagate & shift(gen, offset))
+    propagate = propagate & shift(propagate, offset)
+    gen = gen | (propagate & shift(gen, 2 * offset))
+    propagate = propagate & shift(propagate, 2 * offset)
+    gen = gen | (propagate & shift(gen, 4 * offset))
+    return shift(gen, offset) & mask
+
+def popcount(bb):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bb).astype(np.int64)
+    bb = bb - ((bb >> U64(1)) & U64(0x5555555555555555))
+    bb = (bb & U64(0x3333333333333333)) + ((bb >> U64(2)) & U64(0x3333333333333333))
+    bb = (bb + (bb >> U64(4))) & U64(0x0F0F0F0F0F0F0F0F)
+    return ((bb * U64(0x0101010101010101)) >> U64(56)).astype(np.int64)
+
+def pawn_attacks(color, pawns):
+    west, east = PAWN_CAPTURES[color]
+    return step(pawns, west) | step(pawns, east)
+
+def knight_attacks(knights):
+    attacks = np.zeros_like(knights)
+    for jump in KNIGHT_JUMPS:
+        attacks |= step(knights, jump)
+    return attacks
+
+def king_attacks(kings):
+    attacks = np.zeros_like(kings)
+    for direction in KING_STEPS:
+        attacks |= step(kings, direction)
+    return attacks
+
+def attacks_by(pieces, color, occupied):
+    """Every square color attacks or defends; pieces[color][type] are the bitboards."""
+    own = pieces[color]
+    empty = ~occupied
+    attacks = pawn_attacks(color, own[PAWN]) | knight_attacks(own[KNIGHT]) | king_attacks(own[KING])
+    rooks = own[ROOK] | own[QUEEN]
+    bishops = own[BISHOP] | own[QUEEN]
+    for direction in ORTHOGONAL:
+        attacks |= ray(rooks, empty, direction)
+    for direction in DIAGONAL:
+        attacks |= ray(bishops, empty, direction)
+    return attacks
+
+class PositionBatch:
+    """
+    N positions as bitboards: pieces has shape (2, 6, N), indexed by color
+    then type (pawn, knight, bishop, rook, queen, king). castling uses
+    Board.castling's KQkq bits; en_passant is a bitboard, 0 for none.
+    """
+    def __init__(self, pieces, turn, castling, en_passant):
+        self.pieces = pieces
+        self.turn = turn
+        self.castling = castling
+        self.en_passant = en_passant
+
+    def __len__(self):
+        return len(self.turn)
+
+    def occupancy(self, color=None):
+        if color is None:
+            return self.occupancy(WHITE) | self.occupancy(BLACK)
+        return np.bitwise_or.reduce(self.pieces[color], axis=0)
+
+def load_fens(fens):
+    """Packs FEN or EPD strings into a PositionBatch; castling rights without their king and rook are dropped."""
+    require_numpy()
+    placements = []
+    turns = []
+    castlings = []
+    passants = []
+    for fen in fens:
+        placement, active_color, castling_fen, en_passant_fen = fen.split()[:4]
+        placements.append(placement)
+        turns.append(active_color == 'b')
+        rights = CASTLING_FIELDS.get(castling_fen)
+        castlings.append(rights if rights is not None else sum(CASTLING_BITS.get(letter, 0) for letter in castling_fen))
+        passants.append(EN_PASSANT_BITS[en_passant_fen])
+    # All placements at once: each digit is repeated into that many empty squares and '/' dropped,
+    # leaving one row of 64 square letters per position.
+    raw = np.frombuffer(''.join(placements).encode("ascii"), dtype=np.uint8)
+    widths = SQUARE_WIDTHS[raw]
+    lengths = np.fromiter((len(placement) for placement in placements), dtype=np.int64, count=len(placements))
+    squares = np.add.reduceat(widths, np.cumsum(lengths) - lengths) if len(raw) else np.zeros(0, dtype=np.int64)
+    if np.any(squares != 64):
+        raise ValueError(f"Bad piece placement: {placements[int(np.argmax(squares != 64))]}")
+    grid = np.repeat(raw, widths).reshape(len(placements), 64)
+    pieces = np.zeros((2, 6, len(placements)), dtype=np.uint64)
+    for letter, (color, type) in FEN_PIECES.items():
+        pieces[color, type] = np.packbits(grid == ord(letter), axis=1, bitorder="little").view("<u8").ravel()
+    castling = np.array(castlings, dtype=np.uint8)
+    for color in (WHITE, BLACK):
+        for right, king, rook, _, _ in CASTLES[color]:
+            present = ((pieces[color, KING] & bit(king)) != ZERO) & ((pieces[color, ROOK] & bit(rook)) != ZERO)
+            castling &= np.where(present, 15, 15 ^ right).astype(np.uint8)
+    return PositionBatch(pieces, np.array(turns, dtype=np.uint8), castling, np.array(passants, dtype=np.uint64))
+
+class MoveCounts:
+    """Per-position results of count_moves; every attribute is an array of length N."""
+    def __init__(self, size):
+        self.attacks = np.zeros(size, dtype=np.uint64)
+        self.attacked = np.zeros(size, dtype=np.uint64)
+        self.checkers = np.zeros(size, dtype=np.int64)
+        self.in_check = np.zeros(size, dtype=bool)
+        self.pseudo_legal = np.zeros(size, dtype=np.int64)
+        self.legal_moves = np.zeros(size, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.legal_moves)
+
+def count_moves(batch):
+    """
+    For the side to move in every position of batch: attacks (squares it
+    attacks), attacked (squares the opponent attacks), checkers, in_check,
+    pseudo_legal and legal_moves.
+    """
+    require_numpy()
+    counts = MoveCounts(len(batch))
+    # Pawn direction and castling squares depend on the side to move, so each side's positions are counted together.
+    for us in (WHITE, BLACK):
+        index = np.nonzero(batch.turn == us)[0]
+        if len(index) == 0:
+            continue
+        pieces = batch.pieces[:, :, index]
+        results = count_side(pieces, us, batch.castling[index], batch.en_passant[index])
+        for name, values in results.items():
+            getattr(counts, name)[index] = values
+    return counts
+
+def count_side(pieces, us, castling, en_passant):
+    them = us ^ 1
+    own = np.bitwise_or.reduce(pieces[us], axis=0)
+    enemy = np.bitwise_or.reduce(pieces[them], axis=0)
+    occupied = own | enemy
+    empty = ~occupied
+    king = pieces[us][KING]
+    enemy_rooks = pieces[them][ROOK] | pieces[them][QUEEN]
+    enemy_bishops = pieces[them][BISHOP] | pieces[them][QUEEN]
+
+    attacked = attacks_by(pieces, them, occupied)
+    # Without our king, so it can't step back along a slider's line and look safe.
+    king_danger = attacks_by(pieces, them, occupied & ~king)
+
+    # Checkers, check mask and pins, all read off the rays from the king.
+    checkers = (knight_attacks(king) & pieces[them][KNIGHT]) | (pawn_attacks(us, king) & pieces[them][PAWN])
+    check_mask = checkers.copy()
+    pinned = np.zeros_like(king)
+    pin_rays = []
+    for directions, sliders in ((ORTHOGONAL, enemy_rooks), (DIAGONAL, enemy_bishops)):
+        for direction in directions:
+            line = ray(king, empty, direction)
+            checking = (line & sliders) != ZERO
+            checkers |= line & sliders
+            check_mask |= np.where(checking, line, ZERO)
+            blocker = line & own
+            beyond = ray(blocker, empty, direction)
+            pinned_here = np.where((beyond & sliders) != ZERO, blocker, ZERO)
+            pinned |= pinned_here
+            pin_rays.append((direction, pinned_here, line | beyond))
+    checker_count = popcount(checkers)
+    in_check = checker_count > 0
+    check_mask = np.where(checker_count == 0, ALL, np.where(checker_count == 1, check_mask, ZERO))
+    targets = ~own & check_mask
+
+    legal = np.zeros(len(king), dtype=np.int64)
+    pseudo = np.zeros(len(king), dtype=np.int64)
+    free = ~pinned
+
+    # Knights: a pinned knight can never move.
+    for jump in KNIGHT_JUMPS:
+        landing = step(pieces[us][KNIGHT], jump) & ~own
+        pseudo += popcount(landing)
+        legal += popcount(step(pieces[us][KNIGHT] & free, jump) & targets)
+
+    # Sliders: rays in one direction from different pieces never overlap, so their counts add up.
+    rooks = pieces[us][ROOK] | pieces[us][QUEEN]
+    bishops = pieces[us][BISHOP] | pieces[us][QUEEN]
+    for directions, sliders in ((ORTHOGONAL, rooks), (DIAGONAL, bishops)):
+        for direction in directions:
+            pseudo += popcount(ray(sliders, empty, direction) & ~own)
+            legal += popcount(ray(sliders & free, empty, direction) & targets)
+    # A pinned slider may still move along its pin ray, towards the pinner or back towards the king.
+    for direction, pinned_here, pin_ray in pin_rays:
+        sliders = pinned_here & (rooks if direction in ORTHOGONAL else bishops)
+        along = ray(sliders, empty, direction) | ray(sliders, empty, OPPOSITE[direction])
+        legal += popcount(along & pin_ray & targets)
+
+    # Pawns: unpinned ones anywhere in the check mask, pinned ones only along their pin ray.
+    pawns = pieces[us][PAWN]
+    pseudo += count_pawn_moves(pawns, us, empty, enemy, ALL)
+    legal += count_pawn_moves(pawns & free, us, empty, enemy, check_mask)
+    for direction, pinned_here, pin_ray in pin_rays:
+        legal += count_pawn_moves(pawns & pinned_here, us, empty, enemy, check_mask & pin_ray)
+
+    # En passant: play it out and see whether the king is left attacked.
+    captured = shift(en_passant, -PAWN_FORWARD[us])
+    for capture in PAWN_CAPTURES[us]:
+        capturer = step(en_passant, OPPOSITE[capture]) & pawns
+        possible = capturer != ZERO
+        pseudo += possible
+        after = occupied ^ capturer ^ en_passant ^ captured
+        after_empty = ~after
+        exposed = pawn_attacks(us, king) & pieces[them][PAWN] & ~captured
+        exposed |= knight_attacks(king) & pieces[them][KNIGHT]
+        for direction in ORTHOGONAL:
+            exposed |= ray(king, after_empty, direction) & enemy_rooks
+        for direction in DIAGONAL:
+            exposed |= ray(king, after_empty, direction) & enemy_bishops
+        legal += possible & (exposed == ZERO)
+
+    # King steps, then castling: not out of or through check; Piece.get_moves leaves the landing square to the filter.
+    for direction in KING_STEPS:
+        landing = step(king, direction) & ~own
+        pseudo += popcount(landing)
+        legal += popcount(landing & ~king_danger)
+    for right, king_square, rook_square, between, path in CASTLES[us]:
+        clear = U64(sum(1 << sq for sq in between))
+        able = (((castling & right) != 0) & ((king & bit(king_square)) != ZERO) & ((pieces[us][ROOK] & bit(rook_square)) != ZERO)
+                & ((occupied & clear) == ZERO) & ~in_check & ((attacked & bit(path[0])) == ZERO))
+        pseudo += able
+        legal += able & ((attacked & bit(path[1])) == ZERO)
+
+    return {
+        "attacks": attacks_by(pieces, us, occupied),
+        "attacked": attacked,
+        "checkers": checker_count,
+        "in_check": in_check,
+        "pseudo_legal": pseudo,
+        "legal_moves": legal,
+    }
+
+def count_pawn_moves(pawns, us, empty, enemy, allowed):
+    """Pushes, double pushes and captures landing in allowed; a move to the last rank counts four times."""
+    forward = (PAWN_FORWARD[us], ALL)
+    single = step(pawns, forward) & empty
+    double = step(single & PUSH_RANK[us], forward) & empty & allowed
+    landings = [single & allowed, double]
+    for capture in PAWN_CAPTURES[us]:
+        landings.append(step(pawns, capture) & enemy & allowed)
+    last_rank = LAST_RANK[us]
+    count = np.zeros(len(pawns), dtype=np.int64)
+    for landing in landings:
+        count += popcount(landing & ~last_rank) + 4 * popcount(landing & last_rank)
+    return count
@@ -0,0 +1,174 @@
+"""
+benchmark.py
+Times the hot paths (setup_board, assign_moves, generate_moves, generate_fen,
+perft and search) over the move generation test positions plus the standard
+perft positions, and compares the rates against a saved JSON baseline. A rate
+more than --threshold below the baseline is reported as a regression and the
+exit code is 1, so a slowdown in pieces.py shows up before it ships.
+
+Every benchmark is run --repeat times and the fastest run is kept, which
+filters out most of the noise from other processes.
+
+python -m Engine.benchmark [--backend board|bitboard] [--repeat N] [--quick] [--save baseline.json]
+python -m Engine.benchmark --baseline baseline.json [--threshold 0.10]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from Engine.backends import create_board, BACKENDS
+from Engine.search import Search
+from Engine.positions import MOVE_GENERATION_POSITIONS
+
+# (name, fen, {depth: nodes}) from the Chess Programming Wiki perft results.
+PERFT_POSITIONS = [
+    ("start", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", {2: 400, 3: 8902}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", {2: 2039, 3: 97862}),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", {2: 191, 4: 43238}),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", {2: 264, 3: 9467}),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", {2: 1486, 3: 62379}),
+]
+FENS = [position["fen"] for position in MOVE_GENERATION_POSITIONS] + [fen for _, fen, _ in PERFT_POSITIONS]
+SEARCH_FENS = [PERFT_POSITIONS[1][1], PERFT_POSITIONS[4][1], "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"]
+
+def best_time(run, repeat):
+    """Fastest of repeat calls to run(), which returns the amount of work it did."""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        work = run()
+        elapsed = time.perf_counter() - start_time
+        if best is None or elapsed < best:
+            best = elapsed
+    return work, best
+
+def bench_setup_board(board, rounds):
+    for _ in range(rounds):
+        for fen in FENS:
+            board.setup_board(fen, assign=False)
+    return rounds * len(FENS)
+
+def bench_assign_moves(board, rounds):
+    count = 0
+    for fen in FENS:
+        board.setup_board(fen, assign=False)
+        for _ in range(rounds):
+            board.assign_moves(board.turn)
+        count += rounds
+    return count
+
+def bench_generate_moves(board, rounds):
+    count = 0
+    for fen in FENS:
+        board.setup_board(fen, assign=False)
+        for _ in range(rounds):
+            board.generate_moves()
+        count += rounds
+    return count
+
+def bench_generate_fen(board, rounds):
+    count = 0
+    for fen in FENS:
+        board.setup_board(fen, assign=False)
+        for _ in range(rounds):
+            board.generate_fen()
+        count += rounds
+    return count
+
+def bench_perft(board, quick):
+    nodes = 0
+    for name, fen, counts in PERFT_POSITIONS:
+        depth = min(counts) if quick else max(counts)
+        board.setup_board(fen, assign=False)
+        found = board.perft(depth)
+        if found != counts[depth]:
+            raise ValueError(f"perft {name} depth {depth}: {found} nodes, expected {counts[depth]}")
+        nodes += found
+    return nodes
+
+def bench_search(board, depth):
+    nodes = 0
+    for fen in SEARCH_FENS:
+        board.setup_board(fen)
+        nodes += Search(board).search(max_depth=depth).nodes
+    return nodes
+
+def run_benchmarks(backend="board", repeat=3, quick=False, verbose=True):
+    """Returns {name: {"rate": work per second, "unit": ...}} for every benchmark the backend supports."""
+    board = create_board(backend=backend)
+    rounds = 5 if quick else 50
+    benchmarks = [
+        ("setup_board", "positions/s", lambda: bench_setup_board(board, rounds)),
+        ("assign_moves", "positions/s", lambda: bench_assign_moves(board, rounds)),
+        ("generate_moves", "positions/s", lambda: bench_generate_moves(board, rounds)),
+        ("generate_fen", "positions/s", lambda: bench_generate_fen(board, rounds)),
+        ("perft", "nodes/s", lambda: bench_perft(board, quick)),
+    ]
+    # The search only runs on the piece-list Board.
+    if backend == "board":
+        benchmarks.append(("search", "nodes/s", lambda: bench_search(board, 2 if quick else 4)))
+    results = {}
+    for name, unit, run in benchmarks:
+        work, elapsed = best_time(run, repeat)
+        results[name] = {"rate": work / elapsed, "unit": unit}
+        if verbose:
+            print(f"{name:<16}{work / elapsed:>14,.0f} {unit}")
+    return results
+
+def compare_results(baseline, results, threshold=0.10):
+    """[(name, baseline rate, current rate, change)] for every benchmark more than threshold slower than baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["rate"], result["rate"]
+        change = (new - old) / old
+        if change < -threshold:
+            regressions.append((name, old, new, change))
+    return regressions
+
+def print_comparison(baseline, results, threshold):
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<16}{'':>14}{result['rate']:>14,.0f}   (new)")
+            continue
+        old, new = baseline[name]["rate"], result["rate"]
+        change = (new - old) / old
+        flag = "  REGRESSION" if change < -threshold else ""
+        print(f"{name:<16}{old:>14,.0f}{new:>14,.0f}{change:>+9.1%}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark move generation and search against a saved baseline.")
+    parser.add_argument("--backend", choices=BACKENDS, default="board")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the fastest is kept")
+    parser.add_argument("--quick", action="store_true", help="shallower perft and search, fewer rounds")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("backend") != args.backend or baseline.get("quick") != args.quick:
+            print(f"Warning: baseline was recorded with backend={baseline.get('backend')} quick={baseline.get('quick')}", file=sys.stderr)
+
+    results = run_benchmarks(args.backend, args.repeat, args.quick, verbose=baseline is None)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"backend": args.backend, "quick": args.quick, "python": platform.python_version(), "results": results}, file, indent=2)
+            file.write("\n")
+    if baseline is None:
+        return 0
+
+    print_comparison(baseline["results"], results, args.threshold)
+    regressions = compare_results(baseline["results"], results, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than {args.baseline}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
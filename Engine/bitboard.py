@@ -0,0 +1,568 @@
+"""
+bitboard.py
+A second position backend: one 64-bit integer per color and piece type
+instead of Square/Piece objects. Bit n is board.squares[n], i.e. (x, y)
+with y == 0 on rank 8, so positions convert one-to-one with Board.
+
+BitboardBoard mirrors the Board surface that analysis code relies on
+(setup_board, generate_fen, assign_moves, in_check/in_checkmate, make_move,
+perft) and adds push/pop on packed integer moves for the hot loops.
+"""
+import time
+from Engine.constants import key, backwards_key, DEFAULT_CONFIG
+from Engine.fen_utils import pos_to_coord, coord_to_pos, move_to_uci
+from Engine.perft import report
+from Engine.zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS
+from Engine.moves import TYPES, EN_PASSANT, CASTLE, DOUBLE_PUSH, encode_move, to_pos, to_square, decode_move, new_move_list
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+COLORS = ("white", "black")
+
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_SQUARES = (1 << 64) - 1
+FILE_A = sum(1 << (y * 8) for y in range(8))
+FILE_H = FILE_A << 7
+RANK_3 = 0xFF << 40
+RANK_6 = 0xFF << 16
+LAST_RANKS = (0xFF << 56) | 0xFF
+
+def bit_squares(bb):
+    squares = []
+    while bb:
+        low = bb & -bb
+        squares.append(low.bit_length() - 1)
+        bb ^= low
+    return squares
+
+def build_leaper_table(offsets):
+    table = []
+    for sq in range(64):
+        x, y = sq % 8, sq // 8
+        bb = 0
+        for dx, dy in offsets:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < 8 and 0 <= ny < 8:
+                bb |= 1 << (ny * 8 + nx)
+        table.append(bb)
+    return table
+
+KNIGHT_ATTACKS = build_leaper_table([(1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1)])
+KING_ATTACKS = build_leaper_table([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+# White pawns move towards y == 0.
+PAWN_ATTACKS = [build_leaper_table([(-1, -1), (1, -1)]), build_leaper_table([(-1, 1), (1, 1)])]
+
+def build_rays(dx, dy):
+    rays = []
+    for sq in range(64):
+        x, y = sq % 8, sq // 8
+        bb = 0
+        x, y = x + dx, y + dy
+        while 0 <= x < 8 and 0 <= y < 8:
+            bb |= 1 << (y * 8 + x)
+            x, y = x + dx, y + dy
+        rays.append(bb)
+    return rays
+
+def build_between():
+    between = [[0] * 64 for _ in range(64)]
+    for rays in (NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST):
+        for a in range(64):
+            for b in bit_squares(rays[a]):
+                # Squares strictly between a and b along this ray.
+                between[a][b] = rays[a] & ~rays[b] & ~(1 << b)
+    return between
+
+NORTH, SOUTH, EAST, WEST = (build_rays(0, -1), build_rays(0, 1), build_rays(1, 0), build_rays(-1, 0))
+NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = (build_rays(1, -1), build_rays(-1, -1), build_rays(1, 1), build_rays(-1, 1))
+
+# Unrolled per direction: this is the innermost loop of move generation.
+def rook_attacks(sq, occupied):
+    east = EAST[sq]
+    blockers = east & occupied
+    if blockers:
+        east ^= EAST[(blockers & -blockers).bit_length() - 1]
+    south = SOUTH[sq]
+    blockers = south & occupied
+    if blockers:
+        south ^= SOUTH[(blockers & -blockers).bit_length() - 1]
+    west = WEST[sq]
+    blockers = west & occupied
+    if blockers:
+        west ^= WEST[blockers.bit_length() - 1]
+    north = NORTH[sq]
+    blockers = north & occupied
+    if blockers:
+        north ^= NORTH[blockers.bit_length() - 1]
+    return east | south | west | north
+
+def bishop_attacks(sq, occupied):
+    south_east = SOUTH_EAST[sq]
+    blockers = south_east & occupied
+    if blockers:
+        south_east ^= SOUTH_EAST[(blockers & -blockers).bit_length() - 1]
+    south_west = SOUTH_WEST[sq]
+    blockers = south_west & occupied
+    if blockers:
+        south_west ^= SOUTH_WEST[(blockers & -blockers).bit_length() - 1]
+    north_east = NORTH_EAST[sq]
+    blockers = north_east & occupied
+    if blockers:
+        north_east ^= NORTH_EAST[blockers.bit_length() - 1]
+    north_west = NORTH_WEST[sq]
+    blockers = north_west & occupied
+    if blockers:
+        north_west ^= NORTH_WEST[blockers.bit_length() - 1]
+    return south_east | south_west | north_east | north_west
+
+BETWEEN = build_between()
+
+# castling &= CASTLING_MASK[from] & CASTLING_MASK[to] keeps the rights current.
+CASTLING_MASK = [15] * 64
+CASTLING_MASK[60] = 15 & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[63] = 15 & ~WHITE_KINGSIDE
+CASTLING_MASK[56] = 15 & ~WHITE_QUEENSIDE
+CASTLING_MASK[4] = 15 & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[7] = 15 & ~BLACK_KINGSIDE
+CASTLING_MASK[0] = 15 & ~BLACK_QUEENSIDE
+
+# king from, king to, rook from, rook to, squares that must be empty, squares that must not be attacked
+CASTLING_MOVES = {
+    WHITE_KINGSIDE: (60, 62, 63, 61, (1 << 61) | (1 << 62), (1 << 61) | (1 << 62)),
+    WHITE_QUEENSIDE: (60, 58, 56, 59, (1 << 57) | (1 << 58) | (1 << 59), (1 << 58) | (1 << 59)),
+    BLACK_KINGSIDE: (4, 6, 7, 5, (1 << 5) | (1 << 6), (1 << 5) | (1 << 6)),
+    BLACK_QUEENSIDE: (4, 2, 0, 3, (1 << 1) | (1 << 2) | (1 << 3), (1 << 2) | (1 << 3)),
+}
+CASTLING_RIGHTS = [(WHITE_KINGSIDE, WHITE_QUEENSIDE), (BLACK_KINGSIDE, BLACK_QUEENSIDE)]
+ROOK_CASTLING = {62: (63, 61), 58: (56, 59), 6: (7, 5), 2: (0, 3)}
+
+# Same keys as Board, indexed by color * 6 + type, so both backends hash a position identically.
+ZOBRIST = [PIECE_KEYS[(color, type)] for color in COLORS for type in TYPES]
+# FEN letter -> color * 6 + type, and digit -> run of empty squares.
+FEN_CODES = {}
+for letter, type_name in key.items():
+    FEN_CODES[letter] = WHITE * 6 + TYPES.index(type_name)
+    FEN_CODES[letter.lower()] = BLACK * 6 + TYPES.index(type_name)
+EMPTY_RUNS = {str(n): n for n in range(1, 9)}
+
+class BitboardBoard:
+    def __init__(self, config=DEFAULT_CONFIG):
+        self.setup_board(config)
+
+    def setup_board(self, fen, assign=True):
+        # assign is for Board compatibility; moves are always generated on demand here.
+        self.pieces = [[0] * 6, [0] * 6]
+        self.occupancy = [0, 0]
+        self.squares = [EMPTY] * 64
+        self.history = []
+        self.legal_moves = {}
+
+        # EPD lines stop after the en passant field; their clocks default to 0 1.
+        fields = fen.split()
+        board_fen, active_color, castling_fen, en_passant_fen = fields[:4]
+        # One pass over the placement: ranks are always 8 squares, so '/' needs no bookkeeping.
+        pieces, occupancy, squares = self.pieces, self.occupancy, self.squares
+        h = 0
+        sq = 0
+        for char in board_fen:
+            if char == '/':
+                continue
+            if char in EMPTY_RUNS:
+                sq += EMPTY_RUNS[char]
+                continue
+            code = FEN_CODES[char]
+            bit = 1 << sq
+            pieces[code // 6][code % 6] |= bit
+            occupancy[code // 6] |= bit
+            squares[sq] = code
+            h ^= ZOBRIST[code][sq]
+            sq += 1
+
+        self.side = WHITE if active_color == 'w' else BLACK
+        self.castling = 0
+        for char, right, king_sq, rook_sq, color in (('K', WHITE_KINGSIDE, 60, 63, WHITE), ('Q', WHITE_QUEENSIDE, 60, 56, WHITE),
+                                                     ('k', BLACK_KINGSIDE, 4, 7, BLACK), ('q', BLACK_QUEENSIDE, 4, 0, BLACK)):
+            # Rights without the king and rook on their home squares can't be used.
+            if char in castling_fen and self.squares[king_sq] == color * 6 + KING and self.squares[rook_sq] == color * 6 + ROOK:
+                self.castling |= right
+        self.ep_square = EMPTY if en_passant_fen == '-' else to_square(coord_to_pos(en_passant_fen))
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        self.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        h ^= CASTLING_KEYS[self.castling]
+        if self.side == BLACK:
+            h ^= SIDE_KEY
+        if self.ep_square != EMPTY:
+            h ^= EN_PASSANT_KEYS[self.ep_square % 8]
+        self.hash = h
+
+    def compute_hash(self):
+        h = CASTLING_KEYS[self.castling]
+        for sq, code in enumerate(self.squares):
+            if code != EMPTY:
+                h ^= ZOBRIST[code][sq]
+        if self.side == BLACK:
+            h ^= SIDE_KEY
+        if self.ep_square != EMPTY:
+            h ^= EN_PASSANT_KEYS[self.ep_square % 8]
+        return h
+
+    def put(self, color, ptype, sq):
+        bit = 1 << sq
+        self.pieces[color][ptype] |= bit
+        self.occupancy[color] |= bit
+        self.squares[sq] = color * 6 + ptype
+
+    @property
+    def turn(self):
+        return COLORS[self.side]
+
+    def generate_fen(self):
+        rows = []
+        for y in range(8):
+            row = ''
+            empty = 0
+            for x in range(8):
+                code = self.squares[y * 8 + x]
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                char = backwards_key[TYPES[code % 6]]
+                row += char if code < 6 else char.lower()
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        castling_fen = ''.join(char for char, right in (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE), ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+                               if self.castling & right) or '-'
+        en_passant_fen = '-' if self.ep_square == EMPTY else pos_to_coord(to_pos(self.ep_square))
+        active_color = 'w' if self.side == WHITE else 'b'
+        return f"{'/'.join(rows)} {active_color} {castling_fen} {en_passant_fen} {self.halfmove_clock} {self.fullmove_number}"
+
+    def king_square(self, color):
+        return self.pieces[color][KING].bit_length() - 1
+
+    def attackers_to(self, sq, color, occupied):
+        pieces = self.pieces[color]
+        return ((KNIGHT_ATTACKS[sq] & pieces[KNIGHT])
+                | (KING_ATTACKS[sq] & pieces[KING])
+                | (PAWN_ATTACKS[color ^ 1][sq] & pieces[PAWN])
+                | (rook_attacks(sq, occupied) & (pieces[ROOK] | pieces[QUEEN]))
+                | (bishop_attacks(sq, occupied) & (pieces[BISHOP] | pieces[QUEEN])))
+
+    def attacked_squares(self, color, occupied):
+        """Every square color attacks, as a bitset."""
+        pieces = self.pieces[color]
+        pawns = pieces[PAWN]
+        if color == WHITE:
+            attacks = ((pawns & ~FILE_A) >> 9) | ((pawns & ~FILE_H) >> 7)
+        else:
+            attacks = (((pawns & ~FILE_A) << 7) | ((pawns & ~FILE_H) << 9)) & ALL_SQUARES
+        for sq in bit_squares(pieces[KNIGHT]):
+            attacks |= KNIGHT_ATTACKS[sq]
+        for sq in bit_squares(pieces[BISHOP] | pieces[QUEEN]):
+            attacks |= bishop_attacks(sq, occupied)
+        for sq in bit_squares(pieces[ROOK] | pieces[QUEEN]):
+            attacks |= rook_attacks(sq, occupied)
+        return attacks | KING_ATTACKS[self.king_square(color)]
+
+    def generate_moves(self, us=None):
+        """Legal moves for us (default: side to move) as packed integers."""
+        if us is None:
+            us = self.side
+        them = us ^ 1
+        ours = self.pieces[us]
+        theirs = self.pieces[them]
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = own | enemy
+        king_sq = self.king_square(us)
+        moves = new_move_list()
+
+        # The king can't hide behind itself from a slider, so take it off first.
+        attacked = self.attacked_squares(them, occupied ^ (1 << king_sq))
+        for to in bit_squares(KING_ATTACKS[king_sq] & ~own & ~attacked):
+            moves.append(king_sq | (to << 6))
+
+        checkers = self.attackers_to(king_sq, them, occupied)
+        if checkers & (checkers - 1):
+            return moves  # Double check – king must move.
+        if checkers:
+            target_mask = checkers | BETWEEN[king_sq][checkers.bit_length() - 1]
+        else:
+            target_mask = ALL_SQUARES
+            for right in CASTLING_RIGHTS[us]:
+                if self.castling & right:
+                    king_from, king_to, rook_from, rook_to, empty, safe = CASTLING_MOVES[right]
+                    if not (occupied & empty) and not (attacked & safe):
+                        moves.append(king_from | (king_to << 6) | (CASTLE << 15))
+        target_mask &= ~own
+
+        # Pinned pieces may only move along the line between the king and the pinner.
+        pins = {}
+        snipers = ((rook_attacks(king_sq, enemy) & (theirs[ROOK] | theirs[QUEEN]))
+                   | (bishop_attacks(king_sq, enemy) & (theirs[BISHOP] | theirs[QUEEN])))
+        for sniper in bit_squares(snipers):
+            blockers = BETWEEN[king_sq][sniper] & occupied
+            if blockers and not (blockers & (blockers - 1)) and blockers & own:
+                pins[blockers.bit_length() - 1] = BETWEEN[king_sq][sniper] | (1 << sniper)
+
+        for frm in bit_squares(ours[KNIGHT]):
+            if frm in pins:
+                continue
+            for to in bit_squares(KNIGHT_ATTACKS[frm] & target_mask):
+                moves.append(frm | (to << 6))
+        # Queens go through both loops; the diagonal and straight targets never overlap.
+        for sliders, attack in ((ours[BISHOP] | ours[QUEEN], bishop_attacks), (ours[ROOK] | ours[QUEEN], rook_attacks)):
+            for frm in bit_squares(sliders):
+                targets = attack(frm, occupied) & target_mask
+                if frm in pins:
+                    targets &= pins[frm]
+                for to in bit_squares(targets):
+                    moves.append(frm | (to << 6))
+
+        # Unpinned pawns are generated setwise, one shift per direction.
+        pawns = ours[PAWN]
+        empty = ~occupied
+        pinned = 0
+        for sq in pins:
+            pinned |= 1 << sq
+        free = pawns & ~pinned
+        if us == WHITE:
+            forward = -8
+            single = (free >> 8) & empty
+            double = ((single & RANK_3) >> 8) & empty & target_mask
+            left = ((free & ~FILE_A) >> 9) & enemy & target_mask
+            right = ((free & ~FILE_H) >> 7) & enemy & target_mask
+        else:
+            forward = 8
+            single = (free << 8) & empty
+            double = ((single & RANK_6) << 8) & empty & target_mask
+            left = ((free & ~FILE_A) << 7) & enemy & target_mask
+            right = ((free & ~FILE_H) << 9) & enemy & target_mask
+        single &= target_mask
+        for targets, step in ((single, forward), (left, forward - 1), (right, forward + 1)):
+            for to in bit_squares(targets & ~LAST_RANKS):
+                moves.append((to - step) | (to << 6))
+            for to in bit_squares(targets & LAST_RANKS):
+                for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                    moves.append((to - step) | (to << 6) | (promotion << 12))
+        for to in bit_squares(double):
+            moves.append((to - 2 * forward) | (to << 6) | (DOUBLE_PUSH << 15))
+
+        start_row = 6 if us == WHITE else 1
+        for frm in bit_squares(pawns & pinned):
+            targets = PAWN_ATTACKS[us][frm] & enemy
+            one = frm + forward
+            if not (occupied >> one) & 1:
+                targets |= 1 << one
+                if frm // 8 == start_row and not (occupied >> (one + forward)) & 1:
+                    targets |= 1 << (one + forward)
+            for to in bit_squares(targets & target_mask & pins[frm]):
+                if (1 << to) & LAST_RANKS:
+                    for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        moves.append(frm | (to << 6) | (promotion << 12))
+                elif to - frm == 2 * forward:
+                    moves.append(frm | (to << 6) | (DOUBLE_PUSH << 15))
+                else:
+                    moves.append(frm | (to << 6))
+
+        if self.ep_square != EMPTY and us == self.side:
+            ep = self.ep_square
+            captured_sq = ep - forward
+            for frm in bit_squares(PAWN_ATTACKS[them][ep] & ours[PAWN]):
+                # Play it on the occupancy and look for anything still hitting the king.
+                after = (occupied ^ (1 << frm) ^ (1 << captured_sq)) | (1 << ep)
+                if rook_attacks(king_sq, after) & (theirs[ROOK] | theirs[QUEEN]):
+                    continue
+                if bishop_attacks(king_sq, after) & (theirs[BISHOP] | theirs[QUEEN]):
+                    continue
+                if KNIGHT_ATTACKS[king_sq] & theirs[KNIGHT] or PAWN_ATTACKS[us][king_sq] & theirs[PAWN] & ~(1 << captured_sq):
+                    continue
+                moves.append(frm | (ep << 6) | (EN_PASSANT << 15))
+        return moves
+
+    def push(self, move):
+        frm = move & 63
+        to = (move >> 6) & 63
+        promotion = (move >> 12) & 7
+        flags = move >> 15
+        us = self.side
+        them = us ^ 1
+        squares = self.squares
+        code = squares[frm]
+        captured = squares[to]
+        self.history.append((move, captured, self.castling, self.ep_square, self.halfmove_clock, self.hash))
+        h = self.hash ^ SIDE_KEY ^ ZOBRIST[code][frm] ^ ZOBRIST[code][to]
+
+        from_to = (1 << frm) | (1 << to)
+        ours = self.pieces[us]
+        ours[code - us * 6] ^= from_to
+        self.occupancy[us] ^= from_to
+        squares[frm] = EMPTY
+        squares[to] = code
+        if captured != EMPTY:
+            self.pieces[them][captured - them * 6] ^= 1 << to
+            self.occupancy[them] ^= 1 << to
+            h ^= ZOBRIST[captured][to]
+
+        if flags & EN_PASSANT:
+            captured_sq = to + 8 if us == WHITE else to - 8
+            self.pieces[them][PAWN] ^= 1 << captured_sq
+            self.occupancy[them] ^= 1 << captured_sq
+            squares[captured_sq] = EMPTY
+            h ^= ZOBRIST[them * 6 + PAWN][captured_sq]
+        elif flags & CASTLE:
+            rook_from, rook_to = ROOK_CASTLING[to]
+            rook_bits = (1 << rook_from) | (1 << rook_to)
+            ours[ROOK] ^= rook_bits
+            self.occupancy[us] ^= rook_bits
+            squares[rook_to] = squares[rook_from]
+            squares[rook_from] = EMPTY
+            h ^= ZOBRIST[us * 6 + ROOK][rook_from] ^ ZOBRIST[us * 6 + ROOK][rook_to]
+        if promotion:
+            ours[PAWN] ^= 1 << to
+            ours[promotion] |= 1 << to
+            squares[to] = us * 6 + promotion
+            h ^= ZOBRIST[code][to] ^ ZOBRIST[us * 6 + promotion][to]
+
+        castling = self.castling & CASTLING_MASK[frm] & CASTLING_MASK[to]
+        if castling != self.castling:
+            h ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+            self.castling = castling
+        if self.ep_square != EMPTY:
+            h ^= EN_PASSANT_KEYS[self.ep_square % 8]
+        if flags & DOUBLE_PUSH:
+            self.ep_square = (frm + to) // 2
+            h ^= EN_PASSANT_KEYS[frm % 8]
+        else:
+            self.ep_square = EMPTY
+        self.hash = h
+        if code - us * 6 == PAWN or captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = them
+
+    def pop(self):
+        move, captured, self.castling, self.ep_square, self.halfmove_clock, self.hash = self.history.pop()
+        frm = move & 63
+        to = (move >> 6) & 63
+        promotion = (move >> 12) & 7
+        flags = move >> 15
+        them = self.side
+        us = them ^ 1
+        self.side = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+        squares = self.squares
+        ours = self.pieces[us]
+
+        if promotion:
+            ours[promotion] ^= 1 << to
+            ours[PAWN] |= 1 << to
+            squares[to] = us * 6 + PAWN
+        code = squares[to]
+        from_to = (1 << frm) | (1 << to)
+        ours[code - us * 6] ^= from_to
+        self.occupancy[us] ^= from_to
+        squares[frm] = code
+        squares[to] = captured
+        if captured != EMPTY:
+            self.pieces[them][captured - them * 6] |= 1 << to
+            self.occupancy[them] |= 1 << to
+
+        if flags & EN_PASSANT:
+            captured_sq = to + 8 if us == WHITE else to - 8
+            self.pieces[them][PAWN] |= 1 << captured_sq
+            self.occupancy[them] |= 1 << captured_sq
+            squares[captured_sq] = them * 6 + PAWN
+        elif flags & CASTLE:
+            rook_from, rook_to = ROOK_CASTLING[to]
+            rook_bits = (1 << rook_from) | (1 << rook_to)
+            ours[ROOK] ^= rook_bits
+            self.occupancy[us] ^= rook_bits
+            squares[rook_from] = squares[rook_to]
+            squares[rook_to] = EMPTY
+        return move
+
+    def decode_move(self, move):
+        return decode_move(move)
+
+    def find_move(self, start, end, promotion=None):
+        for move in self.generate_moves():
+            if self.decode_move(move) == (start, end, promotion):
+                return move
+        # Board promotes to a queen when no piece is named.
+        if promotion is None:
+            return self.find_move(start, end, "queen") if self.squares[to_square(start)] % 6 == PAWN else None
+        return None
+
+    def make_move(self, start, end, promotion=None):
+        move = self.find_move(start, end, promotion)
+        if move is None:
+            raise ValueError(f"Illegal move: {move_to_uci(start, end, promotion)}")
+        self.push(move)
+        return move
+
+    def unmake_move(self):
+        return self.pop()
+
+    def get_legal_moves(self, color):
+        return [self.decode_move(move) for move in self.generate_moves(COLORS.index(color))]
+
+    def assign_moves(self, color):
+        """Same shape as the Board's piece.legal_moves: {start: [end, ...]}, promotions listed once."""
+        self.legal_moves = {}
+        for start, end, promotion in self.get_legal_moves(color):
+            targets = self.legal_moves.setdefault(start, [])
+            if promotion in (None, "queen"):
+                targets.append(end)
+        return self.legal_moves
+
+    def in_check(self, color):
+        us = COLORS.index(color)
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        return self.attackers_to(self.king_square(us), us ^ 1, occupied) != 0
+
+    def in_checkmate(self, color):
+        return self.in_check(color) and not self.generate_moves(COLORS.index(color))
+
+    def count_nodes(self, depth):
+        if depth <= 0:
+            return 1
+        moves = self.generate_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.push(move)
+            nodes += self.count_nodes(depth - 1)
+            self.pop()
+        return nodes
+
+    def perft(self, depth, verbose=False):
+        start_time = time.perf_counter()
+        nodes = self.count_nodes(depth)
+        if verbose:
+            report(depth, nodes, time.perf_counter() - start_time)
+        return nodes
+
+    def perft_divide(self, depth, verbose=True):
+        if depth < 1:
+            raise ValueError(f"perft_divide needs a depth of at least 1, not {depth}")
+        start_time = time.perf_counter()
+        divide = {}
+        for move in self.generate_moves():
+            self.push(move)
+            divide[move_to_uci(*self.decode_move(move))] = self.count_nodes(depth - 1)
+            self.pop()
+        if verbose:
+            for move in sorted(divide):
+                print(f"{move}: {divide[move]}")
+            report(depth, sum(divide.values()), time.perf_counter() - start_time)
+        return divide
@@ -0,0 +1,434 @@
+try:
+    import pygame
+except ImportError:  # headless boards never touch pygame
+    pygame = None
+import logging as log
+from Engine.pieces import Pawn, Rook, Knight, Bishop, Queen, King, Piece
+from Engine.fen_utils import generate_fen, move_to_uci
+from Engine.sprites import SpriteAtlas
+from Engine.zobrist import piece_key, castling_rights, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS
+from Engine.evaluation import MG_SCORES, EG_SCORES, PHASE
+from Engine.constants import key, DEFAULT_CONFIG
+from Engine.mailbox import MAILBOX, EMPTY, empty_mailbox
+from Engine.moves import MoveRecord, POSITIONS, PROMOTION_CODES, EN_PASSANT, CASTLE, DOUBLE_PUSH, encode_move, move_promotion, decode_move
+import Engine.setup as setup
+from Engine import click_handler
+# move_assignment functions are imported where needed.
+log.basicConfig(level=log.DEBUG)
+
+class Square:
+    """Where a square is drawn and whether it's highlighted; what stands on it lives in Board.mailbox."""
+    __slots__ = ("x", "y", "pos", "color", "draw_color", "highlight_color", "coord", "highlight",
+                 "headless", "width", "height", "abs_x", "abs_y", "abs_pos", "rect")
+
+    def __init__(self, x, y, width, height, headless=False):
+        self.x = x
+        self.y = y
+        self.pos = (x, y)
+        self.color = 'light' if (x + y) % 2 == 0 else 'dark'
+        self.draw_color = (181, 136, 99) if self.color == 'light' else (240, 217, 181)
+        self.highlight_color = (230, 205, 0) if self.color == 'light' else (235, 235, 0)
+        self.coord = self.get_coord()
+        self.highlight = False
+        self.headless = headless
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.abs_x = self.x * width
+        self.abs_y = self.y * height
+        self.abs_pos = (self.abs_x, self.abs_y)
+        self.rect = None if self.headless else pygame.Rect(
+            self.abs_x,
+            self.abs_y,
+            self.width,
+            self.height
+        )
+    
+    def get_coord(self):
+        columns = 'abcdefgh'
+        return columns[self.x] + str(8 - self.y)
+
+    def draw(self, display, atlas, piece):
+        if self.highlight:
+            pygame.draw.rect(display, self.highlight_color, self.rect)
+        else:
+            pygame.draw.rect(display, self.draw_color, self.rect)
+        if piece is not None:
+            display.blit(atlas.get(piece.color, piece.type), self.rect.topleft)
+
+class Board:
+    def __init__(self, width, height, config=DEFAULT_CONFIG, headless=False):
+        """
+        headless boards skip pygame entirely (no Rects, no sprites), for
+        analysis code that only needs the position.
+        """
+        if not headless and pygame is None:
+            raise ImportError("pygame is required for a Board unless headless=True")
+        self.headless = headless
+        self.width = width
+        self.height = height
+        self.tile_width = width // 8
+        self.tile_height = height // 8
+        self.selected_piece = None
+        self.turn = 'white'
+        self.moves = []
+        self.config = config
+        self.white_king = None
+        self.black_king = None
+        self.white_queenside_rook = None
+        self.white_kingside_rook = None
+        self.black_queenside_rook = None
+        self.black_kingside_rook = None
+        self.white_pieces = []
+        self.black_pieces = []
+        self.pieces = []
+        self.halfmove_clock = None
+        self.fullmove_number = None
+        self.en_passant_square = None
+        # Castling rights as a KQkq bit set (see zobrist.castling_rights), kept in step with the moved flags.
+        self.castling = 0
+        # Zobrist key of the position, kept current by every move/add/remove.
+        self.hash = 0
+        # White-minus-black material and piece-square sums and the game phase (see Engine/evaluation.py), kept current the same way.
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        self.spare_pieces = {}
+        # The position: a 10x12 mailbox of piece codes, and the Piece on each of those squares.
+        self.mailbox = empty_mailbox()
+        self.piece_at = [None] * 120
+        self.atlas = None
+        self.squares = self.generate_squares()
+        self.highlighted = []
+        # Squares to repaint on the next draw; full_redraw repaints everything.
+        self.dirty_squares = set()
+        self.full_redraw = True
+        setup.setup_board(self, self.config)
+
+    def generate_squares(self):
+        output = []
+        for y in range(8):
+            for x in range(8):
+                output.append(Square(x, y, self.tile_width, self.tile_height, self.headless))
+        return output
+    
+    def developer_insight(self):
+        board_fen = generate_fen(self).split()[0]
+        print(f"FEN: {board_fen}")
+        print(f"moves: {self.moves}")
+        print(self)
+        from Engine import instrumentation
+        if instrumentation.enabled:
+            print(instrumentation.report())
+    
+    def __str__(self):
+        rows = []
+        board_fen = generate_fen(self).split()[0]
+        for row in board_fen.split('/'):
+            expanded_row = ''
+            for char in row:
+                if char.isdigit():
+                    expanded_row += ' ' * (int(char) * 3)
+                else:
+                    expanded_row += f' {char} '
+            rows.append(expanded_row.rstrip().ljust(24))
+        horizontal_border = '+---' * 8 + '+'
+        board_with_borders = horizontal_border + '\n'
+        for row in rows:
+            if row.strip() == '':
+                row = ' ' * 24
+            board_with_borders += '|' + '|'.join(row[i:i+3] for i in range(0, len(row), 3)) + '|\n'
+            board_with_borders += horizontal_border + '\n'
+        return board_with_borders
+
+    def handle_click(self, mx, my):
+        return click_handler.handle_click(self, mx, my)
+
+    def remove_piece(self, piece, keep_pos=False):
+        try:
+            piece.status = False
+            if piece.color == 'white':
+                self.white_pieces.remove(piece)
+            else:
+                self.black_pieces.remove(piece)
+            self.pieces.remove(piece)
+            self.vacate(piece.pos)
+            self.hash ^= piece_key(piece, piece.pos)
+            sq = piece.pos[1] * 8 + piece.pos[0]
+            self.mg_score -= MG_SCORES[piece.code][sq]
+            self.eg_score -= EG_SCORES[piece.code][sq]
+            self.phase -= PHASE[piece.code]
+            if not keep_pos:
+                piece.pos = None
+        except:
+            print(f"-------------------------------ALERT-------------------------------\n\t\t!!!  LOOK HERE YOU DUMBASS   !!!\nError when removing: {piece}\n-------------------------------ALERT-------------------------------")
+            raise ValueError
+        return piece
+
+    def add_piece(self, piece, pos):
+        piece.status = True
+        if piece.color == "white":
+            self.white_pieces.append(piece)
+        else:
+            self.black_pieces.append(piece)
+        self.pieces.append(piece)
+        piece.pos = pos
+        self.place(piece, pos)
+        self.hash ^= piece_key(piece, pos)
+        sq = pos[1] * 8 + pos[0]
+        self.mg_score += MG_SCORES[piece.code][sq]
+        self.eg_score += EG_SCORES[piece.code][sq]
+        self.phase += PHASE[piece.code]
+
+    def place(self, piece, pos):
+        index = MAILBOX[pos[1] * 8 + pos[0]]
+        self.mailbox[index] = piece.code
+        self.piece_at[index] = piece
+
+    def vacate(self, pos):
+        index = MAILBOX[pos[1] * 8 + pos[0]]
+        self.mailbox[index] = EMPTY
+        self.piece_at[index] = None
+
+    def deselect_piece(self, message=True):
+        return click_handler.deselect_piece(self, message)
+
+    def select_piece(self, clicked_square, message=True):
+        return click_handler.select_piece(self, clicked_square, message)
+
+    def unhighlight(self):
+        return click_handler.unhighlight(self)
+    
+    def save_state(self):
+        """A marker to restore_state back to; the undo stack already holds everything else."""
+        return {
+            "ply": len(self.moves),
+            "selected_piece": self.selected_piece
+        }
+
+    def restore_state(self, state):
+        while len(self.moves) > state["ply"]:
+            self.unmake_move()
+        self.selected_piece = state["selected_piece"]
+        self.full_redraw = True
+        self.assign_moves(self.turn)
+
+    def takeback(self):
+        return click_handler.take_back(self)
+
+    def encode_move(self, start, end, promotion=None):
+        """(start, end, promotion) -> packed move, with the flags the position implies."""
+        piece = self.get_piece(start)
+        flags = 0
+        if piece is not None and piece.type == "pawn":
+            if abs(end[1] - start[1]) == 2:
+                flags = DOUBLE_PUSH
+            elif end == self.en_passant_square and end[0] != start[0]:
+                flags = EN_PASSANT
+            if (end[1] == 0 or end[1] == 7) and promotion is None:
+                promotion = "queen"
+        elif piece is not None and piece.type == "king" and abs(end[0] - start[0]) == 2:
+            flags = CASTLE
+        return encode_move(start[1] * 8 + start[0], end[1] * 8 + end[0], PROMOTION_CODES[promotion] if promotion else 0, flags)
+
+    def make_move(self, start, end, promotion=None):
+        """
+        Plays start -> end in place and pushes everything needed to take it back
+        onto self.moves. Pawns reaching the last rank become a queen unless
+        promotion names another piece type.
+        """
+        return self.push(self.encode_move(start, end, promotion))
+
+    def push(self, move):
+        """Plays a packed move (see Engine/moves.py) and returns the captured piece, if any."""
+        start = POSITIONS[move & 63]
+        end = POSITIONS[(move >> 6) & 63]
+        piece = self.piece_at[MAILBOX[move & 63]]
+        record = MoveRecord(move, piece, getattr(piece, "moved", None), self.castling, self.en_passant_square, self.halfmove_clock, self.hash)
+        # Only king and rook moves (or a rook being taken) can change castling rights.
+        target = self.piece_at[MAILBOX[(move >> 6) & 63]]
+        rights_can_change = piece.type == "king" or piece.type == "rook" or (target is not None and target.type == "rook")
+        captured = piece.move(self, end)
+        record.captured = captured
+        if self.en_passant_square is not None:
+            self.hash ^= EN_PASSANT_KEYS[self.en_passant_square[0]]
+        self.en_passant_square = None
+        if piece.type == "pawn":
+            if end[1] == 0 or end[1] == 7:
+                promoted = self.take_spare_piece(end, piece.color, move_promotion(move) or "queen")
+                self.remove_piece(piece, keep_pos=True)
+                self.add_piece(promoted, end)
+                record.promotion = promoted
+            elif abs(end[1] - start[1]) == 2:
+                self.en_passant_square = POSITIONS[((move & 63) + ((move >> 6) & 63)) // 2]
+                self.hash ^= EN_PASSANT_KEYS[start[0]]
+            self.halfmove_clock = 0
+        elif captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if rights_can_change:
+            rights = castling_rights(self)
+            if rights != self.castling:
+                self.hash ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[rights]
+                self.castling = rights
+        if self.turn == "black":
+            self.fullmove_number += 1
+        self.turn = "white" if self.turn == "black" else "black"
+        self.hash ^= SIDE_KEY
+        self.moves.append(record)
+        return captured
+
+    def unmake_move(self):
+        record = self.moves.pop()
+        piece = record.piece
+        start, end = record.start, record.end
+        if record.promotion is not None:
+            promoted = self.remove_piece(record.promotion)
+            self.spare_pieces.setdefault((promoted.color, promoted.type), []).append(promoted)
+            self.add_piece(piece, end)
+        piece.revert_move(self, start, end, record.captured)
+        if record.moved is not None:
+            piece.moved = record.moved
+        self.castling = record.castling
+        self.en_passant_square = record.en_passant_square
+        self.halfmove_clock = record.halfmove_clock
+        self.hash = record.hash
+        self.turn = piece.color
+        if piece.color == "black":
+            self.fullmove_number -= 1
+        return record
+
+    def pop(self):
+        return self.unmake_move().move
+
+    def take_spare_piece(self, pos, color, type):
+        """Promotions reuse pieces taken back by unmake_move instead of building new ones."""
+        spares = self.spare_pieces.get((color, type))
+        if spares:
+            piece = spares.pop()
+            piece.reset(pos)
+            return piece
+        return setup.create_piece(pos, color, type)
+
+    def perft(self, depth, verbose=False):
+        from Engine.perft import perft
+        return perft(self, depth, verbose)
+
+    def perft_divide(self, depth, verbose=True):
+        from Engine.perft import perft_divide
+        return perft_divide(self, depth, verbose)
+
+    def engine_move(self, time_limit=1.0, book=None):
+        """
+        Lets the engine play for the side to move: a move from book (a
+        book.Book) if it has one for this position, otherwise the search's.
+        Returns the winner if that mates.
+        """
+        if book is not None:
+            move = book.choose(self)
+            if move is not None:
+                print(f"Engine plays {move_to_uci(*move)} from the book")
+                return click_handler.play_move(self, *move)
+        from Engine.search import Search
+        result = Search(self).search(time_limit=time_limit, verbose=True)
+        if result.best_move is None:
+            return None
+        print(f"Engine plays {result}")
+        return click_handler.play_move(self, *result.best_move)
+
+    def setup_board(self, fen, assign=True):
+        return setup.setup_board(self, fen, assign)
+
+    def generate_fen(self):
+        return generate_fen(self)
+
+    def assign_moves(self, color):
+        from Engine.move_assignment import assign_moves
+        return assign_moves(self, color)
+
+    def generate_moves(self, color=None):
+        from Engine.move_assignment import generate_moves
+        return generate_moves(self, color or self.turn)
+
+    def decode_move(self, move):
+        return decode_move(move)
+
+    def get_legal_moves(self, color):
+        from Engine.move_assignment import get_legal_moves
+        return get_legal_moves(self, color)
+
+    def in_check(self, color):
+        from Engine.move_assignment import in_check
+        return in_check(self, color)
+
+    def in_checkmate(self, color):
+        from Engine.move_assignment import in_checkmate
+        return in_checkmate(self, color)
+
+    def get_square(self, pos):
+        return self.squares[pos[1] * 8 + pos[0]]
+    
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < 8 and 0 <= pos[1] < 8
+
+    def get_piece(self, pos):
+        return self.piece_at[MAILBOX[pos[1] * 8 + pos[0]]]
+
+    def get_opposing_pieces(self, color):
+        return self.white_pieces if color == 'black' else self.black_pieces
+    
+    def get_allied_pieces(self, color):
+        return self.black_pieces if color == 'black' else self.white_pieces
+    
+    def get_king_pos(self, color):
+        return self.white_king.pos if color == 'white' else self.black_king.pos
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.tile_width = width // 8
+        self.tile_height = height // 8
+        for square in self.squares:
+            square.resize(self.tile_width, self.tile_height)
+        self.full_redraw = True
+
+    def mark_dirty(self, pos):
+        self.dirty_squares.add(pos)
+
+    def mark_move_dirty(self, move):
+        """Marks every square a move record touched, including en passant and castling side effects."""
+        start, end = move.start, move.end
+        self.dirty_squares.add(start)
+        self.dirty_squares.add(end)
+        if move.captured is not None:
+            self.dirty_squares.add(move.captured.pos)
+        if move.piece.type == "king" and abs(end[0] - start[0]) == 2:
+            y = end[1]
+            self.dirty_squares.update([(7, y), (5, y)] if end[0] == 6 else [(0, y), (3, y)])
+
+    def draw(self, display):
+        """
+        Repaints only the dirty squares (or everything after a resize) and
+        returns the rects that need pushing to the screen.
+        """
+        tile_size = (self.tile_width, self.tile_height)
+        if self.atlas is None:
+            self.atlas = SpriteAtlas(tile_size)
+        else:
+            self.atlas.rebuild(tile_size)
+        if self.full_redraw:
+            for square in self.squares:
+                square.draw(display, self.atlas, self.get_piece(square.pos))
+            self.full_redraw = False
+            self.dirty_squares.clear()
+            return [display.get_rect()]
+        rects = []
+        for pos in self.dirty_squares:
+            square = self.get_square(pos)
+            square.draw(display, self.atlas, self.get_piece(pos))
+            rects.append(square.rect)
+        self.dirty_squares.clear()
+        return rects
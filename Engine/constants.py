@@ -1,5 +1,5 @@
 # constants.py
-DEFAULT_CONFIG = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
+DEFAULT_CONFIG = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
 key = {
     'P': "pawn",
@@ -1,47 +1,81 @@
 import logging as log
 from Engine.constants import key, DEFAULT_CONFIG, backwards_key
+from Engine.mailbox import WHITE, BLACK, OFFBOARD, TYPE_CODES
 
-def generate_fen(board):
-    def get_piece_fen(piece):
-        if piece.color == 'white':
-            return backwards_key[piece.type]
-        else:
-            return backwards_key[piece.type].lower()
-    
-    rows = []
-    for rank in range(8):
-        empty_squares = 0
-        row = []
-        for file in range(8):
-            square = board.get_square((file, rank))
-            if square.occupying_piece:
-                if empty_squares > 0:
-                    row.append(str(empty_squares))
-                    empty_squares = 0
-                row.append(get_piece_fen(square.occupying_piece))
+def pos_to_coord(pos):
+    return 'abcdefgh'[pos[0]] + str(8 - pos[1])
+
+def coord_to_pos(coord):
+    return (ord(coord[0]) - ord('a'), 8 - int(coord[1]))
+
+def move_to_uci(start, end, promotion=None):
+    """(4, 6), (4, 4) -> 'e2e4'; promotions get the piece letter appended."""
+    suffix = backwards_key[promotion].lower() if promotion else ''
+    return pos_to_coord(start) + pos_to_coord(end) + suffix
+
+def uci_to_move(uci):
+    """'e7e8q' -> ((4, 1), (4, 0), 'queen')"""
+    promotion = key[uci[4].upper()] if len(uci) > 4 else None
+    return coord_to_pos(uci[0:2]), coord_to_pos(uci[2:4]), promotion
+
+def validate_fen(fen):
+    """
+    Raises ValueError unless fen has a placement of eight full ranks with one
+    king per side and w or b to move; the loaders assume as much.
+    """
+    fields = fen.split()
+    if len(fields) < 4:
+        raise ValueError(f"FEN needs at least 4 fields: {fen!r}")
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError(f"FEN placement needs 8 ranks: {fields[0]!r}")
+    for rank in ranks:
+        squares = 0
+        for char in rank:
+            if char in "12345678":
+                squares += int(char)
+            elif char.upper() in key:
+                squares += 1
             else:
-                empty_squares += 1
-        if empty_squares > 0:
-            row.append(str(empty_squares))
-        rows.append(''.join(row))
-    
-    board_fen = '/'.join(rows)
+                raise ValueError(f"bad FEN piece {char!r}")
+        if squares != 8:
+            raise ValueError(f"FEN rank {rank!r} is not 8 squares")
+    if fields[0].count('K') != 1 or fields[0].count('k') != 1:
+        raise ValueError("FEN needs exactly one king per side")
+    if fields[1] not in ('w', 'b'):
+        raise ValueError(f"side to move must be w or b, not {fields[1]!r}")
+
+# Mailbox code -> FEN letter, and the castling bit set (K=1, Q=2, k=4, q=8) -> its FEN field.
+FEN_LETTERS = [None] * (OFFBOARD + 1)
+for letter, type_name in key.items():
+    FEN_LETTERS[WHITE | TYPE_CODES[type_name]] = letter
+    FEN_LETTERS[BLACK | TYPE_CODES[type_name]] = letter.lower()
+CASTLING_FEN = [''.join(letter for bit, letter in ((1, 'K'), (2, 'Q'), (4, 'k'), (8, 'q')) if rights & bit) or '-' for rights in range(16)]
+RANK_STARTS = range(21, 101, 10)
+
+def placement_fen(board):
+    """The piece placement field, read straight off the board's mailbox."""
+    mailbox = board.mailbox
+    letters = FEN_LETTERS
+    parts = []
+    for start in RANK_STARTS:
+        empty = 0
+        for index in range(start, start + 8):
+            code = mailbox[index]
+            if code:
+                if empty:
+                    parts.append(str(empty))
+                    empty = 0
+                parts.append(letters[code])
+            else:
+                empty += 1
+        if empty:
+            parts.append(str(empty))
+        parts.append('/')
+    parts.pop()
+    return ''.join(parts)
+
+def generate_fen(board):
     active_color = 'w' if board.turn == 'white' else 'b'
-    
-    # Castling rights (logic preserved from your original code)
-    castling_rights = []
-    if board.white_king.moved and board.white_kingside_rook.moved:
-        castling_rights.append('K')
-    if board.white_king.moved and board.white_queenside_rook.moved:
-        castling_rights.append('Q')
-    if board.black_king.moved and board.black_queenside_rook.moved:
-        castling_rights.append('k')
-    if board.black_king.moved and board.black_kingside_rook.moved:
-        castling_rights.append('q')
-    castling_fen = ''.join(castling_rights) if castling_rights else '-'
-    
-    en_passant_fen = board.en_passant_square if board.en_passant_square else '-'
-    halfmove_clock = board.halfmove_clock
-    fullmove_number = board.fullmove_number
-    fen = f"{board_fen} {active_color} {castling_fen} {en_passant_fen} {halfmove_clock} {fullmove_number}"
-    return fen
\ No newline at end of file
+    en_passant_fen = pos_to_coord(board.en_passant_square) if board.en_passant_square else '-'
+    return f"{placement_fen(board)} {active_color} {CASTLING_FEN[board.castling]} {en_passant_fen} {board.halfmove_clock} {board.fullmove_number}"
@@ -0,0 +1,148 @@
+"""
+instrumentation.py
+Opt-in call counters and timers for the hot paths, for profiling real games
+without attaching cProfile. enable() swaps each target for a wrapper that
+counts calls and records how long they took; disable() puts the originals
+back, so while it's off nothing is wrapped and the cost is exactly zero.
+
+Times are inclusive: assign_moves includes the get_moves calls it makes.
+Each function keeps a histogram of call times in power-of-two microsecond
+buckets (bucket k holds calls that took [2**(k-1), 2**k) us; bucket 0 is
+under 1us), from which report() estimates the median and 99th percentile.
+
+    from Engine import instrumentation
+    instrumentation.enable()
+    ...                              # play, search, perft
+    print(instrumentation.report())  # or board.developer_insight()
+    instrumentation.export_json("profile.json")
+"""
+import json
+import time
+
+BUCKETS = 32
+
+enabled = False
+stats = {}
+patched = []
+
+class CallStats:
+    __slots__ = ("name", "calls", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def record(self, ns):
+        self.calls += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min((ns // 1000).bit_length(), BUCKETS - 1)] += 1
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.calls if self.calls else 0
+
+    def percentile(self, fraction):
+        """Upper edge, in ns, of the bucket holding the given fraction of calls (at most the slowest call)."""
+        target = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) * 1000, self.max_ns)
+        return 0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.mean_ns / 1000,
+            "min_us": (self.min_ns or 0) / 1000,
+            "max_us": self.max_ns / 1000,
+            # {"<upper edge in us>": calls} for the non-empty buckets
+            "histogram_us": {str(1 << bucket): count for bucket, count in enumerate(self.buckets) if count},
+        }
+
+def targets():
+    """(namespace, attribute, label) for every instrumented function. Imported here to avoid import cycles."""
+    from Engine import board, pieces, move_assignment, click_handler, setup
+    found = []
+    for cls in (pieces.Pawn, pieces.Knight, pieces.Bishop, pieces.Rook, pieces.Queen, pieces.King):
+        found.append((cls, "get_moves", f"{cls.__name__}.get_moves"))
+    # assign_moves is imported by name into these modules, so each binding is patched.
+    for module in (move_assignment, click_handler, setup):
+        found.append((module, "assign_moves", "assign_moves"))
+    for name in ("push", "pop", "remove_piece", "add_piece", "setup_board", "draw"):
+        found.append((board.Board, name, f"Board.{name}"))
+    found.append((board.Square, "draw", "Square.draw"))
+    return found
+
+def timed(function, call_stats):
+    clock = time.perf_counter_ns
+    record = call_stats.record
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(clock() - start)
+    wrapper.__wrapped__ = function
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    for namespace, attribute, label in targets():
+        original = namespace.__dict__[attribute]
+        call_stats = stats.get(label) or stats.setdefault(label, CallStats(label))
+        setattr(namespace, attribute, timed(original, call_stats))
+        patched.append((namespace, attribute, original))
+    enabled = True
+
+def disable():
+    global enabled
+    while patched:
+        namespace, attribute, original = patched.pop()
+        setattr(namespace, attribute, original)
+    enabled = False
+
+def reset():
+    stats.clear()
+    # Live wrappers still hold the old CallStats; rewrap so new calls are counted again.
+    if enabled:
+        disable()
+        enable()
+
+def snapshot():
+    return {label: call_stats.as_dict() for label, call_stats in sorted(stats.items()) if call_stats.calls}
+
+def export_json(path=None):
+    """Returns the collected stats as a dict, and writes them to path if given."""
+    data = {"enabled": enabled, "functions": snapshot()}
+    if path is not None:
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+            file.write("\n")
+    return data
+
+def report():
+    rows = [f"{'function':<22}{'calls':>10}{'total ms':>11}{'mean us':>10}{'p50 us':>9}{'p99 us':>9}{'max us':>10}"]
+    for label, call_stats in sorted(stats.items(), key=lambda item: -item[1].total_ns):
+        if not call_stats.calls:
+            continue
+        rows.append(f"{label:<22}{call_stats.calls:>10}{call_stats.total_ns / 1e6:>11.1f}{call_stats.mean_ns / 1000:>10.1f}"
+                    f"{call_stats.percentile(0.5) / 1000:>9.0f}{call_stats.percentile(0.99) / 1000:>9.0f}{call_stats.max_ns / 1000:>10.0f}")
+    if len(rows) == 1:
+        rows.append("no calls recorded" if enabled else "instrumentation is off")
+    return '\n'.join(rows)
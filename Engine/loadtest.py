@@ -0,0 +1,131 @@
+"""
+loadtest.py
+Load-test client for Engine/server.py. Plays many games at once, one
+connection per game: the client makes a random legal move, the server's
+engine replies, and so on for --plies plies. The round trip of every command
+is timed, and the client prints throughput and latency percentiles next to
+the server's own stats.
+
+python -m Engine.loadtest --local [--workers N] [--games 200] [--concurrency 100] [--plies 20] [--movetime 10]
+python -m Engine.loadtest --host 127.0.0.1 --port 8765 ...
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from Engine.instrumentation import CallStats
+from Engine.server import GameServer, latency_summary
+
+class Connection:
+    def __init__(self, reader, writer, latency):
+        self.reader = reader
+        self.writer = writer
+        self.latency = latency
+
+    async def request(self, line):
+        command = line.split()[0]
+        start_time = time.perf_counter_ns()
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+        reply = (await self.reader.readline()).decode().strip()
+        (self.latency.get(command) or self.latency.setdefault(command, CallStats(command))).record(time.perf_counter_ns() - start_time)
+        if not reply.startswith("ok"):
+            raise RuntimeError(f"{line!r} -> {reply!r}")
+        return reply[3:]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def play_game(host, port, plies, movetime, rng, latency):
+    """Plays one game and returns the number of plies actually played."""
+    reader, writer = await asyncio.open_connection(host, port)
+    connection = Connection(reader, writer, latency)
+    try:
+        game_id = (await connection.request("new")).split()[0]
+        for ply in range(plies):
+            if ply % 2 == 0:
+                moves = (await connection.request(f"legal {game_id}")).split()
+                reply = await connection.request(f"move {game_id} {rng.choice(moves)}")
+            else:
+                reply = await connection.request(f"go {game_id} {movetime}")
+            if "checkmate" in reply or "stalemate" in reply:
+                return ply + 1
+        return plies
+    finally:
+        await connection.request("quit")
+        await connection.close()
+
+async def run_load_test(host, port, games=200, concurrency=100, plies=20, movetime=10, seed=0):
+    """Plays games games with at most concurrency open at once; returns the client's report dict."""
+    latency = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(seed)
+
+    async def limited():
+        async with semaphore:
+            return await play_game(host, port, plies, movetime, random.Random(rng.random()), latency)
+
+    start_time = time.perf_counter()
+    played = await asyncio.gather(*(limited() for _ in range(games)))
+    elapsed = time.perf_counter() - start_time
+    commands = sum(call_stats.calls for call_stats in latency.values())
+    return {
+        "games": games,
+        "plies": sum(played),
+        "commands": commands,
+        "elapsed_s": elapsed,
+        "commands_per_s": commands / elapsed if elapsed else 0,
+        "latency": latency_summary(latency),
+    }
+
+async def server_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    connection = Connection(reader, writer, {})
+    try:
+        return json.loads(await connection.request("stats"))
+    finally:
+        await connection.close()
+
+def print_report(report, stats):
+    print(f"{report['games']} games, {report['plies']} plies, {report['commands']} commands in {report['elapsed_s']:.2f}s "
+          f"({report['commands_per_s']:,.0f} commands/s)")
+    for title, latency in (("client round trip", report["latency"]), ("server", stats["latency"])):
+        print(title)
+        print(f"  {'command':<8}{'calls':>8}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for command, row in latency.items():
+            print(f"  {command:<8}{row['calls']:>8}{row['mean_ms']:>10.2f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+
+async def run(args):
+    game_server = None
+    host, port = args.host, args.port
+    if args.local:
+        game_server = GameServer(args.workers, args.movetime, max(args.games, 1))
+        await game_server.start(host, 0)
+        port = game_server.port
+    try:
+        report = await run_load_test(host, port, args.games, args.concurrency, args.plies, args.movetime, args.seed)
+        print_report(report, await server_stats(host, port))
+    finally:
+        if game_server is not None:
+            await game_server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a game server with many concurrent games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--local", action="store_true", help="start a server in this process on a free port")
+    parser.add_argument("--workers", type=int, default=None, help="search processes for --local")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100, help="games (connections) open at once")
+    parser.add_argument("--plies", type=int, default=20)
+    parser.add_argument("--movetime", type=int, default=10, help="engine ms per move")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
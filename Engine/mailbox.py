@@ -0,0 +1,54 @@
+"""
+mailbox.py
+The Board's position as a flat 10x12 array of small ints. The 8x8 board sits
+in the middle with two sentinel ranks above and below and one sentinel file
+either side, so a knight jump or slider ray walking off the edge lands on
+OFFBOARD instead of needing a bounds check.
+
+    code = color bit | piece type (1-6); EMPTY is 0, OFFBOARD has both color bits
+
+With both color bits set, `not code & own_color` is true exactly for the
+squares a piece may move to: empty, or holding an enemy.
+"""
+
+EMPTY = 0
+WHITE = 8
+BLACK = 16
+OFFBOARD = WHITE | BLACK
+COLOR_MASK = WHITE | BLACK
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+TYPE_CODES = {"pawn": PAWN, "knight": KNIGHT, "bishop": BISHOP, "rook": ROOK, "queen": QUEEN, "king": KING}
+COLOR_CODES = {"white": WHITE, "black": BLACK}
+
+# y == 0 is rank 8, so "north" (towards black) is -10.
+NORTH, SOUTH, EAST, WEST = -10, 10, 1, -1
+ORTHOGONAL = (NORTH, SOUTH, EAST, WEST)
+DIAGONAL = (NORTH + EAST, NORTH + WEST, SOUTH + EAST, SOUTH + WEST)
+KING_STEPS = ORTHOGONAL + DIAGONAL
+KNIGHT_JUMPS = (-21, -19, -12, -8, 8, 12, 19, 21)
+
+# MAILBOX[y * 8 + x] -> mailbox index; SQUARE[index] -> y * 8 + x and POSITION[index] -> (x, y), or -1/None off the board.
+MAILBOX = tuple((y + 2) * 10 + x + 1 for y in range(8) for x in range(8))
+SQUARE = [-1] * 120
+POSITION = [None] * 120
+for sq, index in enumerate(MAILBOX):
+    SQUARE[index] = sq
+    POSITION[index] = (sq % 8, sq // 8)
+SQUARE = tuple(SQUARE)
+POSITION = tuple(POSITION)
+
+def mailbox_index(pos):
+    return MAILBOX[pos[1] * 8 + pos[0]]
+
+def piece_code(color, type):
+    return COLOR_CODES[color] | TYPE_CODES[type]
+
+def empty_mailbox():
+    return list(EMPTY_MAILBOX)
+
+# Every square EMPTY, every sentinel OFFBOARD; copied into a board's mailbox to clear it.
+EMPTY_MAILBOX = [OFFBOARD] * 120
+for index in MAILBOX:
+    EMPTY_MAILBOX[index] = EMPTY
+EMPTY_MAILBOX = tuple(EMPTY_MAILBOX)
@@ -1,3 +1,13 @@
+from Engine.moves import EN_PASSANT, CASTLE, DOUBLE_PUSH, decode_move, new_move_list
+from Engine.mailbox import MAILBOX, COLOR_CODES, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, NORTH, SOUTH, ORTHOGONAL, DIAGONAL, KING_STEPS, KNIGHT_JUMPS
+from Engine.bitboard import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, ALL_SQUARES, rook_attacks, bishop_attacks
+
+PROMOTION_TYPES = ["queen", "rook", "bishop", "knight"]
+
+# Squares a rook/bishop on each square would see on an empty board.
+ROOK_LINES = [rook_attacks(sq, 0) for sq in range(64)]
+BISHOP_LINES = [bishop_attacks(sq, 0) for sq in range(64)]
+
 def find_squares_between(start, end):
     squares = [start, end]
     dx = end[0] - start[0]
@@ -13,50 +23,202 @@ def find_squares_between(start, end):
             squares.append((start[0] + i * dx // abs(dx), start[1] + i * dy // abs(dy)))
     return squares
 
+def is_square_attacked(board, pos, by_color):
+    """
+    Looks outward from pos through the mailbox for anything of by_color that
+    attacks it. Cheaper than generating every opposing move, and it also sees
+    squares that are only defended (which get_moves leaves out).
+    """
+    mailbox = board.mailbox
+    index = MAILBOX[pos[1] * 8 + pos[0]]
+    color = COLOR_CODES[by_color]
+
+    knight = color | KNIGHT
+    for jump in KNIGHT_JUMPS:
+        if mailbox[index + jump] == knight:
+            return True
+
+    # White pawns move towards y == 0, so they attack from the row below.
+    pawn = color | PAWN
+    behind = index + SOUTH if by_color == "white" else index + NORTH
+    if mailbox[behind - 1] == pawn or mailbox[behind + 1] == pawn:
+        return True
+
+    king = color | KING
+    for step in KING_STEPS:
+        if mailbox[index + step] == king:
+            return True
+
+    queen = color | QUEEN
+    for directions, slider in ((ORTHOGONAL, color | ROOK), (DIAGONAL, color | BISHOP)):
+        for direction in directions:
+            target = index + direction
+            code = mailbox[target]
+            while code == EMPTY:
+                target += direction
+                code = mailbox[target]
+            if code == slider or code == queen:
+                return True
+    return False
+
+def leaves_king_safe(board, piece, new_pos):
+    """Plays the move on the board, checks the king and takes it back."""
+    original_pos = piece.pos
+    captured_piece = piece.move(board, new_pos, real_move=False)
+    king_pos = board.get_king_pos(piece.color)
+    safe = not is_square_attacked(board, king_pos, "white" if piece.color == "black" else "black")
+    piece.revert_move(board, original_pos, new_pos, captured_piece)
+    return safe
+
 def clear_moves(board):
     for piece in board.pieces:
         piece.legal_moves = []
 
-def assign_moves(board, color):
-    clear_moves(board)
-    attacking_pieces = []
-    attacked_squares = []
-    king_pos = board.get_king_pos(color)
+def occupancy(pieces):
+    occupied = 0
+    for piece in pieces:
+        x, y = piece.pos
+        occupied |= 1 << (y * 8 + x)
+    return occupied
+
+def attacked_squares(board, by_color, occupied):
+    """Bitset of every square by_color attacks or defends, with sliders blocked by occupied."""
+    pawn_attacks = PAWN_ATTACKS[0 if by_color == "white" else 1]
+    attacked = 0
+    for piece in board.get_allied_pieces(by_color):
+        x, y = piece.pos
+        sq = y * 8 + x
+        type = piece.type
+        if type == "pawn":
+            attacked |= pawn_attacks[sq]
+        elif type == "knight":
+            attacked |= KNIGHT_ATTACKS[sq]
+        elif type == "bishop":
+            attacked |= bishop_attacks(sq, occupied)
+        elif type == "rook":
+            attacked |= rook_attacks(sq, occupied)
+        elif type == "queen":
+            attacked |= rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+        else:
+            attacked |= KING_ATTACKS[sq]
+    return attacked
+
+def check_and_pin_masks(board, color, occupied, allied):
+    """
+    Returns (checkers, check_mask, pin_masks). With one checker, check_mask
+    holds the checker and the squares between it and the king (where a block
+    or capture must land); with two it is empty. pin_masks maps the square of
+    each pinned piece to the ray it may still move along.
+    """
+    king_x, king_y = board.get_king_pos(color)
+    king_sq = king_y * 8 + king_x
+    pawn_attacks = PAWN_ATTACKS[0 if color == "white" else 1][king_sq]
+    checkers = 0
+    check_mask = ALL_SQUARES
+    pin_masks = {}
     for piece in board.get_opposing_pieces(color):
-        new_attacked_squares = piece.get_moves(board)
-        if king_pos in new_attacked_squares:
-            attacking_pieces.append(piece)
-        attacked_squares += new_attacked_squares
-    king = board.white_king if color == 'white' else board.black_king
-    king.legal_moves = [move for move in king.get_moves(board) if move not in attacked_squares]
-    if len(attacking_pieces) > 1:
-        return  # Double check – king must move.
-    elif len(attacking_pieces) == 1:
-        blocking_squares = find_squares_between(king_pos, attacking_pieces[0].pos)
-        for piece in board.get_allied_pieces(color):
-            if piece.type == 'king':
-                continue
-            piece.legal_moves = [move for move in piece.get_moves(board) if move in blocking_squares]
-    else:
-        for piece in board.get_allied_pieces(color):
-            if piece.type == 'king':
+        x, y = piece.pos
+        sq = y * 8 + x
+        bit = 1 << sq
+        type = piece.type
+        if type == "knight":
+            attacking = KNIGHT_ATTACKS[king_sq] & bit
+        elif type == "pawn":
+            attacking = pawn_attacks & bit
+        elif ((type == "rook" or type == "queen") and ROOK_LINES[king_sq] & bit) or ((type == "bishop" or type == "queen") and BISHOP_LINES[king_sq] & bit):
+            between = BETWEEN[king_sq][sq]
+            blockers = between & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & allied:
+                # Exactly one piece in the way, and it's ours: it's pinned.
+                pin_masks[blockers.bit_length() - 1] = between | bit
                 continue
-            piece.legal_moves = piece.get_moves(board)
+            attacking = not blockers
+            bit |= between
+        else:
+            continue
+        if attacking:
+            checkers += 1
+            check_mask = bit if checkers == 1 else 0
+    return checkers, check_mask, pin_masks
+
+def assign_moves(board, color):
+    """
+    Keeps each pseudo-legal move that lands inside the check mask and the
+    piece's pin ray; king moves are tested against the enemy's attacked
+    squares. Only en passant, which removes two pieces from a line, still
+    plays the move out to check it.
+    """
+    clear_moves(board)
+    allies = board.get_allied_pieces(color)
+    enemy = "white" if color == "black" else "black"
+    king = board.white_king if color == "white" else board.black_king
+    king_x, king_y = king.pos
+    allied = occupancy(allies)
+    occupied = allied | occupancy(board.get_opposing_pieces(color))
+    # Without the king, so it can't step back along a slider's line and look safe.
+    attacked = attacked_squares(board, enemy, occupied & ~(1 << (king_y * 8 + king_x)))
+    checkers, check_mask, pin_masks = check_and_pin_masks(board, color, occupied, allied)
+    en_passant = board.en_passant_square
+
+    for piece in list(allies):
+        moves = piece.get_moves(board)
+        if piece is king:
+            piece.legal_moves = [move for move in moves if not attacked >> (move[1] * 8 + move[0]) & 1]
+            continue
+        if checkers > 1:
+            continue
+        x, y = piece.pos
+        mask = check_mask & pin_masks.get(y * 8 + x, ALL_SQUARES)
+        legal = []
+        for move in moves:
+            if piece.type == "pawn" and move == en_passant and move[0] != x:
+                if leaves_king_safe(board, piece, move):
+                    legal.append(move)
+            elif mask >> (move[1] * 8 + move[0]) & 1:
+                legal.append(move)
+        piece.legal_moves = legal
+
+def generate_moves(board, color):
+    """
+    The legal moves of color as an array of packed moves (see Engine/moves.py),
+    with one entry per promotion choice.
+    """
+    assign_moves(board, color)
+    last_rank = 0 if color == "white" else 7
+    en_passant = board.en_passant_square
+    moves = new_move_list()
+    for piece in board.get_allied_pieces(color):
+        x, y = piece.pos
+        frm = y * 8 + x
+        type = piece.type
+        for end in piece.legal_moves:
+            move = frm | ((end[1] * 8 + end[0]) << 6)
+            if type == "pawn":
+                if end[1] == last_rank:
+                    # Queen, rook, bishop, knight.
+                    for promotion in (4, 3, 2, 1):
+                        moves.append(move | (promotion << 12))
+                    continue
+                if abs(end[1] - y) == 2:
+                    move |= DOUBLE_PUSH << 15
+                elif end == en_passant and end[0] != x:
+                    move |= EN_PASSANT << 15
+            elif type == "king" and abs(end[0] - x) == 2:
+                move |= CASTLE << 15
+            moves.append(move)
+    return moves
+
+def get_legal_moves(board, color):
+    """generate_moves unpacked into (start, end, promotion) tuples."""
+    return [decode_move(move) for move in generate_moves(board, color)]
 
 def in_check(board, color):
     king_pos = board.get_king_pos(color)
-    opposing_pieces = board.get_opposing_pieces(color)
-    return any(king_pos in piece.legal_moves for piece in opposing_pieces if piece.status)
+    return is_square_attacked(board, king_pos, "white" if color == "black" else "black")
 
 def in_checkmate(board, color):
     if not in_check(board, color):
         return False
-    if color == 'white':
-        if board.white_king.legal_moves != []:
-            return False
-    else:
-        if board.black_king.legal_moves != []:
-            return False
     for piece in board.get_allied_pieces(color):
         if piece.status and piece.legal_moves != []:
             return False
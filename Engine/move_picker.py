@@ -0,0 +1,204 @@
+"""
+move_picker.py
+Legal moves for the search, one stage at a time:
+
+    1. the hash move (from the transposition table)
+    2. captures, en passant and queen promotions, most valuable victim first
+       and least valuable attacker among equals (MVV-LVA)
+    3. the killer moves: quiet moves that caused a cutoff at the same ply
+    4. the remaining quiet moves, by history score
+
+pick_moves is a generator, and each stage is only generated once the one
+before it has run out, so a node that cuts off on the hash move or a capture
+never looks at its quiet moves. Unlike generate_moves it doesn't touch
+piece.legal_moves or look at the opponent's moves: moves are tested against
+the side to move's check and pin masks instead.
+"""
+from Engine.moves import EN_PASSANT, CASTLE, DOUBLE_PUSH, POSITIONS
+from Engine.mailbox import MAILBOX, SQUARE, COLOR_CODES, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, ORTHOGONAL, DIAGONAL, KING_STEPS, KNIGHT_JUMPS
+from Engine.move_assignment import is_square_attacked, leaves_king_safe, occupancy, check_and_pin_masks
+from Engine.bitboard import ALL_SQUARES
+
+SLIDES = {BISHOP: DIAGONAL, ROOK: ORTHOGONAL, QUEEN: ORTHOGONAL + DIAGONAL}
+LEAPS = {KNIGHT: KNIGHT_JUMPS, KING: KING_STEPS}
+# Rook, bishop and knight; queen promotions go with the captures.
+UNDERPROMOTIONS = (3, 2, 1)
+
+def legality(board, color):
+    """
+    Returns is_legal(piece, move) for pseudo-legal moves of color, built on
+    one pass over the pieces for the check and pin masks.
+    """
+    allies = board.get_allied_pieces(color)
+    enemy = "white" if color == "black" else "black"
+    king = board.white_king if color == "white" else board.black_king
+    allied = occupancy(allies)
+    occupied = allied | occupancy(board.get_opposing_pieces(color))
+    checkers, check_mask, pin_masks = check_and_pin_masks(board, color, occupied, allied)
+    mailbox = board.mailbox
+    king_index = MAILBOX[king.pos[1] * 8 + king.pos[0]]
+
+    def is_legal(piece, move):
+        to = (move >> 6) & 63
+        if piece is king:
+            # Off its square, so it can't step back along a slider's line and look safe.
+            mailbox[king_index] = EMPTY
+            safe = not is_square_attacked(board, POSITIONS[to], enemy)
+            mailbox[king_index] = king.code
+            return safe
+        if checkers > 1:
+            return False
+        if move >> 15 == EN_PASSANT:
+            return leaves_king_safe(board, piece, POSITIONS[to])
+        return (check_mask & pin_masks.get(move & 63, ALL_SQUARES)) >> to & 1
+
+    return is_legal
+
+def generate_captures(board, color):
+    """Pseudo-legal captures (every promotion choice), en passant and queen promotions of color, packed."""
+    mailbox = board.mailbox
+    own = COLOR_CODES[color]
+    last_rank = 0 if color == "white" else 7
+    en_passant = board.en_passant_square
+    moves = []
+    for piece in board.get_allied_pieces(color):
+        x, y = piece.pos
+        frm = y * 8 + x
+        index = MAILBOX[frm]
+        ptype = piece.code & 7
+        if ptype == PAWN:
+            forward = piece.direction * 10
+            promotes = y + piece.direction == last_rank
+            for side in (-1, 1):
+                target = index + forward + side
+                code = mailbox[target]
+                to = SQUARE[target]
+                if code != EMPTY and not code & own:
+                    if promotes:
+                        moves.extend(frm | (to << 6) | (promotion << 12) for promotion in (4, 3, 2, 1))
+                    else:
+                        moves.append(frm | (to << 6))
+                elif code == EMPTY and POSITIONS[to] == en_passant:
+                    moves.append(frm | (to << 6) | (EN_PASSANT << 15))
+            if promotes and mailbox[index + forward] == EMPTY:
+                moves.append(frm | ((frm + piece.direction * 8) << 6) | (4 << 12))
+        elif ptype in LEAPS:
+            for step in LEAPS[ptype]:
+                code = mailbox[index + step]
+                if code != EMPTY and not code & own:
+                    moves.append(frm | (SQUARE[index + step] << 6))
+        else:
+            for direction in SLIDES[ptype]:
+                target = index + direction
+                code = mailbox[target]
+                while code == EMPTY:
+                    target += direction
+                    code = mailbox[target]
+                if not code & own:
+                    moves.append(frm | (SQUARE[target] << 6))
+    return moves
+
+def generate_quiets(board, color):
+    """Pseudo-legal moves of color that capture nothing, with castling, double pushes and underpromotions; packed."""
+    mailbox = board.mailbox
+    last_rank = 0 if color == "white" else 7
+    moves = []
+    for piece in board.get_allied_pieces(color):
+        x, y = piece.pos
+        frm = y * 8 + x
+        ptype = piece.code & 7
+        for end in piece.get_moves(board):
+            to = end[1] * 8 + end[0]
+            if mailbox[MAILBOX[to]] != EMPTY:
+                continue
+            move = frm | (to << 6)
+            if ptype == PAWN:
+                if end[0] != x:
+                    continue  # en passant
+                if end[1] == last_rank:
+                    moves.extend(move | (promotion << 12) for promotion in UNDERPROMOTIONS)
+                    continue
+                if abs(end[1] - y) == 2:
+                    move |= DOUBLE_PUSH << 15
+            elif ptype == KING and abs(end[0] - x) == 2:
+                move |= CASTLE << 15
+            moves.append(move)
+    return moves
+
+def is_quiet(board, move):
+    """True for the moves generate_quiets makes: nothing captured and no queen promotion."""
+    return board.mailbox[MAILBOX[(move >> 6) & 63]] == EMPTY and (move >> 12) & 7 != 4 and move >> 15 != EN_PASSANT
+
+def is_pseudo_legal(board, move, color):
+    """
+    Whether move, taken from another position (the transposition table or a
+    killer slot), is a move color's pieces could make here, flags included.
+    """
+    piece = board.piece_at[MAILBOX[move & 63]]
+    if piece is None or piece.color != color:
+        return False
+    x, y = piece.pos
+    end = POSITIONS[(move >> 6) & 63]
+    if end not in piece.get_moves(board):
+        return False
+    ptype = piece.code & 7
+    flags = 0
+    if ptype == PAWN:
+        if (end[1] == 0 or end[1] == 7) != bool((move >> 12) & 7):
+            return False
+        if abs(end[1] - y) == 2:
+            flags = DOUBLE_PUSH
+        elif end[0] != x and board.mailbox[MAILBOX[(move >> 6) & 63]] == EMPTY:
+            flags = EN_PASSANT
+    elif (move >> 12) & 7:
+        return False
+    elif ptype == KING and abs(end[0] - x) == 2:
+        flags = CASTLE
+    return move >> 15 == flags
+
+def pick_moves(board, tt_move=0, killers=(), history=None, captures_only=False):
+    """
+    Yields the side to move's legal moves, packed, stage by stage (see the
+    module docstring). history is indexed by move & 4095 (from and to
+    squares). With captures_only the picker stops after the captures, for
+    the quiescence search.
+    """
+    color = board.turn
+    is_legal = legality(board, color)
+    piece_at = board.piece_at
+
+    if tt_move and not captures_only and is_pseudo_legal(board, tt_move, color) and is_legal(piece_at[MAILBOX[tt_move & 63]], tt_move):
+        yield tt_move
+    else:
+        tt_move = 0
+
+    def victim_first(move):
+        attacker = piece_at[MAILBOX[move & 63]]
+        victim = piece_at[MAILBOX[(move >> 6) & 63]]
+        # Most valuable victim, least valuable attacker; en passant takes a pawn.
+        score = (victim.value if victim is not None else 1) * 100 - attacker.value
+        if (move >> 12) & 7 == 4:
+            score += 9000
+        return score
+
+    captures = generate_captures(board, color)
+    captures.sort(key=victim_first, reverse=True)
+    for move in captures:
+        if move != tt_move and is_legal(piece_at[MAILBOX[move & 63]], move):
+            yield move
+    if captures_only:
+        return
+
+    tried = [tt_move]
+    for move in killers:
+        # A killer came from a sibling position; it may not be a move here at all.
+        if move and move not in tried and is_quiet(board, move) and is_pseudo_legal(board, move, color) and is_legal(piece_at[MAILBOX[move & 63]], move):
+            tried.append(move)
+            yield move
+
+    quiets = generate_quiets(board, color)
+    if history is not None:
+        quiets.sort(key=lambda move: history[move & 4095], reverse=True)
+    for move in quiets:
+        if move not in tried and is_legal(piece_at[MAILBOX[move & 63]], move):
+            yield move
@@ -0,0 +1,81 @@
+"""
+moves.py
+Moves packed into one integer, shared by Board and BitboardBoard:
+
+    from         6   square index, y * 8 + x (board.squares[from], or mailbox.MAILBOX[from])
+    to           6
+    promotion    3   index into TYPES, 0 if none
+    flags        3   EN_PASSANT, CASTLE, DOUBLE_PUSH
+
+Move lists are array('I') of these, and Board.moves holds one MoveRecord
+per ply, so long games don't pile up dicts and tuples.
+"""
+from array import array
+from Engine.fen_utils import move_to_uci
+
+TYPES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+PROMOTION_CODES = {"knight": 1, "bishop": 2, "rook": 3, "queen": 4}
+
+# Move flags.
+EN_PASSANT = 1
+CASTLE = 2
+DOUBLE_PUSH = 4
+
+# One shared tuple per square, so decoding a move doesn't allocate positions.
+POSITIONS = tuple((sq % 8, sq // 8) for sq in range(64))
+
+def encode_move(frm, to, promotion=0, flags=0):
+    return frm | (to << 6) | (promotion << 12) | (flags << 15)
+
+def to_pos(sq):
+    return POSITIONS[sq]
+
+def to_square(pos):
+    return pos[1] * 8 + pos[0]
+
+def move_from(move):
+    return move & 63
+
+def move_to(move):
+    return (move >> 6) & 63
+
+def move_promotion(move):
+    """The promotion piece type, or None."""
+    promotion = (move >> 12) & 7
+    return TYPES[promotion] if promotion else None
+
+def move_flags(move):
+    return move >> 15
+
+def decode_move(move):
+    """Packed move -> (start, end, promotion) in Board coordinates."""
+    return POSITIONS[move & 63], POSITIONS[(move >> 6) & 63], move_promotion(move)
+
+def new_move_list(moves=()):
+    return array('I', moves)
+
+class MoveRecord:
+    """Everything Board.unmake_move needs to take one ply back in constant time."""
+    __slots__ = ("move", "piece", "captured", "promotion", "moved", "castling", "en_passant_square", "halfmove_clock", "hash")
+
+    def __init__(self, move, piece, moved, castling, en_passant_square, halfmove_clock, hash):
+        self.move = move
+        self.piece = piece
+        self.captured = None
+        self.promotion = None
+        self.moved = moved
+        self.castling = castling
+        self.en_passant_square = en_passant_square
+        self.halfmove_clock = halfmove_clock
+        self.hash = hash
+
+    @property
+    def start(self):
+        return POSITIONS[self.move & 63]
+
+    @property
+    def end(self):
+        return POSITIONS[(self.move >> 6) & 63]
+
+    def __repr__(self):
+        return move_to_uci(*decode_move(self.move))
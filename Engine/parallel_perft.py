@@ -0,0 +1,132 @@
+"""
+parallel_perft.py
+Perft and perft-divide spread over a process pool. The tree is cut at
+split_depth: every line of that many moves becomes one task, and a worker
+rebuilds a headless board from the FEN, plays the line and counts the rest.
+The results are summed back into a per-root-move divide table.
+
+python -m Engine.parallel_perft "<fen>" <depth> [--workers N] [--split-depth D] [--backend board|bitboard]
+python -m Engine.parallel_perft --epd perftsuite.epd [--max-depth D] ...
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Engine.backends import create_board, BACKENDS
+from Engine.fen_utils import move_to_uci, uci_to_move
+from Engine.perft import report
+
+def count_line(fen, line, depth, backend):
+    """Worker: nodes below the position reached by playing line from fen."""
+    board = create_board(fen, backend)
+    for uci in line:
+        board.make_move(*uci_to_move(uci))
+    return line[0], board.perft(depth)
+
+def split_lines(board, depth):
+    """Every legal line of depth moves from board, as lists of UCI strings."""
+    if depth == 0:
+        return [[]]
+    lines = []
+    for start, end, promotion in board.get_legal_moves(board.turn):
+        board.make_move(start, end, promotion)
+        uci = move_to_uci(start, end, promotion)
+        # A line that ends in mate early simply contributes no tasks.
+        lines.extend([uci] + rest for rest in split_lines(board, depth - 1))
+        board.unmake_move()
+    return lines
+
+def choose_split_depth(board, depth, workers):
+    """Shallowest cut that gives every worker a few tasks to balance load."""
+    split_depth = 1
+    while split_depth < depth - 1 and len(split_lines(board, split_depth)) < 4 * workers:
+        split_depth += 1
+    return split_depth
+
+def parallel_perft_divide(fen, depth, workers=None, split_depth=None, backend="board", verbose=False):
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    board = create_board(fen, backend)
+    if depth <= 1:
+        divide = board.perft_divide(depth, verbose=False)
+    else:
+        if split_depth is None:
+            split_depth = choose_split_depth(board, depth, workers)
+        split_depth = max(1, min(split_depth, depth - 1))
+        lines = split_lines(board, split_depth)
+        divide = {move_to_uci(*move): 0 for move in board.get_legal_moves(board.turn)}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(count_line, fen, line, depth - split_depth, backend) for line in lines]
+            for future in as_completed(futures):
+                root_move, nodes = future.result()
+                divide[root_move] += nodes
+    if verbose:
+        for move in sorted(divide):
+            print(f"{move}: {divide[move]}")
+        report(depth, sum(divide.values()), time.perf_counter() - start_time)
+    return divide
+
+def parallel_perft(fen, depth, workers=None, split_depth=None, backend="board", verbose=False):
+    if depth <= 0:
+        return 1
+    start_time = time.perf_counter()
+    nodes = sum(parallel_perft_divide(fen, depth, workers, split_depth, backend).values())
+    if verbose:
+        report(depth, nodes, time.perf_counter() - start_time)
+    return nodes
+
+def read_epd_suite(path):
+    """Perft EPD lines: '<fen> ;D1 20 ;D2 400 ...' -> (fen, {depth: nodes})."""
+    with open(path) as epd:
+        for line in epd:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.split(';')]
+            fen = fields[0]
+            # EPD positions may leave out the move counters.
+            if len(fen.split()) == 4:
+                fen += " 0 1"
+            expected = {}
+            for field in fields[1:]:
+                depth_label, nodes = field.split()
+                expected[int(depth_label.lstrip('Dd'))] = int(nodes)
+            yield fen, expected
+
+def run_epd_suite(path, max_depth=None, workers=None, split_depth=None, backend="board"):
+    """Checks every position in an EPD suite; returns the list of failures."""
+    failures = []
+    for fen, expected in read_epd_suite(path):
+        for depth, nodes in sorted(expected.items()):
+            if max_depth is not None and depth > max_depth:
+                break
+            start_time = time.perf_counter()
+            result = parallel_perft(fen, depth, workers, split_depth, backend)
+            status = "ok" if result == nodes else "FAILED"
+            print(f"{status} {fen} D{depth}: expected {nodes}, got {result} ({time.perf_counter() - start_time:.2f}s)")
+            if result != nodes:
+                failures.append((fen, depth, nodes, result))
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft across a process pool.")
+    parser.add_argument("fen", nargs="?")
+    parser.add_argument("depth", nargs="?", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--split-depth", type=int, default=None)
+    parser.add_argument("--backend", choices=BACKENDS, default="board")
+    parser.add_argument("--epd", help="run a perft EPD suite instead of one position")
+    parser.add_argument("--max-depth", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.epd:
+        failures = run_epd_suite(args.epd, args.max_depth, args.workers, args.split_depth, args.backend)
+        print(f"{len(failures)} failures")
+        return 1 if failures else 0
+    if args.fen is None or args.depth is None:
+        parser.error("a FEN and a depth are required without --epd")
+    parallel_perft_divide(args.fen, args.depth, args.workers, args.split_depth, args.backend, verbose=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
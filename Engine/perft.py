@@ -0,0 +1,56 @@
+"""
+perft.py
+Counts the leaf nodes of the legal move tree to a fixed depth. The tree is
+walked with Board.push/pop on packed moves, so the board is never rebuilt.
+"""
+import sys
+import time
+from Engine.fen_utils import move_to_uci
+from Engine.moves import decode_move
+
+def count_nodes(board, depth):
+    if depth <= 0:
+        return 1
+    moves = board.generate_moves()
+    # Bulk count: the last ply doesn't need to be played out.
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += count_nodes(board, depth - 1)
+        board.pop()
+    return nodes
+
+def perft(board, depth, verbose=False):
+    start_time = time.perf_counter()
+    nodes = count_nodes(board, depth)
+    if verbose:
+        report(depth, nodes, time.perf_counter() - start_time)
+    return nodes
+
+def perft_divide(board, depth, verbose=True):
+    """Returns {uci move: node count} for every legal root move; depth must be at least 1."""
+    if depth < 1:
+        raise ValueError(f"perft_divide needs a depth of at least 1, not {depth}")
+    start_time = time.perf_counter()
+    divide = {}
+    for move in board.generate_moves():
+        board.push(move)
+        divide[move_to_uci(*decode_move(move))] = count_nodes(board, depth - 1)
+        board.pop()
+    if verbose:
+        for move in sorted(divide):
+            print(f"{move}: {divide[move]}")
+        report(depth, sum(divide.values()), time.perf_counter() - start_time)
+    return divide
+
+def report(depth, nodes, elapsed):
+    nps = nodes / elapsed if elapsed > 0 else 0
+    print(f"Depth {depth}: {nodes} nodes in {elapsed:.2f}s ({nps:,.0f} nodes/s)")
+
+if __name__ == "__main__":
+    # python -m Engine.perft "<fen>" <depth> [board|bitboard]
+    from Engine.backends import create_board
+    board = create_board(sys.argv[1], sys.argv[3] if len(sys.argv) > 3 else "board")
+    board.perft_divide(int(sys.argv[2]))
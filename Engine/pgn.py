@@ -0,0 +1,318 @@
+"""
+pgn.py
+Reads and writes PGN. read_games streams games out of a file one at a
+time, so an archive of millions of games never sits in memory; replay plays
+a game's SAN moves on a headless Board, checking each one against the legal
+move generator; write_game turns a Board's move history back into PGN.
+
+SAN goes through the same packed moves as the rest of the engine: a SAN
+string is matched against board.generate_moves(), so an illegal or
+ambiguous move is an error rather than a guess. Needs the piece-list Board,
+which can say what stands on a square.
+
+python -m Engine.pgn games.pgn [--workers N] [--batch-size N] [--limit N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Engine.analyze import batched
+from Engine.backends import create_board
+from Engine.constants import DEFAULT_CONFIG
+from Engine.mailbox import MAILBOX, COLOR_MASK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from Engine.moves import CASTLE, EN_PASSANT
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+SEVEN_TAG_ROSTER = (("Event", "?"), ("Site", "?"), ("Date", "????.??.??"), ("Round", "?"), ("White", "?"), ("Black", "?"), ("Result", "*"))
+SAN_PIECES = {'N': KNIGHT, 'B': BISHOP, 'R': ROOK, 'Q': QUEEN, 'K': KING}
+PIECE_LETTERS = {code: letter for letter, code in SAN_PIECES.items()}
+# Packed promotion code (index into moves.TYPES) <-> SAN letter
+PROMOTION_LETTERS = {1: 'N', 2: 'B', 3: 'R', 4: 'Q'}
+SAN_PROMOTIONS = {letter: code for code, letter in PROMOTION_LETTERS.items()}
+SQUARE_NAMES = tuple('abcdefgh'[sq % 8] + str(8 - sq // 8) for sq in range(64))
+SQUARES = {name: sq for sq, name in enumerate(SQUARE_NAMES)}
+
+HEADER = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+MOVETEXT_TOKEN = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|[()]|\d+\.+|1-0|0-1|1/2-1/2|\*|[^\s{}();$]+')
+SAN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?[+#]?[!?]*$')
+
+class PGNGame:
+    def __init__(self, headers, moves, result):
+        self.headers = headers
+        self.moves = moves
+        self.result = result
+
+    @property
+    def fen(self):
+        """The starting position: the FEN tag if the game has one, otherwise the standard start."""
+        return self.headers.get("FEN", DEFAULT_CONFIG)
+
+    def __repr__(self):
+        return f"{self.headers.get('White', '?')} - {self.headers.get('Black', '?')} {self.result} ({len(self.moves)} plies)"
+
+def parse_movetext(text):
+    """Main-line SAN moves and the result token; comments, NAGs and variations are skipped."""
+    moves = []
+    result = "*"
+    depth = 0
+    for token in MOVETEXT_TOKEN.findall(text):
+        first = token[0]
+        if first == '(':
+            depth += 1
+        elif first == ')':
+            depth -= 1
+        elif depth or first in '{;$' or first.isdigit() and token.rstrip('.').isdigit():
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return moves, result
+
+def read_games(stream):
+    """Yields a PGNGame for each game in stream, reading one game at a time."""
+    headers = {}
+    movetext = []
+    open_braces = 0
+    for line in stream:
+        stripped = line.strip()
+        # A '[' or '%' inside a brace comment that runs over several lines doesn't start anything.
+        if not open_braces:
+            if stripped.startswith('%'):
+                continue
+            if stripped.startswith('['):
+                if movetext:
+                    yield PGNGame(headers, *parse_movetext('\n'.join(movetext)))
+                    headers, movetext = {}, []
+                match = HEADER.match(stripped)
+                if match:
+                    headers[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+                continue
+        if stripped:
+            # A game ends at its result token, so one without tags can follow straight on.
+            if movetext and not open_braces and movetext[-1].rsplit(None, 1)[-1] in RESULTS:
+                yield PGNGame(headers, *parse_movetext('\n'.join(movetext)))
+                headers, movetext = {}, []
+            movetext.append(stripped)
+            text = stripped if open_braces else stripped.split(';', 1)[0]
+            open_braces = max(0, open_braces + text.count('{') - text.count('}'))
+    if movetext or headers:
+        yield PGNGame(headers, *parse_movetext('\n'.join(movetext)))
+
+def san_to_move(board, san, moves=None):
+    """The packed legal move SAN names; ValueError if there is no such move or more than one."""
+    if moves is None:
+        moves = board.generate_moves()
+    mailbox = board.mailbox
+    plain = san.rstrip('+#!?')
+    if plain in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        # Castling is the king moving two files; kingside lands on the g-file.
+        file = 6 if len(plain) == 3 else 2
+        found = [move for move in moves if move >> 15 == CASTLE and ((move >> 6) & 63) % 8 == file]
+    else:
+        match = SAN.match(san)
+        if match is None:
+            raise ValueError(f"Unreadable SAN move: {san}")
+        letter, from_file, from_rank, to_name, promotion = match.groups()
+        piece = SAN_PIECES[letter] if letter else PAWN
+        to = SQUARES[to_name]
+        promotion = SAN_PROMOTIONS[promotion] if promotion else 0
+        found = []
+        for move in moves:
+            if (move >> 6) & 63 != to or (move >> 12) & 7 != promotion:
+                continue
+            frm = move & 63
+            if mailbox[MAILBOX[frm]] & 7 != piece:
+                continue
+            if from_file and 'abcdefgh'[frm % 8] != from_file:
+                continue
+            if from_rank and str(8 - frm // 8) != from_rank:
+                continue
+            found.append(move)
+    if len(found) != 1:
+        raise ValueError(f"{'Ambiguous' if found else 'Illegal'} move {san} in {board.generate_fen()}")
+    return found[0]
+
+def move_to_san(board, move, moves=None):
+    """SAN for the packed legal move, with + or # found by playing it."""
+    if moves is None:
+        moves = board.generate_moves()
+    mailbox = board.mailbox
+    frm, to = move & 63, (move >> 6) & 63
+    piece = mailbox[MAILBOX[frm]] & 7
+    if move >> 15 == CASTLE:
+        san = "O-O" if to % 8 == 6 else "O-O-O"
+    else:
+        capture = mailbox[MAILBOX[to]] & COLOR_MASK or move >> 15 == EN_PASSANT
+        if piece == PAWN:
+            san = ('abcdefgh'[frm % 8] + 'x' if capture else '') + SQUARE_NAMES[to]
+            if (move >> 12) & 7:
+                san += '=' + PROMOTION_LETTERS[(move >> 12) & 7]
+        else:
+            # Only as much of the starting square as tells this piece apart from its twins.
+            twins = [other & 63 for other in moves
+                     if other != move and (other >> 6) & 63 == to and mailbox[MAILBOX[other & 63]] & 7 == piece]
+            origin = ''
+            if twins:
+                if all(sq % 8 != frm % 8 for sq in twins):
+                    origin = SQUARE_NAMES[frm][0]
+                elif all(sq // 8 != frm // 8 for sq in twins):
+                    origin = SQUARE_NAMES[frm][1]
+                else:
+                    origin = SQUARE_NAMES[frm]
+            san = PIECE_LETTERS[piece] + origin + ('x' if capture else '') + SQUARE_NAMES[to]
+    board.push(move)
+    if board.in_check(board.turn):
+        san += '#' if not board.generate_moves() else '+'
+    board.pop()
+    return san
+
+def replay(game, board=None):
+    """
+    Plays game's moves from its starting position on board (a new headless
+    Board if None) and returns the board. ValueError names the first move
+    that isn't legal.
+    """
+    if board is None:
+        board = create_board(game.fen)
+    else:
+        board.setup_board(game.fen, assign=False)
+    for ply, san in enumerate(game.moves):
+        try:
+            board.push(san_to_move(board, san))
+        except ValueError as error:
+            raise ValueError(f"Move {ply // 2 + 1}{'.' if ply % 2 == 0 else '...'} {san}: {error}") from None
+    return board
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+def game_result(board):
+    """'1-0', '0-1' or '1/2-1/2' if the position is mate or stalemate, otherwise '*'."""
+    if board.generate_moves():
+        return "*"
+    if board.in_check(board.turn):
+        return "0-1" if board.turn == "white" else "1-0"
+    return "1/2-1/2"
+
+def write_game(board, headers=None, result=None, width=80):
+    """
+    PGN for the moves in board.moves, from the position before the first of
+    them. The board is stepped back to the start and forward again, so it
+    ends as it began.
+    """
+    moves = [record.move for record in board.moves]
+    for _ in moves:
+        board.pop()
+    start_fen = board.generate_fen()
+    fullmove, white_to_move = board.fullmove_number, board.turn == "white"
+    sans = []
+    for move in moves:
+        sans.append(move_to_san(board, move))
+        board.push(move)
+    board.assign_moves(board.turn)
+    if result is None:
+        result = (headers or {}).get("Result") or game_result(board)
+
+    tags = dict(SEVEN_TAG_ROSTER)
+    tags.update(headers or {})
+    tags["Result"] = result
+    if start_fen != DEFAULT_CONFIG:
+        tags["SetUp"] = "1"
+        tags["FEN"] = start_fen
+    lines = [f'[{name} "{escape(value)}"]' for name, value in tags.items()]
+    lines.append("")
+
+    tokens = []
+    for index, san in enumerate(sans):
+        if white_to_move:
+            tokens.append(f"{fullmove}. {san}")
+        elif index == 0:
+            tokens.append(f"{fullmove}... {san}")
+        else:
+            tokens.append(san)
+        if not white_to_move:
+            fullmove += 1
+        white_to_move = not white_to_move
+    tokens.append(result)
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > width:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+# One board per worker process, reused for every game it is sent.
+worker_board = None
+
+def replay_batch(games):
+    """Worker: replays games and returns (plies played, error or None) for each."""
+    global worker_board
+    if worker_board is None:
+        worker_board = create_board()
+    results = []
+    for game in games:
+        try:
+            replay(game, worker_board)
+            results.append((len(game.moves), None))
+        except (ValueError, KeyError, IndexError) as error:
+            results.append((len(worker_board.moves), str(error)))
+    return results
+
+def replay_stream(games, workers=1, batch_size=64):
+    """Yields (game, plies played, error or None) for every game, in order, replaying on a process pool when workers > 1."""
+    if workers == 1:
+        for batch in batched(games, batch_size):
+            yield from ((game, *result) for game, result in zip(batch, replay_batch(batch)))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def finished():
+            batch, future = pending.popleft()
+            return ((game, *result) for game, result in zip(batch, future.result()))
+
+        for batch in batched(games, batch_size):
+            pending.append((batch, executor.submit(replay_batch, batch)))
+            if len(pending) >= 2 * workers:
+                yield from finished()
+        while pending:
+            yield from finished()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay and validate every game in a PGN file.")
+    parser.add_argument("pgn", help="PGN file, or - for stdin")
+    parser.add_argument("--workers", type=int, default=1, help="replay processes (0 for one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many games")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.pgn == "-" else open(args.pgn)
+    start_time = time.perf_counter()
+    games = plies = errors = 0
+    try:
+        stream = read_games(source)
+        if args.limit is not None:
+            stream = (game for _, game in zip(range(args.limit), stream))
+        for game, played, error in replay_stream(stream, args.workers or os.cpu_count() or 1, args.batch_size):
+            games += 1
+            plies += played
+            if error is not None:
+                errors += 1
+                print(f"Game {games} ({game!r}): {error}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    elapsed = time.perf_counter() - start_time
+    rate = games / elapsed if elapsed else 0
+    print(f"{games} games, {plies} plies, {errors} errors in {elapsed:.2f}s ({rate:,.0f} games/s, {plies / elapsed if elapsed else 0:,.0f} plies/s)")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Pieces.py"""
+from typing import List
+import Engine.board as Board
+from Engine.move_assignment import is_square_attacked
+from Engine.sprites import get_sprite
+from Engine.zobrist import piece_key
+from Engine.evaluation import MG_SCORES, EG_SCORES
+from Engine.mailbox import MAILBOX, POSITION, EMPTY, OFFBOARD, COLOR_MASK, ROOK, piece_code, ORTHOGONAL, DIAGONAL, KING_STEPS, KNIGHT_JUMPS
+
+# Piece class
+class Piece:
+    __slots__ = ("pos", "color", "type", "value", "code", "status", "psudo_legal_moves", "legal_moves")
+
+    def __init__(self, pos: tuple, color: str, type: str, value: int):
+        self.pos = pos
+        self.color = color
+        self.type = type
+        self.value = value
+        # What the board's mailbox holds for this piece (see Engine/mailbox.py).
+        self.code = piece_code(color, type)
+        self.status = True
+        self.psudo_legal_moves = []
+        self.legal_moves = []
+
+    @property
+    def img(self):
+        # Shared with every other piece of this color and type; loaded on first draw.
+        return get_sprite(self.color, self.type)
+
+    def reset(self, pos):
+        """Readies a pooled piece for reuse at pos, as if freshly built there."""
+        self.pos = pos
+        self.status = True
+        self.psudo_legal_moves = []
+        self.legal_moves = []
+
+    def get_value(self):
+        return self.value
+    
+    def move(self, board: Board, new_pos: tuple, real_move=True):
+        captured_piece = board.get_piece(new_pos)
+        if captured_piece:
+            board.remove_piece(captured_piece, keep_pos=True)
+        board.vacate(self.pos)
+        board.place(self, new_pos)
+        board.hash ^= piece_key(self, self.pos) ^ piece_key(self, new_pos)
+        start, end = self.pos[1] * 8 + self.pos[0], new_pos[1] * 8 + new_pos[0]
+        mg, eg = MG_SCORES[self.code], EG_SCORES[self.code]
+        board.mg_score += mg[end] - mg[start]
+        board.eg_score += eg[end] - eg[start]
+        self.pos = new_pos
+        return captured_piece
+
+    def can_move(self, board: Board, new_pos: tuple):
+        return new_pos in board.highlighted and new_pos != self.pos
+
+    def slide(self, board, directions, moves):
+        """Walks each direction until the edge or a piece, keeping enemy squares as captures."""
+        mailbox = board.mailbox
+        own = self.code & COLOR_MASK
+        start = MAILBOX[self.pos[1] * 8 + self.pos[0]]
+        for direction in directions:
+            target = start + direction
+            code = mailbox[target]
+            while code == EMPTY:
+                moves.append(POSITION[target])
+                target += direction
+                code = mailbox[target]
+            if not code & own:
+                moves.append(POSITION[target])
+        return moves
+
+    def revert_move(self, board, original_pos, new_pos, captured_piece):
+        # Piece.move directly so subclasses don't replay castling/en passant side effects.
+        Piece.move(self, board, original_pos, real_move=False)
+        if captured_piece:
+            board.add_piece(captured_piece, captured_piece.pos)
+            
+    def __repr__(self) -> str:
+        return f"{self.color} {self.type} at {self.pos}"
+    
+    def __str__(self) -> str:
+        return repr(self)
+    
+
+class Pawn(Piece):
+    __slots__ = ("moved", "direction", "start_rank")
+
+    def __init__(self, pos: tuple, color: str):
+        super().__init__(pos, color, "pawn", 1)
+        self.moved = False
+        self.direction = -1 if color == 'white' else 1
+        self.start_rank = 6 if color == 'white' else 1
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.moved = False
+
+    def get_moves(self, board: Board) -> List[tuple]:
+        mailbox = board.mailbox
+        x, y = self.pos
+        index = MAILBOX[y * 8 + x]
+        forward = self.direction * 10
+        moves = []
+        # move forward
+        if mailbox[index + forward] == EMPTY:
+            moves.append(POSITION[index + forward])
+            # move two squares forward (only from the starting rank)
+            if y == self.start_rank and mailbox[index + 2 * forward] == EMPTY:
+                moves.append(POSITION[index + 2 * forward])
+        
+        # Capture moves (the sentinels carry both color bits, so they never match)
+        enemy = COLOR_MASK ^ (self.code & COLOR_MASK)
+        for side in (-1, 1):
+            code = mailbox[index + forward + side]
+            if code & enemy and code != OFFBOARD:
+                moves.append(POSITION[index + forward + side])
+        
+        # En passant
+        ep = board.en_passant_square
+        if ep is not None and ep[1] == y + self.direction and abs(ep[0] - x) == 1:
+            moves.append(ep)
+        
+        self.psudo_legal_moves = moves
+        return moves
+    
+    def move(self, board: Board, new_pos: tuple, real_move=True):
+        # en passant: the captured pawn sits beside us, not on new_pos
+        captured_piece = None
+        if new_pos[0] != self.pos[0] and board.get_piece(new_pos) is None:
+            captured_piece = board.remove_piece(board.get_piece((new_pos[0], self.pos[1])), keep_pos=True)
+
+        if real_move:
+            self.moved = True
+        return super().move(board, new_pos) or captured_piece
+        
+class Rook(Piece):
+    __slots__ = ("moved",)
+
+    def __init__(self, pos: tuple, color: str, moved=True):
+        super().__init__(pos, color, "rook", 5)
+        self.moved = moved
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.moved = True
+    
+    def get_moves(self, board: Board) -> List[tuple]:
+        # horizontal and vertical moves
+        moves = self.slide(board, ORTHOGONAL, [])
+        self.psudo_legal_moves = moves
+        return moves
+    
+    def move(self, board: Board, new_pos: tuple, real_move=True):
+        if real_move:
+            self.moved = True
+        return super().move(board, new_pos)
+        
+
+class Knight(Piece):
+    __slots__ = ()
+
+    def __init__(self, pos: tuple, color: str):
+        super().__init__(pos, color, "knight", 3)
+    
+    def get_moves(self, board: Board) -> List[tuple]:
+        mailbox = board.mailbox
+        own = self.code & COLOR_MASK
+        index = MAILBOX[self.pos[1] * 8 + self.pos[0]]
+        moves = []
+        for jump in KNIGHT_JUMPS:
+            if not mailbox[index + jump] & own:
+                moves.append(POSITION[index + jump])
+        
+        self.psudo_legal_moves = moves
+        return moves
+    
+
+
+class Bishop(Piece):
+    __slots__ = ()
+
+    def __init__(self, pos: tuple, color: str):
+        super().__init__(pos, color, "bishop", 3)
+    
+    def get_moves(self, board: Board) -> List[tuple]:
+        # diagonal moves
+        moves = self.slide(board, DIAGONAL, [])
+        self.psudo_legal_moves = moves
+        return moves
+
+class Queen(Piece):
+    __slots__ = ()
+
+    def __init__(self, pos: tuple, color: str):
+        super().__init__(pos, color, "queen", 9)
+    
+    def get_moves(self, board: Board) -> List[tuple]:
+        """
+        Basically a mashup of the Rook and Bishop get_moves methods
+        """
+        moves = self.slide(board, ORTHOGONAL, [])
+        self.slide(board, DIAGONAL, moves)
+        self.psudo_legal_moves = moves
+        return moves
+
+class King(Piece):
+    __slots__ = ("moved",)
+
+    def __init__(self, pos: tuple, color: str, moved=True):
+        super().__init__(pos, color, "king", 100)
+        self.moved = moved
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.moved = True
+    
+    def get_moves(self, board: Board) -> List[tuple]:
+        mailbox = board.mailbox
+        own = self.code & COLOR_MASK
+        x, y = self.pos
+        index = MAILBOX[y * 8 + x]
+        moves = []
+        for step in KING_STEPS:
+            if not mailbox[index + step] & own:
+                moves.append(POSITION[index + step])
+        
+        # Castling: not out of, or through, check. Landing in check is left to the legality filter.
+        enemy = "white" if self.color == "black" else "black"
+        if not self.moved and not is_square_attacked(board, self.pos, enemy):
+            row = MAILBOX[y * 8]
+            rook = own | ROOK
+            # King side
+            if mailbox[row + 7] == rook and not board.piece_at[row + 7].moved and mailbox[row + 5] == EMPTY and mailbox[row + 6] == EMPTY:
+                if not is_square_attacked(board, (5, y), enemy):
+                    moves.append(POSITION[row + 6])
+
+            # Queen side
+            if mailbox[row] == rook and not board.piece_at[row].moved and mailbox[row + 1] == EMPTY and mailbox[row + 2] == EMPTY and mailbox[row + 3] == EMPTY:
+                if not is_square_attacked(board, (3, y), enemy):
+                    moves.append(POSITION[row + 2])
+
+        self.psudo_legal_moves = moves
+        return moves
+    
+    def move(self, board: Board, new_pos: tuple, real_move=True):
+        # if we are castling, also move the rook
+        if abs(new_pos[0] - self.pos[0]) == 2:
+            if new_pos[0] == 6:
+                board.get_piece((7, new_pos[1])).move(board, (5, new_pos[1]))
+            else:
+                board.get_piece((0, new_pos[1])).move(board, (3, new_pos[1]))
+        if real_move:
+            self.moved = True
+        return super().move(board, new_pos)
+    
+    def revert_move(self, board, original_pos, new_pos, captured_piece):
+        # if we castled we need to move back the rook as well
+        if abs(original_pos[0] - new_pos[0]) == 2:
+            if new_pos[0] == 6:
+                rook = board.get_piece((5, new_pos[1]))
+                Piece.move(rook, board, (7, new_pos[1]), real_move=False)
+            else:
+                rook = board.get_piece((3, new_pos[1]))
+                Piece.move(rook, board, (0, new_pos[1]), real_move=False)
+            # castling is only legal with an unmoved rook
+            rook.moved = False
+        return super().revert_move(board, original_pos, new_pos, captured_piece)
@@ -0,0 +1,248 @@
+"""
+search.py
+Picks a move: negamax with alpha-beta pruning and a quiescence search,
+driven by iterative deepening so there is always a best move from the last
+finished depth when the time or node budget runs out. Quiet positions are
+scored by evaluation.evaluate from the Board's running sums. Positions are
+cached in a TranspositionTable keyed by board.hash. Given a tablebase.Tablebase,
+positions with few enough pieces are scored exactly from it instead of
+searched.
+
+Searches the Board in place with push/pop on packed moves (Engine/moves.py);
+the board is left as it was found. Moves come from move_picker one stage at a
+time (hash move, captures, killers, quiet moves by history), so most nodes
+cut off before their quiet moves are ever generated.
+"""
+import time
+from Engine.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from Engine.moves import decode_move
+from Engine.move_picker import pick_moves, is_quiet
+from Engine.fen_utils import move_to_uci
+from Engine.evaluation import evaluate
+
+MATE_SCORE = 100000
+# Scores beyond this are mates, counted in plies from the root.
+MATE_BOUND = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+MAX_DEPTH = 64
+
+def score_to_tt(score, ply):
+    # Mate scores are stored relative to the node, not the root.
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+class SearchResult:
+    def __init__(self, best_move, score, pv, depth, nodes, elapsed):
+        self.best_move = best_move
+        self.score = score
+        self.pv = pv
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.nps = int(nodes / elapsed) if elapsed > 0 else 0
+
+    @property
+    def mate_in(self):
+        """Moves to mate (negative when being mated), or None."""
+        if abs(self.score) <= MATE_BOUND:
+            return None
+        plies = MATE_SCORE - abs(self.score)
+        return (plies + 1) // 2 if self.score > 0 else -((plies + 1) // 2)
+
+    def __repr__(self):
+        pv = ' '.join(move_to_uci(*move) for move in self.pv)
+        score = f"mate {self.mate_in}" if self.mate_in is not None else f"cp {self.score}"
+        return f"depth {self.depth} score {score} nodes {self.nodes} nps {self.nps} time {self.elapsed * 1000:.0f}ms pv {pv}"
+
+class Search:
+    def __init__(self, board, transposition_table=None, tablebase=None):
+        self.board = board
+        self.tt = transposition_table if transposition_table is not None else TranspositionTable(16)
+        self.tablebase = tablebase
+        self.stopped = False
+        self.nodes = 0
+        self.pv = [[] for _ in range(MAX_DEPTH + 1)]
+        # Quiet moves that caused a cutoff: two per ply, and a score per from/to pair (see move_picker).
+        self.killers = [[0, 0] for _ in range(MAX_DEPTH + 1)]
+        self.history = [0] * 4096
+
+    def stop(self):
+        """Safe to call from another thread; the search returns its best move so far."""
+        self.stopped = True
+
+    def search(self, max_depth=MAX_DEPTH, time_limit=None, node_limit=None, on_iteration=None, verbose=False):
+        """
+        Searches depth 1, 2, ... until max_depth, time_limit (seconds) or
+        node_limit runs out, and returns the SearchResult of the deepest
+        finished iteration. on_iteration is called with each one.
+        """
+        board = self.board
+        self.stopped = False
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + time_limit if time_limit is not None else None
+        self.tt.new_search()
+        self.killers = [[0, 0] for _ in range(MAX_DEPTH + 1)]
+        self.history = [0] * 4096
+
+        root_moves = board.generate_moves()
+        if not root_moves:
+            score = -MATE_SCORE if board.in_check(board.turn) else 0
+            return SearchResult(None, score, [], 0, 0, 0.0)
+        fallback = decode_move(root_moves[0])
+        result = SearchResult(fallback, 0, [fallback], 0, 0, 0.0)
+
+        for depth in range(1, max_depth + 1):
+            score = self.negamax(depth, 0, -INFINITY, INFINITY)
+            elapsed = time.perf_counter() - self.start_time
+            if self.stopped:
+                break
+            pv = [decode_move(move) for move in self.pv[0]]
+            result = SearchResult(pv[0], score, pv, depth, self.nodes, elapsed)
+            if on_iteration is not None:
+                on_iteration(result)
+            if verbose:
+                print(f"info {result}")
+            if abs(score) > MATE_BOUND and MATE_SCORE - abs(score) <= depth:
+                break  # A forced mate inside the horizon won't change with more depth.
+            if self.probe(0) is not None:
+                break  # Every reply was scored from the tablebase; deeper is the same answer.
+            # The next iteration costs several times this one; don't start what can't finish.
+            if self.deadline is not None and elapsed > (self.deadline - self.start_time) / 2:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - self.start_time
+        result.nps = int(result.nodes / result.elapsed) if result.elapsed > 0 else 0
+        # Deeper nodes overwrote piece.legal_moves; put the root's back.
+        board.assign_moves(board.turn)
+        return result
+
+    def check_limits(self):
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+
+    def probe(self, ply):
+        """The tablebase score of the position, or None if there is none."""
+        if self.tablebase is None or len(self.board.pieces) > self.tablebase.max_pieces:
+            return None
+        found = self.tablebase.probe(self.board)
+        if found is None:
+            return None
+        result, plies = found
+        return result * (MATE_SCORE - ply - plies)
+
+    def is_draw(self):
+        board = self.board
+        if board.halfmove_clock >= 100:
+            return True
+        # Any earlier occurrence since the last capture or pawn move counts as a draw in the search.
+        history = board.moves
+        for back in range(2, min(board.halfmove_clock, len(history)) + 1, 2):
+            if history[-back].hash == board.hash:
+                return True
+        return False
+
+    def record_cutoff(self, move, ply, depth):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move & 4095] += depth * depth
+
+    def negamax(self, depth, ply, alpha, beta):
+        self.nodes += 1
+        if self.nodes & 127 == 0:
+            self.check_limits()
+        if self.stopped:
+            return 0
+        board = self.board
+        self.pv[ply] = []
+        if ply > 0 and self.is_draw():
+            return 0
+        if ply > 0:
+            score = self.probe(ply)
+            if score is not None:
+                return score
+        if depth <= 0 or ply >= MAX_DEPTH:
+            return self.quiescence(ply, alpha, beta)
+
+        original_alpha = alpha
+        tt_move = 0
+        entry = self.tt.probe(board.hash)
+        if entry is not None:
+            entry_depth, entry_score, bound, tt_move = entry
+            if ply > 0 and entry_depth >= depth:
+                entry_score = score_from_tt(entry_score, ply)
+                if bound == EXACT or (bound == LOWER and entry_score >= beta) or (bound == UPPER and entry_score <= alpha):
+                    return entry_score
+
+        best_score = -INFINITY
+        best_move = 0
+        for move in pick_moves(board, tt_move, self.killers[ply], self.history):
+            quiet = is_quiet(board, move)
+            board.push(move)
+            score = -self.negamax(depth - 1, ply + 1, -beta, -alpha)
+            board.pop()
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = [move] + self.pv[ply + 1]
+                    if alpha >= beta:
+                        if quiet:
+                            self.record_cutoff(move, ply, depth)
+                        break
+        if best_score == -INFINITY:
+            return -MATE_SCORE + ply if board.in_check(board.turn) else 0
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(board.hash, depth, score_to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def quiescence(self, ply, alpha, beta):
+        """Only captures and promotions, so the static evaluation isn't taken mid-exchange."""
+        self.nodes += 1
+        if self.nodes & 127 == 0:
+            self.check_limits()
+        if self.stopped:
+            return 0
+        board = self.board
+        self.pv[ply] = []
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_DEPTH:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        for move in pick_moves(board, captures_only=True):
+            board.push(move)
+            score = -self.quiescence(ply + 1, -beta, -alpha)
+            board.pop()
+            if self.stopped:
+                return 0
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
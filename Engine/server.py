@@ -0,0 +1,274 @@
+"""
+server.py
+Hosts many games at once over a line-based TCP protocol, each on its own
+headless Board. The asyncio loop only does the cheap work (parsing, move
+legality, FEN); engine moves are sent to a process pool with the game's
+start FEN and move list, so a long search never stalls the other sessions.
+With --book, workers play from a Polyglot book before searching; the book is
+memory-mapped, so every worker shares one copy in the page cache.
+
+Every command is timed. Each game keeps its own latency histograms and the
+server keeps aggregate ones (instrumentation.CallStats), both readable with
+the stats command.
+
+Protocol, one command per line, one reply line each ("ok ..." or "error ..."):
+    new [fen]               -> ok <game id> <fen>
+    move <id> <uci>         -> ok <fen> [checkmate <winner> | stalemate]
+    go <id> [movetime ms]   -> ok <uci> <fen> [checkmate <winner> | stalemate]
+    fen <id>                -> ok <fen>
+    legal <id>              -> ok <uci> <uci> ...
+    stats [id]              -> ok <json>
+    close <id>              -> ok
+    quit                    -> ok, then the connection closes
+Games belong to the connection that made them and end with it.
+
+python -m Engine.server [--host 127.0.0.1] [--port 8765] [--workers N] [--movetime MS] [--max-games N] [--book BIN]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor
+from Engine.backends import create_board
+from Engine.book import Book
+from Engine.constants import DEFAULT_CONFIG
+from Engine.fen_utils import move_to_uci, uci_to_move, validate_fen
+from Engine.instrumentation import CallStats
+from Engine.search import Search
+from Engine.transposition import TranspositionTable
+
+# Worker-process state, reused for every search the process is sent.
+worker_board = None
+worker_table = None
+worker_book = None
+
+def warm_up(book_path=None):
+    """Worker: builds the board and table, and opens the book, ahead of the first search."""
+    global worker_board, worker_table, worker_book
+    if worker_board is None:
+        worker_board = create_board()
+        worker_table = TranspositionTable(16)
+    if book_path is not None and worker_book is None:
+        worker_book = Book(book_path)
+
+def search_move(start_fen, moves, movetime, book_path=None):
+    """
+    Worker: replays moves from start_fen and returns (uci, score, depth, nodes)
+    for the side to move; a book move comes back with depth and nodes 0.
+    """
+    warm_up(book_path)
+    worker_board.setup_board(start_fen, assign=False)
+    for uci in moves:
+        worker_board.make_move(*uci_to_move(uci))
+    if worker_book is not None:
+        move = worker_book.choose(worker_board)
+        if move is not None:
+            return move_to_uci(*move), 0, 0, 0
+    result = Search(worker_board, worker_table).search(time_limit=movetime / 1000)
+    return move_to_uci(*result.best_move), result.score, result.depth, result.nodes
+
+# Commands that act on one game, and every command the server answers.
+GAME_COMMANDS = ("move", "go", "fen", "legal", "close")
+COMMANDS = ("new", "stats", "quit") + GAME_COMMANDS
+
+class Game:
+    def __init__(self, game_id, fen):
+        validate_fen(fen)
+        self.id = game_id
+        self.board = create_board(fen)
+        self.start_fen = self.board.generate_fen()
+        self.moves = []
+        # Set while an engine move is being searched; the game takes no other moves until it lands.
+        self.busy = False
+        self.latency = {}
+
+    def status(self):
+        """'' while the game is on, otherwise 'checkmate <winner>' or 'stalemate'."""
+        board = self.board
+        if board.generate_moves():
+            return ""
+        if board.in_check(board.turn):
+            return f"checkmate {'black' if board.turn == 'white' else 'white'}"
+        return "stalemate"
+
+    def play(self, uci):
+        start, end, promotion = uci_to_move(uci)
+        if (start, end, promotion) not in self.board.get_legal_moves(self.board.turn):
+            raise ValueError(f"illegal move {uci}")
+        self.board.make_move(start, end, promotion)
+        self.moves.append(uci)
+
+    def position(self):
+        return ' '.join(filter(None, (self.board.generate_fen(), self.status())))
+
+def latency_summary(latency):
+    return {command: {
+        "calls": call_stats.calls,
+        "mean_ms": call_stats.mean_ns / 1e6,
+        "p50_ms": call_stats.percentile(0.5) / 1e6,
+        "p99_ms": call_stats.percentile(0.99) / 1e6,
+        "max_ms": call_stats.max_ns / 1e6,
+    } for command, call_stats in sorted(latency.items())}
+
+class GameServer:
+    def __init__(self, workers=None, movetime=100, max_games=10000, book=None):
+        # Spawned, not forked: a forked worker would inherit every open client socket and keep it from closing.
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.movetime = movetime
+        self.max_games = max_games
+        self.book = book
+        self.games = {}
+        self.game_ids = itertools.count(1)
+        self.latency = {}
+        self.connections = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts the search processes, then listens; port 0 picks a free one (see self.port)."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_up, self.book) for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.execute(line.decode().strip(), owned)
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+                if reply == "ok" and line.strip() == b"quit":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            self.connections -= 1
+            writer.close()
+
+    async def execute(self, line, owned):
+        """Runs one command for a connection owning the game ids in owned; returns the reply line."""
+        tokens = line.split()
+        if not tokens:
+            return "error empty command"
+        command, args = tokens[0], tokens[1:]
+        start_time = time.perf_counter_ns()
+        game = None
+        try:
+            if command == "new":
+                return self.new_game(' '.join(args) or DEFAULT_CONFIG, owned)
+            if command == "stats":
+                return self.stats(args, owned)
+            if command == "quit":
+                return "ok"
+            if command not in GAME_COMMANDS:
+                return f"error unknown command {command}"
+            if not args or not args[0].isdigit() or int(args[0]) not in owned:
+                return "error no such game"
+            game = self.games[int(args[0])]
+            if command == "fen":
+                return f"ok {game.position()}"
+            if command == "legal":
+                return ' '.join(["ok"] + [move_to_uci(*move) for move in game.board.get_legal_moves(game.board.turn)])
+            if command == "close":
+                owned.discard(game.id)
+                del self.games[game.id]
+                return "ok"
+            if game.busy:
+                return "error engine is thinking"
+            if command == "move":
+                if len(args) < 2:
+                    return "error move needs a uci move"
+                game.play(args[1])
+                return f"ok {game.position()}"
+            return await self.engine_move(game, int(args[1]) if len(args) > 1 else self.movetime)
+        except (ValueError, KeyError, IndexError) as error:
+            return f"error {error}"
+        except Exception as error:
+            # Anything else is still this command's failure; the connection carries on.
+            return f"error {type(error).__name__}: {error}"
+        finally:
+            elapsed = time.perf_counter_ns() - start_time
+            # Only known commands get histograms; made-up verbs from a client would grow these without bound.
+            known = command in COMMANDS
+            for latency in (self.latency, game.latency if game is not None else None):
+                if known and latency is not None:
+                    (latency.get(command) or latency.setdefault(command, CallStats(command))).record(elapsed)
+
+    def new_game(self, fen, owned):
+        if len(self.games) >= self.max_games:
+            return "error server is full"
+        game = Game(next(self.game_ids), fen)
+        self.games[game.id] = game
+        owned.add(game.id)
+        return f"ok {game.id} {game.position()}"
+
+    async def engine_move(self, game, movetime):
+        if game.status():
+            return "error game is over"
+        game.busy = True
+        try:
+            loop = asyncio.get_running_loop()
+            uci, score, depth, nodes = await loop.run_in_executor(self.executor, search_move, game.start_fen, list(game.moves), movetime, self.book)
+        except BrokenExecutor:
+            return "error engine unavailable"
+        finally:
+            game.busy = False
+        # The game may have been closed while the worker was searching.
+        if game.id not in self.games:
+            return "error no such game"
+        game.play(uci)
+        return f"ok {uci} {game.position()}"
+
+    def stats(self, args, owned):
+        if args:
+            if not args[0].isdigit() or int(args[0]) not in owned:
+                return "error no such game"
+            game = self.games[int(args[0])]
+            return "ok " + json.dumps({"game": game.id, "moves": len(game.moves), "latency": latency_summary(game.latency)})
+        return "ok " + json.dumps({"games": len(self.games), "connections": self.connections, "latency": latency_summary(self.latency)})
+
+async def serve(host, port, workers, movetime, max_games, book):
+    game_server = GameServer(workers, movetime, max_games, book)
+    server = await game_server.start(host, port)
+    print(f"Serving games on {host}:{game_server.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await game_server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host concurrent games over a line-based TCP protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="search processes")
+    parser.add_argument("--movetime", type=int, default=100, help="default engine time per move in ms")
+    parser.add_argument("--max-games", type=int, default=10000)
+    parser.add_argument("--book", default=None, help="Polyglot opening book (.bin)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.movetime, args.max_games, args.book))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,101 +1,132 @@
-import logging as log
 from Engine.constants import key
 from Engine.move_assignment import assign_moves
+from Engine.fen_utils import coord_to_pos
+from Engine.zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, castling_rights
+from Engine.evaluation import MG_SCORES, EG_SCORES, PHASE
 from Engine.pieces import Pawn, Rook, Knight, Bishop, Queen, King, Piece
+from Engine.mailbox import SQUARE, POSITION, EMPTY_MAILBOX
 
-def setup_board(board, fen):
-    # Clear previous pieces
+# FEN letter -> (color, type); the same tuples key board.spare_pieces.
+FEN_PIECES = {}
+for letter, type_name in key.items():
+    FEN_PIECES[letter] = ("white", type_name)
+    FEN_PIECES[letter.lower()] = ("black", type_name)
+EMPTY_RUNS = {str(n): n for n in range(1, 9)}
+
+def setup_board(board, fen, assign=True):
+    """
+    Loads fen into board in one pass over the placement field, reusing the
+    board's old Piece objects instead of building new ones. With
+    assign=False piece.legal_moves are left empty until assign_moves runs,
+    for bulk loading where only the position is needed.
+    """
+    recycle_pieces(board)
+    # Clear previous pieces and history
+    board.pieces.clear()
     board.white_pieces.clear()
     board.black_pieces.clear()
+    board.moves.clear()
     board.white_king = None
     board.black_king = None
-    
-    parsed_fen = fen.split()
-    board_fen = parsed_fen[0]
-    active_color = parsed_fen[1]
-    castling_fen = parsed_fen[2]
-    en_passant_fen = parsed_fen[3]
-    halfmove_clock = parsed_fen[4]
-    fullmove_number = parsed_fen[5]
-    rows = board_fen.split('/')
-    
-    for i, row in enumerate(rows):
-        rank = i  # Adjusted for white pieces starting at rank 0
-        file = 0
-        for char in row:
-            square = board.get_square((file, rank))
-            if char.isdigit():
-                for _ in range(int(char)):
-                    square.occupying_piece = None
-                    file += 1
+    board.white_queenside_rook = None
+    board.white_kingside_rook = None
+    board.black_queenside_rook = None
+    board.black_kingside_rook = None
+    mailbox = board.mailbox
+    piece_at = board.piece_at
+    mailbox[:] = EMPTY_MAILBOX
+    piece_at[:] = [None] * 120
+
+    # EPD lines stop after the en passant field; their clocks default to 0 1.
+    fields = fen.split()
+    placement, active_color, castling_fen, en_passant_fen = fields[:4]
+    spares = board.spare_pieces
+    add_piece = board.pieces.append
+    add_white = board.white_pieces.append
+    add_black = board.black_pieces.append
+    h = 0
+    mg = eg = phase = 0
+    index = 21
+    for char in placement:
+        if char == '/':
+            # Past the last file; skip the two sentinels to the next rank.
+            index += 2
+        elif char in EMPTY_RUNS:
+            index += EMPTY_RUNS[char]
+        else:
+            kind = FEN_PIECES[char]
+            color, type_name = kind
+            pos = POSITION[index]
+            pool = spares.get(kind)
+            if pool:
+                piece = pool.pop()
+                piece.reset(pos)
+            else:
+                piece = create_piece(pos, color, type_name)
+            mailbox[index] = piece.code
+            piece_at[index] = piece
+            sq = SQUARE[index]
+            h ^= PIECE_KEYS[kind][sq]
+            mg += MG_SCORES[piece.code][sq]
+            eg += EG_SCORES[piece.code][sq]
+            phase += PHASE[piece.code]
+            add_piece(piece)
+            if color == 'white':
+                add_white(piece)
+                if type_name == "king":
+                    board.white_king = piece
+                elif type_name == "rook":
+                    if pos == (0, 7):
+                        board.white_queenside_rook = piece
+                    elif pos == (7, 7):
+                        board.white_kingside_rook = piece
             else:
-                color = 'white' if char.isupper() else 'black'
-                type_name = key[char.upper()]
-                square.occupying_piece = create_piece((file, rank), color, type_name)
-                board.pieces.append(square.occupying_piece)
-                if color == 'white':
-                    board.white_pieces.append(square.occupying_piece)
-                    if type_name == "king":
-                        board.white_king = square.occupying_piece
-                    if type_name == "rook":
-                        if square.pos == (0, 7):
-                            board.white_queenside_rook = square.occupying_piece
-                        elif square.pos == (7, 7):
-                            board.white_kingside_rook = square.occupying_piece
-                else:
-                    board.black_pieces.append(square.occupying_piece)
-                    if type_name == "king":
-                        board.black_king = square.occupying_piece
-                    if type_name == "rook":
-                        if square.pos == (0, 0):
-                            board.black_queenside_rook = square.occupying_piece
-                        elif square.pos == (7, 0):
-                            board.black_kingside_rook = square.occupying_piece
-                file += 1
+                add_black(piece)
+                if type_name == "king":
+                    board.black_king = piece
+                elif type_name == "rook":
+                    if pos == (0, 0):
+                        board.black_queenside_rook = piece
+                    elif pos == (7, 0):
+                        board.black_kingside_rook = piece
+            index += 1
 
     board.turn = "white" if active_color == 'w' else 'black'
-    board.halfmove_clock = int(halfmove_clock)
-    board.fullmove_number = int(fullmove_number)
-    board.en_passant_square = None if en_passant_fen == '-' else en_passant_fen
+    board.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+    board.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+    board.en_passant_square = None if en_passant_fen == '-' else coord_to_pos(en_passant_fen)
 
-    # Handle en passant square
-    if board.en_passant_square:
-        file_val = ord(board.en_passant_square[0]) - ord('a')
-        ep_row = 8 - int(board.en_passant_square[1])
-        last_move_color = "black" if board.turn == "white" else "white"
-        if last_move_color == "black":
-            pawn_start = (file_val, ep_row - 2)
-            pawn_final = (file_val-1, ep_row)
-        else:
-            pawn_start = (file_val, ep_row + 2)
-            pawn_final = (file_val-1, ep_row)
-        pawn = board.get_piece(pawn_final)
-        log.debug(pawn_final)
-        if pawn and pawn.type == "pawn":
-            fake_move = {
-                "piece": pawn,
-                "start": pawn_start,
-                "end": pawn_final,
-                "captured": None,
-            }
-            board.moves.append(fake_move)
-    
     # Set castling rights
-    if 'K' in castling_fen:
-        board.white_king.moved = False
-        board.white_kingside_rook.moved = False
-    if 'Q' in castling_fen:
-        board.white_king.moved = False
-        board.white_queenside_rook.moved = False
-    if 'k' in castling_fen:
-        board.black_king.moved = False
-        board.black_kingside_rook.moved = False
-    if 'q' in castling_fen:
-        board.black_king.moved = False
-        board.black_queenside_rook.moved = False
+    if castling_fen != '-':
+        for letter, king, rook in (('K', board.white_king, board.white_kingside_rook), ('Q', board.white_king, board.white_queenside_rook),
+                                   ('k', board.black_king, board.black_kingside_rook), ('q', board.black_king, board.black_queenside_rook)):
+            if letter in castling_fen and king is not None and rook is not None:
+                king.moved = False
+                rook.moved = False
+
+    board.castling = castling_rights(board)
+    h ^= CASTLING_KEYS[board.castling]
+    if board.turn == "black":
+        h ^= SIDE_KEY
+    if board.en_passant_square is not None:
+        h ^= EN_PASSANT_KEYS[board.en_passant_square[0]]
+    board.hash = h
+    board.mg_score, board.eg_score, board.phase = mg, eg, phase
 
     # Assign moves for the current turn.
-    assign_moves(board, board.turn)
+    if assign:
+        assign_moves(board, board.turn)
+
+def recycle_pieces(board):
+    """Returns every piece the board still references (on it, captured, or promoted away) to its spare pool."""
+    spares = board.spare_pieces
+    for piece in board.pieces:
+        spares.setdefault((piece.color, piece.type), []).append(piece)
+    for record in board.moves:
+        if record.captured is not None:
+            spares.setdefault((record.captured.color, record.captured.type), []).append(record.captured)
+        if record.promotion is not None:
+            spares.setdefault((record.piece.color, record.piece.type), []).append(record.piece)
 
 def create_piece(pos: tuple, color: str, type: str):
     if type == 'pawn':
@@ -110,4 +141,4 @@ def create_piece(pos: tuple, color: str, type: str):
         return Queen(pos, color)
     if type == 'king':
         return King(pos, color)
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,53 @@
+"""
+sprites.py
+One process-wide cache of piece images, keyed by (color, type).
+Each PNG is decoded at most once, and only when something actually draws it.
+"""
+import os
+from Engine.constants import key
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+
+_sprites = {}
+
+def get_sprite(color: str, type: str):
+    sprite = _sprites.get((color, type))
+    if sprite is None:
+        import pygame
+        image_path = os.path.join(ASSET_DIR, f'{color}_{type}.png')
+        try:
+            sprite = pygame.image.load(image_path)
+        except FileNotFoundError:
+            raise ValueError(f"Invalid image path: {image_path}")
+        _sprites[(color, type)] = sprite
+    return sprite
+
+def clear_sprites():
+    _sprites.clear()
+
+class SpriteAtlas:
+    """
+    Every piece sprite scaled once to the current tile size, so drawing a
+    square is a single blit. Call rebuild when the tile size changes.
+    """
+    def __init__(self, tile_size):
+        self.tile_size = None
+        self.sprites = {}
+        self.rebuild(tile_size)
+
+    def rebuild(self, tile_size):
+        if tile_size == self.tile_size:
+            return
+        import pygame
+        self.tile_size = tile_size
+        self.sprites = {}
+        for color in ('white', 'black'):
+            for type in key.values():
+                sprite = pygame.transform.smoothscale(get_sprite(color, type), tile_size)
+                # Matching the display's pixel format makes every later blit a straight copy.
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert_alpha()
+                self.sprites[(color, type)] = sprite
+
+    def get(self, color, type):
+        return self.sprites[(color, type)]
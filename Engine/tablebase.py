@@ -0,0 +1,656 @@
+"""
+tablebase.py
+Endgame tablebases: the result and distance to mate of every position with
+up to four pieces, kings included. generate builds them by retrograde
+analysis; Tablebase probes the files they are written to.
+
+A table covers one material (KRvK, KQvKR, KPvKP, ...) and holds one byte per
+position index: 0 for a draw, 1 for an illegal position, otherwise 2 + the
+plies to mate with best play, odd plies being wins for the side to move and
+even ones losses (0 plies: checkmated). Distances count straight through
+captures and promotions into the smaller tables.
+
+Index: the block, then the white king's square folded by symmetry, then the
+other pieces' squares, 6 bits each. Pawnless tables fold all 8 board
+symmetries (the white king stays in a 10-square triangle), pawn tables only
+the left-right mirror (32 squares). The block is the side to move, plus, in
+tables where both sides have a pawn, whether an en passant capture is
+available. Tables are kept with the stronger side as white; positions with
+the colours the other way round are probed flipped.
+
+Generation works on whole tables with NumPy, using the step, ray and attack
+tables of Engine/batch.py. Every legal position counts the moves that stay
+in the table by playing moves backwards from all of them; positions are then
+decided one ply of distance at a time outward from the mates: won in n + 1
+if some move reaches a position lost in n, lost in n + 1 once the count says
+every move reaches a won one. Captures and promotions leave the table and
+are looked up in the tables built before it.
+
+File format, one file per material (KRvK.tb): a 16-byte header (b"CTB1",
+version, piece count, block count, king squares, entry count as a
+little-endian uint64) and then the entries. Files are mapped read-only, so a
+probe is an index computation and one byte read, with nothing to lock, and
+every process probing the same files shares them in the page cache.
+
+Castling rights and the fifty-move rule are outside the tables; a position
+with castling rights isn't probed.
+
+python -m Engine.tablebase generate DIR [--pieces N] [MATERIAL ...]
+python -m Engine.tablebase probe DIR FEN
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from itertools import combinations_with_replacement
+from Engine import batch
+from Engine.batch import np, require_numpy, WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+MAX_PIECES = 4
+MAGIC = b"CTB1"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBQ")
+EXTENSION = ".tb"
+DRAW, ILLEGAL = 0, 1
+LETTERS = "PNBRQK"
+# A side's pieces are listed strongest first.
+ORDER = "QRBNP"
+STRENGTH = {'Q': 9, 'R': 5, 'B': 3, 'N': 3, 'P': 1}
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+def transform(sq, symmetry):
+    """sq under one of the 8 board symmetries: bit 4 swaps files and ranks, bit 1 mirrors files, bit 2 ranks."""
+    x, y = sq % 8, sq // 8
+    if symmetry & 4:
+        x, y = y, x
+    if symmetry & 1:
+        x = 7 - x
+    if symmetry & 2:
+        y = 7 - y
+    return y * 8 + x
+
+TRANSFORMS = tuple(tuple(transform(sq, symmetry) for sq in range(64)) for symmetry in range(8))
+# Squares the white king is folded onto, and for each square the first symmetry that takes it there.
+KING_SQUARES = {
+    False: tuple(sq for sq in range(64) if sq % 8 <= sq // 8 <= 3),
+    True: tuple(sq for sq in range(64) if sq % 8 <= 3),
+}
+FOLD = {pawns: tuple(next(symmetry for symmetry in range(2 if pawns else 8) if TRANSFORMS[symmetry][sq] in squares)
+                     for sq in range(64))
+        for pawns, squares in KING_SQUARES.items()}
+KING_SLOTS = {pawns: tuple(squares.index(sq) if sq in squares else -1 for sq in range(64))
+              for pawns, squares in KING_SQUARES.items()}
+
+def material_name(white, black):
+    """(name, flipped): the table for white's and black's pieces besides the kings ('RN', 'P'), stronger side first."""
+    white = ''.join(sorted(white, key=ORDER.index))
+    black = ''.join(sorted(black, key=ORDER.index))
+    strength = lambda side: (len(side), sorted((STRENGTH[letter] for letter in side), reverse=True), [-ORDER.index(letter) for letter in side])
+    if strength(black) > strength(white):
+        return f"K{black}vK{white}", True
+    return f"K{white}vK{black}", False
+
+def all_materials(max_pieces=MAX_PIECES):
+    """Every table up to max_pieces, in an order where each one's captures and promotions are built before it."""
+    names = set()
+    for others in range(max_pieces - 1):
+        for pieces in combinations_with_replacement(ORDER, others):
+            for split in range(others + 1):
+                names.add(material_name(pieces[:split], pieces[split:])[0])
+    return sorted(names, key=lambda name: (len(name), name.count('P'), [ORDER.find(letter) for letter in name]))
+
+class Material:
+    """The layout of one table: its pieces in index order (white king, black king, white's others, black's others)."""
+    def __init__(self, name):
+        white, black = name.split('v')
+        self.name = name
+        self.pieces = ([(WHITE, KING), (BLACK, KING)] + [(WHITE, LETTERS.index(letter)) for letter in white[1:]]
+                       + [(BLACK, LETTERS.index(letter)) for letter in black[1:]])
+        self.pawns = 'P' in name
+        self.en_passant = 'P' in white and 'P' in black
+        self.blocks = 4 if self.en_passant else 2
+        self.king_squares = KING_SQUARES[self.pawns]
+        self.fold = FOLD[self.pawns]
+        self.king_slots = KING_SLOTS[self.pawns]
+        self.block_size = len(self.king_squares) * 64 ** (len(self.pieces) - 1)
+        self.size = self.blocks * self.block_size
+
+    def index(self, squares, turn, en_passant=False):
+        """Index of the position with the pieces on squares, in self.pieces order."""
+        transform = TRANSFORMS[self.fold[squares[0]]]
+        index = (turn + 2 * en_passant) * len(self.king_squares) + self.king_slots[transform[squares[0]]]
+        for sq in squares[1:]:
+            index = index * 64 + transform[sq]
+        return index
+
+    def arrange(self, pieces):
+        """(flipped, order): how to turn a list of (color, type) of this material into self.pieces' order."""
+        flipped = material_name(*([LETTERS[ptype] for color, ptype in pieces if color == side and ptype != KING]
+                                  for side in (WHITE, BLACK)))[1]
+        remaining = [(color ^ flipped, ptype) for color, ptype in pieces]
+        order = []
+        for piece in self.pieces:
+            position = remaining.index(piece)
+            order.append(position)
+            remaining[position] = None
+        return flipped, order
+
+def en_passant_open(squares, pieces, turn):
+    """Whether turn has a pawn beside an enemy pawn that could just have moved two squares."""
+    forward = -8 if turn == WHITE else 8
+    for pawn, (color, ptype) in zip(squares, pieces):
+        if ptype != PAWN or color == turn or pawn // 8 != (3 if turn == WHITE else 4):
+            continue
+        if pawn + forward in squares or pawn + 2 * forward in squares:
+            continue
+        for capturer, (other, other_type) in zip(squares, pieces):
+            if other == turn and other_type == PAWN and capturer // 8 == pawn // 8 and abs(capturer % 8 - pawn % 8) == 1:
+                return True
+    return False
+
+class Tablebase:
+    """Probes the tables in a directory. Files are mapped the first time a position needs them."""
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        names = [name[:-len(EXTENSION)] for name in os.listdir(directory) if name.endswith(EXTENSION)]
+        self.max_pieces = max((len(name) - 1 for name in names), default=0)
+
+    def table(self, name):
+        if name not in self.tables:
+            path = os.path.join(self.directory, name + EXTENSION)
+            self.tables[name] = read_table(path, name) if os.path.exists(path) else None
+        return self.tables[name]
+
+    def close(self):
+        for table in self.tables.values():
+            if table is not None:
+                table[1].close()
+        self.tables.clear()
+
+    def probe(self, board):
+        return self.probe_fen(board.generate_fen())
+
+    def probe_fen(self, fen):
+        """
+        (result, plies) for the side to move, result being 1 for a win, 0 for a
+        draw or -1 for a loss, and plies the distance to mate with best play.
+        None if the position isn't in the tables.
+        """
+        fields = fen.split()
+        if len(fields) > 2 and fields[2] != '-':
+            return None
+        pieces, squares = [], []
+        for y, row in enumerate(fields[0].split('/')):
+            x = 0
+            for letter in row:
+                if letter.isdigit():
+                    x += int(letter)
+                    continue
+                pieces.append((WHITE if letter.isupper() else BLACK, LETTERS.index(letter.upper())))
+                squares.append(y * 8 + x)
+                x += 1
+        if len(pieces) > MAX_PIECES:
+            return None
+        name = material_name(*([LETTERS[ptype] for color, ptype in pieces if color == side and ptype != KING]
+                               for side in (WHITE, BLACK)))[0]
+        table = self.table(name)
+        if table is None:
+            return None
+        material, entries = table
+        flipped, order = material.arrange(pieces)
+        turn = (WHITE if len(fields) < 2 or fields[1] == 'w' else BLACK) ^ flipped
+        squares = [squares[position] ^ (56 if flipped else 0) for position in order]
+        en_passant = material.en_passant and len(fields) > 3 and fields[3] != '-' and en_passant_open(squares, material.pieces, turn)
+        value = entries[HEADER.size + material.index(squares, turn, en_passant)]
+        if value == ILLEGAL:
+            return None
+        if value == DRAW:
+            return 0, 0
+        plies = value - 2
+        return (1 if plies % 2 else -1), plies
+
+def read_table(path, name):
+    """(Material, read-only mapping of the file)."""
+    material = Material(name)
+    with open(path, "rb") as file:
+        entries = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, pieces, blocks, king_squares, size = HEADER.unpack_from(entries)
+    if (magic, version, pieces, blocks, king_squares, size) != (MAGIC, VERSION, len(material.pieces), material.blocks,
+                                                                len(material.king_squares), material.size):
+        entries.close()
+        raise ValueError(f"{path} is not a {name} table")
+    if hasattr(mmap, "MADV_RANDOM"):
+        entries.madvise(mmap.MADV_RANDOM)
+    return material, entries
+
+def write_table(path, material, values):
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(material.pieces), material.blocks, len(material.king_squares), material.size))
+        file.write(values.tobytes())
+
+class Geometry:
+    """Move and attack tables for the generator, as arrays indexed by square; square 64 is 'no piece'."""
+    def __init__(self):
+        single = np.array([1 << sq for sq in range(64)], dtype=np.uint64)
+        empty = np.full(64, batch.ALL, dtype=np.uint64)
+        self.transforms = np.array(TRANSFORMS, dtype=np.int64)
+        self.fold = {pawns: np.array(fold, dtype=np.int64) for pawns, fold in FOLD.items()}
+        self.king_slots = {pawns: np.array(slots, dtype=np.int64) for pawns, slots in KING_SLOTS.items()}
+        self.king_squares = {pawns: np.array(squares, dtype=np.int64) for pawns, squares in KING_SQUARES.items()}
+        self.bits = np.append(single, np.uint64(0))
+
+        def squares_of(bb):
+            return [sq for sq in range(64) if int(bb) >> sq & 1]
+
+        def distance(frm, to):
+            return max(abs(frm % 8 - to % 8), abs(frm // 8 - to // 8))
+
+        # Each ray nearest square first.
+        rays = {direction: [sorted(squares_of(bb), key=lambda to: distance(frm, to)) for frm, bb in enumerate(batch.ray(single, empty, direction))]
+                for direction in batch.KING_STEPS}
+        self.between = np.zeros((65, 65), dtype=np.uint64)
+        for direction, targets in rays.items():
+            for frm in range(64):
+                passed = 0
+                for to in targets[frm]:
+                    self.between[frm, to] = passed
+                    passed |= 1 << to
+        # The squares a move passes over and lands on; nothing gets through to square 64.
+        self.through = self.between | self.bits[None, :]
+        self.through[:, 64] = self.through[64, :] = batch.ALL
+        targets = {
+            KNIGHT: [squares_of(bb) for bb in batch.knight_attacks(single)],
+            KING: [squares_of(bb) for bb in batch.king_attacks(single)],
+            BISHOP: [sum((rays[direction][sq] for direction in batch.DIAGONAL), []) for sq in range(64)],
+            ROOK: [sum((rays[direction][sq] for direction in batch.ORTHOGONAL), []) for sq in range(64)],
+        }
+        targets[QUEEN] = [targets[BISHOP][sq] + targets[ROOK][sq] for sq in range(64)]
+        # Padded with 64, so every square has the same number of slots.
+        self.targets = {}
+        self.attacks = {}
+        for ptype, lists in targets.items():
+            width = max(len(squares) for squares in lists)
+            self.targets[ptype] = np.array([squares + [64] * (width - len(squares)) for squares in lists] + [[64] * width], dtype=np.int64)
+            attack = np.zeros((65, 65), dtype=bool)
+            for frm, squares in enumerate(lists):
+                attack[frm, squares] = True
+            self.attacks[WHITE, ptype] = self.attacks[BLACK, ptype] = attack
+        for color in (WHITE, BLACK):
+            attack = np.zeros((65, 65), dtype=bool)
+            for frm, bb in enumerate(batch.pawn_attacks(color, single)):
+                attack[frm, squares_of(bb)] = True
+            self.attacks[color, PAWN] = attack
+
+geometry = None
+
+def get_geometry():
+    global geometry
+    if geometry is None:
+        require_numpy()
+        geometry = Geometry()
+    return geometry
+
+def index_array(material, squares, turn, en_passant=False, mirrors=False):
+    """
+    Material.index for a (pieces, N) array of squares. With mirrors, followed
+    by the indices of the mirror images of those whose white king folds onto
+    the diagonal: there the fold can't tell a position from its mirror image,
+    so both are stored, and a move made backwards has to reach both.
+    """
+    g = get_geometry()
+    folded = g.transforms[g.fold[material.pawns][squares[0]], squares]
+    if mirrors and not material.pawns:
+        folded = np.concatenate((folded, g.transforms[4][folded[:, folded[0] % 8 == folded[0] // 8]]), axis=1)
+    index = (turn + 2 * en_passant) * len(material.king_squares) + g.king_slots[material.pawns][folded[0]]
+    for row in folded[1:]:
+        index = index * 64 + row
+    return index
+
+def occupancy(squares):
+    bits = get_geometry().bits
+    occupied = bits[squares[0]]
+    for row in squares[1:]:
+        occupied = occupied | bits[row]
+    return occupied
+
+def attacked(pieces, squares, color, target, occupied):
+    """Per position: does color attack the squares in target?"""
+    g = get_geometry()
+    hit = np.zeros(len(target), dtype=bool)
+    for (piece_color, ptype), row in zip(pieces, squares):
+        if piece_color == color:
+            hit |= g.attacks[color, ptype][row, target] & ((g.between[row, target] & occupied) == 0)
+    return hit
+
+def is_empty(squares, target):
+    empty = np.ones(len(target), dtype=bool)
+    for row in squares:
+        empty &= row != target
+    return empty
+
+def en_passant_open_array(pieces, squares, turn):
+    """en_passant_open for arrays, in tables with one pawn a side."""
+    pawn = squares[pieces.index((turn ^ 1, PAWN))]
+    capturer = squares[pieces.index((turn, PAWN))]
+    forward = -8 if turn == WHITE else 8
+    return ((pawn // 8 == (3 if turn == WHITE else 4)) & (capturer // 8 == pawn // 8) & (np.abs(capturer % 8 - pawn % 8) == 1)
+            & is_empty(squares, pawn + forward) & is_empty(squares, pawn + 2 * forward))
+
+class Generator:
+    """Builds one table, given the finished tables it captures and promotes into (name -> uint8 array)."""
+    CHUNK = 1 << 18
+
+    def __init__(self, material, tables):
+        self.material = material
+        self.tables = tables
+        self.geometry = get_geometry()
+        self.pieces = material.pieces
+        self.kings = (0, 1)
+
+    def decode(self, index):
+        """(pieces, N) squares of the positions at these indices, all in one block."""
+        material = self.material
+        rows = []
+        for _ in range(len(self.pieces) - 1):
+            rows.append(index % 64)
+            index = index // 64
+        rows.append(self.geometry.king_squares[material.pawns][index % len(material.king_squares)])
+        return np.array(rows[::-1])
+
+    def legal(self, squares, turn, en_passant):
+        """Distinct squares, no pawn on a back rank, the side not to move not in check, and en passant really open."""
+        legal = np.ones(squares.shape[1], dtype=bool)
+        for i in range(len(self.pieces)):
+            for j in range(i + 1, len(self.pieces)):
+                legal &= squares[i] != squares[j]
+        for (color, ptype), row in zip(self.pieces, squares):
+            if ptype == PAWN:
+                legal &= (row >= 8) & (row < 56)
+        legal &= ~attacked(self.pieces, squares, turn, squares[self.kings[turn ^ 1]], occupancy(squares))
+        if en_passant:
+            legal &= en_passant_open_array(self.pieces, squares, turn)
+        return legal
+
+    def probe_exits(self, pieces, squares, turn):
+        """Values of positions in another table: pieces lists what is on the rows of squares, turn is to move."""
+        material = Material(material_name(*([LETTERS[ptype] for color, ptype in pieces if color == side and ptype != KING]
+                                            for side in (WHITE, BLACK)))[0])
+        flipped, order = material.arrange(pieces)
+        squares = squares[order] ^ (56 if flipped else 0)
+        return self.tables[material.name][index_array(material, squares, turn ^ flipped)]
+
+    def exits(self, squares, turn, en_passant):
+        """
+        For each position, over its captures and promotions: the fewest plies to
+        a win, the most plies to a loss, and whether any of them draws.
+        """
+        count = squares.shape[1]
+        win = np.full(count, 255, dtype=np.int16)
+        loss = np.full(count, -1, dtype=np.int16)
+        draw = np.zeros(count, dtype=bool)
+
+        def leave(mask, mover, to, captured, promotion=None):
+            selected = np.nonzero(mask)[0]
+            if not len(selected):
+                return
+            pieces = list(self.pieces)
+            result = squares[:, selected].copy()
+            result[mover] = to[selected]
+            if promotion is not None:
+                pieces[mover] = (turn, promotion)
+            if captured is not None:
+                del pieces[captured]
+                result = np.delete(result, captured, axis=0)
+            values = self.probe_exits(pieces, result, turn ^ 1).astype(np.int16)
+            plies = values - 2
+            reached = values >= 2
+            # The opponent lost in plies: a win in plies + 1; the opponent won: a loss.
+            won = reached & (plies % 2 == 0)
+            lost = reached & (plies % 2 == 1)
+            win[selected[won]] = np.minimum(win[selected[won]], plies[won] + 1)
+            loss[selected[lost]] = np.maximum(loss[selected[lost]], plies[lost] + 1)
+            draw[selected[values == DRAW]] = True
+
+        occupied = occupancy(squares)
+        enemies = [j for j, (color, ptype) in enumerate(self.pieces) if color != turn and ptype != KING]
+        for i, (color, ptype) in enumerate(self.pieces):
+            if color != turn:
+                continue
+            frm = squares[i]
+            if ptype == PAWN:
+                forward = -8 if turn == WHITE else 8
+                last_rank = (lambda sq: sq < 8) if turn == WHITE else (lambda sq: sq >= 56)
+                to = frm + forward
+                push = last_rank(to) & is_empty(squares, to)
+                for promotion in PROMOTIONS:
+                    leave(push, i, to, None, promotion)
+                for j in enemies:
+                    capture = self.geometry.attacks[turn, PAWN][frm, squares[j]]
+                    promoting = last_rank(squares[j])
+                    leave(capture & ~promoting, i, squares[j], j)
+                    for promotion in PROMOTIONS:
+                        leave(capture & promoting, i, squares[j], j, promotion)
+                    if en_passant and self.pieces[j] == (turn ^ 1, PAWN):
+                        # The only pawn beside the enemy's is this one: take it en passant.
+                        leave(np.ones(count, dtype=bool), i, squares[j] + forward, j)
+                continue
+            targets = self.geometry.targets[ptype][frm]
+            for slot in range(targets.shape[1]):
+                to = targets[:, slot]
+                reachable = (to < 64) & ((self.geometry.between[frm, to] & occupied) == 0)
+                for j in enemies:
+                    leave(reachable & (squares[j] == to), i, to, j)
+        return win, loss, draw
+
+    def predecessors(self, squares, turn, en_passant):
+        """Indices of the legal positions one move before these (turn to move), by moves that stay in the table."""
+        material = self.material
+        mover = turn ^ 1
+        forward = -8 if mover == WHITE else 8
+        found = []
+
+        def unmove(mask, piece, origin):
+            selected = np.nonzero(mask)[0]
+            if not len(selected):
+                return
+            before = squares[:, selected].copy()
+            before[piece] = origin[selected]
+            # The side that moves next mustn't have been left in check.
+            before = before[:, ~attacked(self.pieces, before, mover, before[self.kings[turn]], occupancy(before))]
+            found.append(index_array(material, before, mover, mirrors=True))
+            if material.en_passant:
+                found.append(index_array(material, before[:, en_passant_open_array(self.pieces, before, mover)], mover, True))
+
+        if en_passant:
+            # The last move was the two-square push that opened the capture.
+            pawn = self.pieces.index((mover, PAWN))
+            unmove(np.ones(squares.shape[1], dtype=bool), pawn, squares[pawn] - 2 * forward)
+        else:
+            occupied = occupancy(squares)
+            bits, through = self.geometry.bits, self.geometry.through
+            for i, (color, ptype) in enumerate(self.pieces):
+                if color != mover:
+                    continue
+                to = squares[i]
+                if ptype == PAWN:
+                    origin = to - forward
+                    single = ((bits[origin] & occupied) == 0) & (origin >= 8) & (origin < 56)
+                    unmove(single, i, origin)
+                    double = single & (to // 8 == (4 if mover == WHITE else 3)) & ((bits[(to - 2 * forward) % 64] & occupied) == 0)
+                    if material.en_passant:
+                        # A push that gave turn an en passant capture led to the other block.
+                        double &= ~en_passant_open_array(self.pieces, squares, turn)
+                    unmove(double, i, to - 2 * forward)
+                    continue
+                origins = self.geometry.targets[ptype][to]
+                for slot in range(origins.shape[1]):
+                    origin = origins[:, slot]
+                    unmove((through[to, origin] & occupied) == 0, i, origin)
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def blocks(self, indices):
+        """Splits indices by block: yields (squares, turn, en passant, indices)."""
+        block_size = self.material.block_size
+        blocks = indices // block_size
+        for block in np.unique(blocks):
+            selected = indices[blocks == block]
+            for start in range(0, len(selected), self.CHUNK):
+                chunk = selected[start:start + self.CHUNK]
+                yield self.decode(chunk - block * block_size), int(block) % 2, block >= 2, chunk
+
+    def generate(self):
+        """The finished table as a uint8 array."""
+        material = self.material
+        size = material.size
+        legal = np.zeros(size, dtype=bool)
+        counts = np.zeros(size, dtype=np.int16)
+        # Plies to mate once decided, -1 before.
+        plies = np.full(size, -1, dtype=np.int16)
+        # Captures and promotions: best win, worst loss, and whether one draws (stalemates count as a draw too).
+        escape = np.zeros(size, dtype=bool)
+        exit_win = np.full(size, 255, dtype=np.int16)
+        loss_level = np.zeros(size, dtype=np.int16)
+        no_moves = np.zeros(size, dtype=bool)
+        in_check = np.zeros(size, dtype=bool)
+
+        for squares, turn, en_passant, index in self.blocks(np.arange(size, dtype=np.int64)):
+            ok = self.legal(squares, turn, en_passant)
+            index, squares = index[ok], squares[:, ok]
+            legal[index] = True
+            win, loss, draw = self.exits(squares, turn, en_passant)
+            exit_win[index] = win
+            loss_level[index] = np.maximum(loss, 0)
+            escape[index] = draw | (win < 255)
+            no_moves[index] = (win == 255) & (loss < 0) & ~draw
+            in_check[index] = attacked(self.pieces, squares, turn ^ 1, squares[self.kings[turn]], occupancy(squares))
+            before, times = np.unique(self.predecessors(squares, turn, en_passant), return_counts=True)
+            counts[before] += times.astype(np.int16)
+
+        # Stalemate: nothing to play and not in check.
+        stalemate = legal & no_moves & (counts == 0) & ~in_check
+        escape |= stalemate
+        pending = {}
+
+        def schedule(index, levels):
+            for level in np.unique(levels):
+                pending.setdefault(int(level), []).append(index[levels == level])
+
+        lost = np.nonzero(legal & (counts == 0) & ~escape)[0]
+        schedule(lost, loss_level[lost])
+        won = np.nonzero(legal & (exit_win < 255))[0]
+        schedule(won, exit_win[won])
+
+        level = 0
+        while pending:
+            scheduled = pending.pop(level, [])
+            if scheduled:
+                index = np.unique(np.concatenate(scheduled))
+                # Wins found from the last level's losses are already marked; anything else decided earlier is done.
+                index = index[(plies[index] == -1) | (plies[index] == level)]
+                plies[index] = level
+                if level % 2 == 0:
+                    # Lost in level: everything that can move here wins in level + 1.
+                    for squares, turn, en_passant, chunk in self.blocks(index):
+                        before = self.predecessors(squares, turn, en_passant)
+                        before = np.unique(before[plies[before] == -1])
+                        plies[before] = level + 1
+                        pending.setdefault(level + 1, []).append(before)
+                else:
+                    # Won in level: one more move of each position before it is used up.
+                    for squares, turn, en_passant, chunk in self.blocks(index):
+                        before, times = np.unique(self.predecessors(squares, turn, en_passant), return_counts=True)
+                        open_ = plies[before] == -1
+                        before, times = before[open_], times[open_]
+                        counts[before] -= times.astype(np.int16)
+                        loss_level[before] = np.maximum(loss_level[before], level + 1)
+                        done = before[(counts[before] == 0) & ~escape[before]]
+                        schedule(done, loss_level[done])
+            level += 1
+        if plies.max() > 253:
+            raise ValueError(f"{material.name}: a distance to mate of {plies.max()} plies doesn't fit the format")
+
+        values = np.where(plies >= 0, plies + 2, DRAW).astype(np.uint8)
+        values[~legal] = ILLEGAL
+        return values
+
+def depends_on(target, name):
+    """Whether building the table target needs the table name, or is it."""
+    if target == name:
+        return True
+    white, black = (side[1:] for side in target.split('v'))
+    smaller = set()
+    for side, letters in enumerate((white, black)):
+        for position, letter in enumerate(letters):
+            sides = [white, black]
+            sides[side] = letters[:position] + letters[position + 1:]
+            smaller.add(material_name(*sides)[0])
+            if letter == 'P':
+                for promotion in "QRBN":
+                    sides[side] = letters[:position] + promotion + letters[position + 1:]
+                    smaller.add(material_name(*sides)[0])
+    return any(depends_on(table, name) for table in smaller if table != target)
+
+def generate(directory, materials=None, max_pieces=MAX_PIECES, verbose=False):
+    """
+    Writes the tables for materials ('KRvK', ...), or every one up to
+    max_pieces if None, into directory, along with the tables they capture
+    and promote into. Tables already there are read, not rebuilt.
+    """
+    require_numpy()
+    os.makedirs(directory, exist_ok=True)
+    if materials:
+        targets = {material_name(*(side[1:] for side in name.upper().split('V')))[0] for name in materials}
+        names = [name for name in all_materials(max(len(name) - 1 for name in targets))
+                 if any(depends_on(target, name) for target in targets)]
+    else:
+        names = all_materials(max_pieces)
+    tables = {}
+    for name in names:
+        path = os.path.join(directory, name + EXTENSION)
+        if os.path.exists(path):
+            tables[name] = np.frombuffer(read_table(path, name)[1], dtype=np.uint8, offset=HEADER.size)
+            continue
+        start_time = time.perf_counter()
+        material = Material(name)
+        values = Generator(material, tables).generate()
+        write_table(path, material, values)
+        tables[name] = values
+        if verbose:
+            decided = values[values >= 2].astype(np.int16) - 2
+            wins = decided[decided % 2 == 1]
+            print(f"{name}: {material.size} positions, {len(wins)} won, longest win {int(wins.max()) if len(wins) else 0} plies "
+                  f"({time.perf_counter() - start_time:.1f}s)")
+    return tables
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or probe endgame tablebases.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("generate", help="build tables")
+    build.add_argument("directory")
+    build.add_argument("materials", nargs="*", help="tables to build, e.g. KRvK KQvKR (default: all)")
+    build.add_argument("--pieces", type=int, default=MAX_PIECES, help="build every table with up to this many pieces")
+    probe = commands.add_parser("probe", help="look a position up")
+    probe.add_argument("directory")
+    probe.add_argument("fen", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        if args.pieces > MAX_PIECES:
+            parser.error(f"tables go up to {MAX_PIECES} pieces")
+        generate(args.directory, args.materials, args.pieces, verbose=True)
+        return 0
+    tablebase = Tablebase(args.directory)
+    found = tablebase.probe_fen(' '.join(args.fen))
+    tablebase.close()
+    if found is None:
+        print("not in the tables")
+        return 1
+    result, plies = found
+    print("draw" if result == 0 else f"{'win' if result > 0 else 'loss'} in {plies} plies ({(plies + 1) // 2} moves)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
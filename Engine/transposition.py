@@ -0,0 +1,124 @@
+"""
+transposition.py
+A fixed-memory transposition table keyed by the Zobrist hash (board.hash).
+
+Entries are two 64-bit words in parallel array('Q') columns: the full key, and
+the packed data below. The table is allocated once from a budget in MB and
+never grows, so many engine processes can share a host predictably.
+
+data layout (low to high bits):
+    move        18   packed move, 0 if none (from | to << 6 | promotion << 12 | flags << 15)
+    depth        8
+    bound        2   EXACT, LOWER or UPPER; 0 marks an empty slot
+    generation   6   which search stored it, so old entries age out
+    score       30   stored with SCORE_OFFSET added
+"""
+from array import array
+
+EXACT, LOWER, UPPER = 1, 2, 3
+
+ALWAYS_REPLACE = "always"
+DEPTH_PREFERRED = "depth"
+TWO_TIER = "two_tier"
+REPLACEMENT_SCHEMES = (ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER)
+
+ENTRY_BYTES = 16
+SCORE_OFFSET = 1 << 29
+MOVE_MASK = (1 << 18) - 1
+
+def pack(move, depth, bound, generation, score):
+    return move | (depth << 18) | (bound << 26) | (generation << 28) | ((score + SCORE_OFFSET) << 34)
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, replacement=TWO_TIER):
+        if replacement not in REPLACEMENT_SCHEMES:
+            raise ValueError(f"Unknown replacement scheme: {replacement}")
+        self.replacement = replacement
+        # Two-tier buckets hold a depth-preferred slot followed by an always-replace slot.
+        self.bucket_size = 2 if replacement == TWO_TIER else 1
+        entries = max(self.bucket_size, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.buckets = entries // self.bucket_size
+        self.size = self.buckets * self.bucket_size
+        self.keys = array('Q', [0]) * self.size
+        self.data = array('Q', [0]) * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+        self.stores = 0
+
+    @property
+    def memory_bytes(self):
+        return (len(self.keys) + len(self.data)) * 8
+
+    def clear(self):
+        self.keys = array('Q', [0]) * self.size
+        self.data = array('Q', [0]) * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.overwrites = self.stores = 0
+
+    def new_search(self):
+        """Call once per search; entries from earlier searches become replaceable first."""
+        self.generation = (self.generation + 1) & 63
+
+    def probe(self, key):
+        """Returns (depth, score, bound, move) for key, or None."""
+        index = (key % self.buckets) * self.bucket_size
+        for slot in range(index, index + self.bucket_size):
+            data = self.data[slot]
+            if data and self.keys[slot] == key:
+                self.hits += 1
+                return (data >> 18) & 255, (data >> 34) - SCORE_OFFSET, (data >> 26) & 3, data & MOVE_MASK
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, move=0):
+        index = (key % self.buckets) * self.bucket_size
+        slot = index
+        if self.replacement == DEPTH_PREFERRED:
+            if not self.replaceable(slot, key, depth):
+                return False
+        elif self.replacement == TWO_TIER:
+            if self.keys[index + 1] == key and self.data[index + 1]:
+                slot = index + 1
+            elif not self.replaceable(index, key, depth):
+                slot = index + 1
+        # Keep the old best move if this result didn't find one.
+        if not move and self.keys[slot] == key:
+            move = self.data[slot] & MOVE_MASK
+        if self.data[slot] and self.keys[slot] != key:
+            self.overwrites += 1
+        self.keys[slot] = key
+        self.data[slot] = pack(move, min(depth, 255), bound, self.generation, score)
+        self.stores += 1
+        return True
+
+    def replaceable(self, slot, key, depth):
+        data = self.data[slot]
+        return (not data
+                or self.keys[slot] == key
+                or (data >> 28) & 63 != self.generation
+                or depth >= (data >> 18) & 255)
+
+    def hashfull(self):
+        """Permille of slots in use, sampled from the first 1000 like UCI's hashfull."""
+        sample = min(1000, self.size)
+        used = sum(1 for slot in range(sample) if self.data[slot])
+        return used * 1000 // sample
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size_mb": self.memory_bytes / (1024 * 1024),
+            "entries": self.size,
+            "replacement": self.replacement,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hashfull": self.hashfull(),
+        }
@@ -0,0 +1,240 @@
+"""
+uci.py
+Universal Chess Interface front end, so GUIs and tournament managers can
+drive the engine over stdin/stdout without pygame. Searches run on a
+background thread: the main thread keeps reading commands, so isready and
+stop are answered within milliseconds even mid-search, and an info line is
+sent after every finished iteration. With a book set, go answers from it
+straight away while the position is still in the book.
+
+Supported: uci, isready, ucinewgame, setoption name Hash value <mb>,
+setoption name BookFile value <polyglot .bin>, setoption name OwnBook value <true|false>,
+setoption name TablebasePath value <directory>,
+position [startpos | fen <fen>] [moves ...], go [depth N] [movetime MS]
+[wtime MS] [btime MS] [winc MS] [binc MS] [movestogo N] [nodes N] [infinite],
+stop, quit.
+
+python -m Engine.uci
+"""
+import os
+import sys
+import threading
+# pygame prints a banner to stdout on import, which a GUI would read as a command reply.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from Engine.backends import create_board
+from Engine.book import Book
+from Engine.constants import DEFAULT_CONFIG
+from Engine.fen_utils import move_to_uci, uci_to_move, validate_fen
+from Engine.search import Search, MAX_DEPTH
+from Engine.tablebase import Tablebase
+from Engine.transposition import TranspositionTable
+
+ENGINE_NAME = "Chess"
+ENGINE_AUTHOR = "noah-weis"
+DEFAULT_HASH_MB = 16
+# Kept back from the clock for the GUI's and the operating system's overhead.
+MOVE_OVERHEAD = 0.05
+
+def info_line(result, tt=None):
+    score = f"mate {result.mate_in}" if result.mate_in is not None else f"cp {result.score}"
+    pv = ' '.join(move_to_uci(*move) for move in result.pv)
+    hashfull = f" hashfull {tt.hashfull()}" if tt is not None else ""
+    return f"info depth {result.depth} score {score} nodes {result.nodes} nps {result.nps} time {int(result.elapsed * 1000)}{hashfull} pv {pv}"
+
+def parse_go(tokens):
+    """'go' arguments -> {name: int}, with 'infinite' as True; ValueError for a value that isn't a number."""
+    options = {}
+    index = 0
+    while index < len(tokens):
+        name = tokens[index]
+        if name == "infinite":
+            options["infinite"] = True
+            index += 1
+        elif name in ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo", "nodes") and index + 1 < len(tokens):
+            try:
+                options[name] = int(tokens[index + 1])
+            except ValueError:
+                raise ValueError(f"{name} needs a number, not {tokens[index + 1]!r}") from None
+            index += 2
+        else:
+            index += 1
+    return options
+
+def time_budget(options, turn):
+    """Seconds to spend on this move, or None to search until depth/nodes/stop."""
+    if "movetime" in options:
+        return max(0.001, options["movetime"] / 1000 - MOVE_OVERHEAD / 5)
+    remaining = options.get("wtime" if turn == "white" else "btime")
+    if remaining is None:
+        return None
+    increment = options.get("winc" if turn == "white" else "binc", 0)
+    moves_to_go = options.get("movestogo", 30)
+    budget = (remaining / max(moves_to_go, 1) + increment * 3 / 4) / 1000
+    # Never plan to use more than half the clock.
+    return max(0.001, min(budget, remaining / 2000) - MOVE_OVERHEAD)
+
+class UCIEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = create_board(DEFAULT_CONFIG)
+        self.tt = TranspositionTable(DEFAULT_HASH_MB)
+        self.book = None
+        self.own_book = True
+        self.tablebase = None
+        self.search = None
+        self.thread = None
+        # Set by stop/quit; an infinite search holds its bestmove until then, as UCI requires.
+        self.stop_requested = threading.Event()
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, stream=sys.stdin):
+        for line in stream:
+            if not self.handle(line):
+                break
+        self.stop()
+
+    def handle(self, line):
+        """Runs one command; returns False on quit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 1024")
+            self.send("option name OwnBook type check default true")
+            self.send("option name BookFile type string default <empty>")
+            self.send("option name TablebasePath type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.tt.clear()
+        elif command == "setoption":
+            self.set_option(args)
+        elif command == "position":
+            self.stop()
+            self.set_position(args)
+        elif command == "go":
+            self.stop()
+            # Bad input from the GUI is reported and ignored; it mustn't end the engine.
+            try:
+                options = parse_go(args)
+            except ValueError as error:
+                self.send(f"info string bad go: {error}")
+                return True
+            self.go(options)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            return False
+        else:
+            self.send(f"info string unknown command: {command}")
+        return True
+
+    def set_option(self, args):
+        if "name" not in args or "value" not in args:
+            return
+        name = ' '.join(args[args.index("name") + 1:args.index("value")])
+        value = ' '.join(args[args.index("value") + 1:])
+        if name.lower() == "hash":
+            try:
+                size = max(1, int(value))
+            except ValueError:
+                self.send(f"info string Hash needs a number, not {value!r}")
+                return
+            self.stop()
+            self.tt = TranspositionTable(size)
+        elif name.lower() == "ownbook":
+            self.own_book = value.lower() == "true"
+        elif name.lower() == "bookfile":
+            if self.book is not None:
+                self.book.close()
+                self.book = None
+            if value and value != "<empty>":
+                try:
+                    self.book = Book(value)
+                except (OSError, ValueError) as error:
+                    self.send(f"info string can't open book: {error}")
+        elif name.lower() == "tablebasepath":
+            self.stop()
+            if self.tablebase is not None:
+                self.tablebase.close()
+                self.tablebase = None
+            if value and value != "<empty>":
+                try:
+                    self.tablebase = Tablebase(value)
+                except OSError as error:
+                    self.send(f"info string can't open tablebases: {error}")
+
+    def set_position(self, args):
+        if not args:
+            return
+        if args[0] == "startpos":
+            fen, rest = DEFAULT_CONFIG, args[1:]
+        elif args[0] == "fen":
+            end = args.index("moves") if "moves" in args else len(args)
+            fen, rest = ' '.join(args[1:end]), args[end:]
+        else:
+            return
+        # A bad position is reported here and the previous one kept, rather than failing later in the search thread.
+        previous = self.board.generate_fen()
+        try:
+            validate_fen(fen)
+            self.board.setup_board(fen, assign=False)
+            for uci in rest[1:] if rest[:1] == ["moves"] else []:
+                start, end, promotion = uci_to_move(uci)
+                if (start, end, promotion) not in self.board.get_legal_moves(self.board.turn):
+                    raise ValueError(f"illegal move {uci}")
+                self.board.make_move(start, end, promotion)
+        except (ValueError, KeyError, IndexError) as error:
+            self.send(f"info string bad position: {error}")
+            self.board.setup_board(previous, assign=False)
+
+    def go(self, options):
+        if self.book is not None and self.own_book and not options.get("infinite"):
+            move = self.book.choose(self.board)
+            if move is not None:
+                self.send("info string book move")
+                self.send(f"bestmove {move_to_uci(*move)}")
+                return
+        self.stop_requested.clear()
+        self.search = Search(self.board, self.tt, self.tablebase)
+        self.thread = threading.Thread(target=self.think, args=(self.search, options), daemon=True)
+        self.thread.start()
+
+    def think(self, search, options):
+        """Worker thread: searches, streams info lines and finishes with bestmove."""
+        result = search.search(
+            max_depth=min(options.get("depth", MAX_DEPTH), MAX_DEPTH),
+            time_limit=None if options.get("infinite") else time_budget(options, self.board.turn),
+            node_limit=options.get("nodes"),
+            on_iteration=lambda result: self.send(info_line(result, self.tt)),
+        )
+        if options.get("infinite"):
+            self.stop_requested.wait()
+        self.send(f"bestmove {move_to_uci(*result.best_move) if result.best_move else '0000'}")
+
+    def stop(self):
+        """Stops any running search and waits for its bestmove to be sent."""
+        if self.thread is None:
+            return
+        self.stop_requested.set()
+        self.search.stop()
+        self.thread.join()
+        self.thread = None
+        self.search = None
+
+def main():
+    UCIEngine().run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
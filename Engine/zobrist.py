@@ -0,0 +1,50 @@
+"""
+zobrist.py
+Random 64-bit keys for Zobrist hashing. A position's hash is the XOR of the
+keys for every piece on its square, the side to move, the castling rights and
+the en passant file, so each change to the board is one or two XORs.
+The generator is seeded so every process agrees on the keys.
+"""
+import random
+
+COLORS = ("white", "black")
+TYPES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+
+_rng = random.Random(0x5EED)
+PIECE_KEYS = {(color, type): [_rng.getrandbits(64) for _ in range(64)] for color in COLORS for type in TYPES}
+# Black to move is hashed in; white to move is not.
+SIDE_KEY = _rng.getrandbits(64)
+# Indexed by the K=1, Q=2, k=4, q=8 castling bit set.
+CASTLING_KEYS = [_rng.getrandbits(64) for _ in range(16)]
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+
+def piece_key(piece, pos):
+    return PIECE_KEYS[(piece.color, piece.type)][pos[1] * 8 + pos[0]]
+
+def castling_rights(board):
+    """The Board's castling rights (derived from its king and rook moved flags) as a bit set."""
+    def can_castle(king, rook):
+        return king is not None and not king.moved and rook is not None and rook.status and not rook.moved
+
+    rights = 0
+    if can_castle(board.white_king, board.white_kingside_rook):
+        rights |= 1
+    if can_castle(board.white_king, board.white_queenside_rook):
+        rights |= 2
+    if can_castle(board.black_king, board.black_kingside_rook):
+        rights |= 4
+    if can_castle(board.black_king, board.black_queenside_rook):
+        rights |= 8
+    return rights
+
+def compute_hash(board):
+    """Full O(64) hash of a Board; make_move keeps board.hash equal to this incrementally."""
+    h = 0
+    for piece in board.pieces:
+        h ^= piece_key(piece, piece.pos)
+    if board.turn == "black":
+        h ^= SIDE_KEY
+    h ^= CASTLING_KEYS[castling_rights(board)]
+    if board.en_passant_square is not None:
+        h ^= EN_PASSANT_KEYS[board.en_passant_square[0]]
+    return h
@@ -1,63 +1,98 @@
-import pygame
-import os
-from Engine.board import Board
-
-pygame.init()
-clock = pygame.time.Clock()
-
-
-WINDOW_SIZE = (600, 600)
-screen = pygame.display.set_mode(WINDOW_SIZE)
-
-board = Board(WINDOW_SIZE[0], WINDOW_SIZE[1], "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq e5 0 1")
-
-def draw(display):
-	display.fill('white')
-	board.draw(display)
-	pygame.display.update()
-
-def checkmate(color):
-	# Dim the screen
-	dim_screen = pygame.Surface(WINDOW_SIZE)
-	dim_screen.set_alpha(128)
-	screen.blit(dim_screen, (0, 0))
-
-	# Display the message
-	font = pygame.font.Font(None, 36)
-	text = font.render(f"Checkmate. {color} Wins!", True, (255, 255, 255))
-	text_rect = text.get_rect(center=(WINDOW_SIZE[0] // 2, WINDOW_SIZE[1] // 2))
-	screen.blit(text, text_rect)
-	pygame.display.update()
-
-def end_game(winner):
-	draw(screen)
-	checkmate(winner)
-	pygame.time.wait(8000)
-	return False
-
-def main():
-	running = True
-	clock.tick(60)
-	pygame.display.set_caption(os.getcwd().split('/')[-1])
-	while running:
-		mx, my = pygame.mouse.get_pos()
-		for event in pygame.event.get():
-			# Quit the game if the user presses the close button
-			if event.type == pygame.QUIT:
-				running = False
-			elif event.type == pygame.MOUSEBUTTONDOWN: 
-       			# If the mouse is clicked
-				if event.button == 1:
-					winner = board.handle_click(mx, my)
-					if winner:
-						running = end_game(winner)
-			elif event.type == pygame.KEYDOWN:
-				if event.key == pygame.K_ESCAPE:
-					running = False
-				elif event.key == pygame.K_i:
-					board.developer_insight()
-		# Draw the board
-		draw(screen)
-
-if __name__ == "__main__":
+import pygame
+import os
+from Engine.board import Board
+from Engine import instrumentation
+from Engine.book import Book
+
+pygame.init()
+clock = pygame.time.Clock()
+
+
+WINDOW_SIZE = (600, 600)
+screen = pygame.display.set_mode(WINDOW_SIZE, pygame.RESIZABLE)
+
+board = Board(WINDOW_SIZE[0], WINDOW_SIZE[1], "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq e5 0 1")
+
+# CHESS_PROFILE=profile.json turns instrumentation on for the whole game and writes it out on exit.
+PROFILE_PATH = os.environ.get("CHESS_PROFILE")
+if PROFILE_PATH:
+	instrumentation.enable()
+
+# CHESS_BOOK=book.bin lets the engine play from a Polyglot opening book before it searches.
+BOOK_PATH = os.environ.get("CHESS_BOOK")
+book = Book(BOOK_PATH) if BOOK_PATH else None
+
+def draw(display):
+	# Only squares the board marked dirty are repainted and pushed to the screen.
+	if board.full_redraw:
+		display.fill('white')
+	dirty_rects = board.draw(display)
+	if dirty_rects:
+		pygame.display.update(dirty_rects)
+
+def checkmate(color):
+	# Dim the screen at its current size; the window may have been resized since startup.
+	width, height = screen.get_size()
+	dim_screen = pygame.Surface((width, height))
+	dim_screen.set_alpha(128)
+	screen.blit(dim_screen, (0, 0))
+
+	# Display the message
+	font = pygame.font.Font(None, 36)
+	text = font.render(f"Checkmate. {color} Wins!", True, (255, 255, 255))
+	text_rect = text.get_rect(center=(width // 2, height // 2))
+	screen.blit(text, text_rect)
+	pygame.display.update()
+
+def end_game(winner):
+	board.full_redraw = True
+	draw(screen)
+	checkmate(winner)
+	pygame.time.wait(8000)
+	return False
+
+def main():
+	running = True
+	pygame.display.set_caption(os.getcwd().split('/')[-1])
+	while running:
+		clock.tick(60)
+		mx, my = pygame.mouse.get_pos()
+		for event in pygame.event.get():
+			# Quit the game if the user presses the close button
+			if event.type == pygame.QUIT:
+				running = False
+			elif event.type == pygame.VIDEORESIZE:
+				# The board rebuilds its sprite atlas on the next draw.
+				board.resize(event.w, event.h)
+			elif event.type == pygame.MOUSEBUTTONDOWN: 
+       			# If the mouse is clicked
+				if event.button == 1:
+					winner = board.handle_click(mx, my)
+					if winner:
+						running = end_game(winner)
+			elif event.type == pygame.KEYDOWN:
+				if event.key == pygame.K_ESCAPE:
+					running = False
+				elif event.key == pygame.K_i:
+					board.developer_insight()
+				elif event.key == pygame.K_p:
+					# Toggle instrumentation; 'i' prints what it has collected.
+					if instrumentation.enabled:
+						instrumentation.disable()
+					else:
+						instrumentation.enable()
+					print(f"instrumentation {'on' if instrumentation.enabled else 'off'}")
+				elif event.key == pygame.K_u or event.key == pygame.K_BACKSPACE:
+					board.takeback()
+				elif event.key == pygame.K_e:
+					# Let the engine move for whoever's turn it is.
+					winner = board.engine_move(book=book)
+					if winner:
+						running = end_game(winner)
+		# Draw the board
+		draw(screen)
+	if PROFILE_PATH:
+		instrumentation.export_json(PROFILE_PATH)
+
+if __name__ == "__main__":
 	main()
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+This file tests the batch analysis CLI: FEN/EPD parsing, results coming back
+in input order from the worker pool, bad lines reported in place, and the
+optional search fields.
+"""
+
+from Engine.analyze import read_positions, analyze_stream, main
+import json
+import os
+import tempfile
+import unittest
+
+lines = [
+    "# perft positions\n",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1\n",
+    "\n",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - bm e2a6; id \"kiwipete\";\n",
+    "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3\n",
+    "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1\n",
+    "not a fen\n",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -\n",
+]
+
+class TestAnalyze(unittest.TestCase):
+    def test_read_positions(self):
+        positions = list(read_positions(lines))
+        self.assertEqual([number for number, _, _ in positions], [2, 4, 5, 6, 7, 8])
+        self.assertEqual(positions[1], (4, "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -", "kiwipete"))
+        self.assertEqual(positions[0][1], "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+
+    def test_results_in_input_order(self):
+        inline = list(analyze_stream(lines, workers=1))
+        pooled = list(analyze_stream(lines, workers=2, batch_size=1))
+        self.assertEqual(inline, pooled)
+        self.assertEqual([result["line"] for result in pooled], [2, 4, 5, 6, 7, 8])
+        self.assertEqual([result.get("legal_moves") for result in pooled], [20, 48, 0, 0, None, 14])
+        self.assertEqual(pooled[1]["id"], "kiwipete")
+
+    def test_status_and_errors(self):
+        start, kiwipete, mate, stalemate, bad, endgame = analyze_stream(lines, workers=1)
+        self.assertTrue(mate["check"] and mate["checkmate"])
+        self.assertFalse(mate["stalemate"])
+        self.assertTrue(stalemate["stalemate"])
+        self.assertFalse(stalemate["check"] or stalemate["checkmate"])
+        self.assertIn("error", bad)
+        self.assertNotIn("error", endgame)
+
+    def test_backends_agree(self):
+        board = list(analyze_stream(lines, workers=1, backend="board"))
+        bitboard = list(analyze_stream(lines, workers=1, backend="bitboard"))
+        self.assertEqual([result.get("error") is None for result in bitboard], [True, True, True, True, False, True])
+        self.assertEqual(bitboard, board)
+
+    def test_malformed_lines(self):
+        malformed = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN w KQkq - 0 1\n",
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1\n",
+            "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1\n",
+            "8/8/8/8/8/8/8/8 w - - 0 1\n",
+        ]
+        for backend in ("board", "bitboard"):
+            for result in analyze_stream(malformed, workers=1, backend=backend):
+                with self.subTest(backend=backend, fen=result["fen"]):
+                    self.assertTrue(result["error"].startswith("ValueError: "))
+                    self.assertNotIn("legal_moves", result)
+
+    def test_search(self):
+        result, = analyze_stream(["6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"], workers=1, depth=3)
+        self.assertEqual(result["search"]["bestmove"], "a1a8")
+        self.assertEqual(result["search"]["mate"], 1)
+
+    def test_main_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source, output = os.path.join(directory, "positions.epd"), os.path.join(directory, "results.jsonl")
+            with open(source, "w") as file:
+                file.writelines(lines)
+            self.assertEqual(main([source, "--output", output, "--workers", "1"]), 0)
+            with open(output) as file:
+                results = [json.loads(line) for line in file]
+        self.assertEqual(len(results), 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+This file tests NumPy batch move generation against the Board: on the move
+generation test positions and every position one move after them, the
+legal and pseudo-legal counts, check flags and attack maps must agree
+exactly with assign_moves.
+"""
+
+from Engine.backends import create_board
+from Engine.move_assignment import assign_moves, attacked_squares, occupancy
+from Engine.positions import MOVE_GENERATION_POSITIONS as test_positions
+import unittest
+
+try:
+    from Engine.batch import load_fens, count_moves
+    import numpy
+except ImportError:
+    numpy = None
+
+def board_counts(board):
+    """(legal, pseudo-legal, in check, attacked, attacks) for the side to move, from assign_moves."""
+    color = board.turn
+    enemy = "black" if color == "white" else "white"
+    assign_moves(board, color)
+    last_rank = 0 if color == "white" else 7
+    legal = pseudo = 0
+    for piece in board.get_allied_pieces(color):
+        # A promotion is four moves.
+        weight = lambda end: 4 if piece.type == "pawn" and end[1] == last_rank else 1
+        legal += sum(weight(end) for end in piece.legal_moves)
+        pseudo += sum(weight(end) for end in piece.psudo_legal_moves)
+    occupied = occupancy(board.pieces)
+    return legal, pseudo, board.in_check(color), attacked_squares(board, enemy, occupied), attacked_squares(board, color, occupied)
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatch(unittest.TestCase):
+    def test_agrees_with_assign_moves(self):
+        board = create_board()
+        fens = []
+        for position in test_positions:
+            board.setup_board(position["fen"])
+            fens.append(board.generate_fen())
+            for move in board.generate_moves():
+                board.push(move)
+                fens.append(board.generate_fen())
+                board.pop()
+        counts = count_moves(load_fens(fens))
+        self.assertEqual(len(counts), len(fens))
+        for index, fen in enumerate(fens):
+            board.setup_board(fen, assign=False)
+            found = (int(counts.legal_moves[index]), int(counts.pseudo_legal[index]), bool(counts.in_check[index]),
+                     int(counts.attacked[index]), int(counts.attacks[index]))
+            with self.subTest(fen=fen):
+                self.assertEqual(found, board_counts(board))
+
+    def test_depth_one_node_counts(self):
+        positions = [position for position in test_positions if position["depth"] == 1]
+        counts = count_moves(load_fens([position["fen"] for position in positions]))
+        self.assertEqual(counts.legal_moves.tolist(), [position["nodes"] for position in positions])
+
+    def test_double_check(self):
+        counts = count_moves(load_fens(["4k3/8/8/8/1b6/8/8/R3K2r w Q - 0 1"]))
+        self.assertEqual(counts.checkers.tolist(), [2])
+        self.assertEqual(counts.legal_moves.tolist(), [2])
+
+    def test_load_fens(self):
+        batch = load_fens(["4k3/8/8/8/8/8/8/4K2R w KQkq - 0 1", "4k3/8/8/8/8/8/8/4K3 b - e3"])
+        self.assertEqual(batch.castling.tolist(), [1, 0])
+        self.assertEqual(batch.turn.tolist(), [0, 1])
+        self.assertEqual(batch.en_passant.tolist(), [0, 1 << 44])
+        with self.assertRaises(ValueError):
+            load_fens(["4k3/8/8/8/8/8/8/4K2 w - - 0 1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+This file tests the benchmark suite: every benchmark produces a rate, and
+comparing against a baseline flags only slowdowns beyond the threshold.
+"""
+
+from Engine.benchmark import run_benchmarks, compare_results, main
+import json
+import os
+import tempfile
+import unittest
+
+class TestBenchmark(unittest.TestCase):
+    def test_quick_run(self):
+        results = run_benchmarks("board", repeat=1, quick=True, verbose=False)
+        self.assertEqual(set(results), {"setup_board", "assign_moves", "generate_moves", "generate_fen", "perft", "search"})
+        self.assertTrue(all(result["rate"] > 0 for result in results.values()))
+        self.assertNotIn("search", run_benchmarks("bitboard", repeat=1, quick=True, verbose=False))
+
+    def test_compare_results(self):
+        baseline = {"perft": {"rate": 1000.0}, "search": {"rate": 1000.0}, "removed": {"rate": 1.0}}
+        results = {"perft": {"rate": 850.0}, "search": {"rate": 950.0}, "added": {"rate": 1.0}}
+        self.assertEqual([name for name, *_ in compare_results(baseline, results, 0.10)], ["perft"])
+        self.assertEqual(compare_results(baseline, results, 0.20), [])
+
+    def test_main_flags_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(main(["--backend", "bitboard", "--quick", "--repeat", "1", "--save", path]), 0)
+            with open(path) as file:
+                baseline = json.load(file)
+            baseline["results"]["perft"]["rate"] *= 100
+            with open(path, "w") as file:
+                json.dump(baseline, file)
+            self.assertEqual(main(["--backend", "bitboard", "--quick", "--repeat", "1", "--baseline", path]), 1)
+
+if __name__ == "__main__":
+    unittest.main()
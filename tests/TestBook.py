@@ -0,0 +1,99 @@
+"""
+This file tests Polyglot opening books: keys against the values published
+with the format, lookups in a small book written here (binary search,
+castling moves, illegal and zero-weight entries skipped, weighted and best
+choice), and the book answering the UCI front end's go.
+"""
+
+import io
+import os
+import random
+import tempfile
+from Engine.backends import create_board
+from Engine.book import Book, ENTRY, polyglot_key
+from Engine.constants import DEFAULT_CONFIG
+from Engine.uci import UCIEngine
+import unittest
+
+# From the Polyglot book format description.
+KNOWN_KEYS = [
+    (DEFAULT_CONFIG, 0x463b96181691fc9c),
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", 0x823c9b50fd114196),
+    ("rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2", 0x0756b94461c50fb0),
+    ("rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 2", 0x662fafb965db29d4),
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", 0x22a48b5a8e47ff78),
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR b kq - 0 3", 0x652a607ca3f242c1),
+    ("rnbq1bnr/ppp1pkpp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR w - - 0 4", 0x00fdd303c946bdd9),
+    ("rnbqkbnr/p1pppppp/8/8/PpP4P/8/1P1PPPP1/RNBQKBNR b KQkq c3 0 3", 0x3c8123ea7b067637),
+    ("rnbqkbnr/p1pppppp/8/8/P6P/R1p5/1P1PPPP1/1NBQKBNR b Kkq - 0 4", 0x5c3f9b829b279560),
+]
+CASTLING_FEN = "4k3/8/8/8/8/8/8/4K2R w K - 0 1"
+
+def polyglot_move(uci):
+    """UCI -> the Polyglot move field (castling already written as king takes rook)."""
+    frm = (int(uci[1]) - 1) * 8 + 'abcdefgh'.index(uci[0])
+    to = (int(uci[3]) - 1) * 8 + 'abcdefgh'.index(uci[2])
+    return to | (frm << 6) | ('.nbrq'.index(uci[4]) << 12 if len(uci) > 4 else 0)
+
+def write_book(path, entries):
+    """entries: (fen, uci, weight); written sorted by key as Polyglot requires."""
+    rows = sorted((polyglot_key(fen), polyglot_move(uci), weight, 0) for fen, uci, weight in entries)
+    with open(path, "wb") as file:
+        for row in rows:
+            file.write(ENTRY.pack(*row))
+
+class TestBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+        entries = [(DEFAULT_CONFIG, "e2e4", 30), (DEFAULT_CONFIG, "d2d4", 10), (DEFAULT_CONFIG, "a2a3", 0),
+                   (DEFAULT_CONFIG, "e2e5", 50), (CASTLING_FEN, "e1h1", 1)]
+        # Other positions around them, so the lookup really has to search.
+        entries += [(fen, "a2a3", 1) for fen, _ in KNOWN_KEYS[1:]]
+        write_book(self.path, entries)
+        self.book = Book(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        self.directory.cleanup()
+
+    def test_known_keys(self):
+        for fen, key in KNOWN_KEYS:
+            with self.subTest(fen=fen):
+                self.assertEqual(polyglot_key(fen), key)
+
+    def test_entries(self):
+        self.assertEqual(len(self.book), 13)
+        self.assertEqual(sorted(entry.move for entry in self.book.entries(DEFAULT_CONFIG)), ["a2a3", "d2d4", "e2e4", "e2e5"])
+        self.assertEqual([entry.move for entry in self.book.entries(CASTLING_FEN)], ["e1g1"])
+        self.assertEqual(self.book.entries("4k3/8/8/8/8/8/8/4K3 w - - 0 1"), [])
+
+    def test_choose(self):
+        board = create_board(DEFAULT_CONFIG)
+        self.assertEqual(self.book.choose(board, best=True), ((4, 6), (4, 4), None))
+        # e2e5 is illegal and a2a3 has no weight, so only e4 and d4 ever come out, about 3:1.
+        rng = random.Random(1)
+        picks = [self.book.choose(board, rng=rng)[1] for _ in range(400)]
+        self.assertEqual(set(picks), {(4, 4), (3, 4)})
+        self.assertGreater(picks.count((4, 4)), 2 * picks.count((3, 4)))
+        self.assertEqual(self.book.choose(create_board(CASTLING_FEN)), ((4, 7), (6, 7), None))
+        self.assertIsNone(self.book.choose(create_board("4k3/8/8/8/8/8/8/4K3 w - - 0 1")))
+
+    def test_bad_file(self):
+        with open(self.path, "ab") as file:
+            file.write(b"\0")
+        with self.assertRaises(ValueError):
+            Book(self.path)
+
+    def test_uci_book_move(self):
+        output = io.StringIO()
+        engine = UCIEngine(output)
+        engine.handle(f"setoption name BookFile value {self.path}")
+        engine.handle("position startpos")
+        engine.handle("go movetime 1000")
+        self.assertIn(output.getvalue().splitlines()[-1], ("bestmove e2e4", "bestmove d2d4"))
+        self.assertIsNone(engine.thread)
+        engine.book.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+This file checks that the Board's incrementally updated material and
+piece-square sums always equal a full recount, and that the tapered
+evaluation is symmetric between the colors and blends by game phase.
+"""
+
+from Engine.backends import create_board
+from Engine.evaluation import evaluate, compute_scores, MAX_PHASE, EG_SCORES
+from Engine.mailbox import WHITE, BLACK, KING
+from Engine.positions import INCREMENTAL_POSITIONS as fens, walk
+import unittest
+
+def flip(fen):
+    """The same position with the colors swapped and the board mirrored rank-wise."""
+    placement, turn, castling, en_passant = fen.split()[:4]
+    placement = '/'.join(reversed(placement.split('/'))).swapcase()
+    castling = ''.join(sorted(castling.swapcase())) if castling != '-' else '-'
+    if en_passant != '-':
+        en_passant = en_passant[0] + str(9 - int(en_passant[1]))
+    return f"{placement} {'b' if turn == 'w' else 'w'} {castling} {en_passant} 0 1"
+
+class TestEvaluation(unittest.TestCase):
+    def test_incremental_matches_full_count(self):
+        for fen in fens:
+            board = create_board(fen, "board")
+            original = compute_scores(board)
+            scores = lambda b: (b.mg_score, b.eg_score, b.phase)
+            with self.subTest(fen=fen):
+                self.assertEqual(scores(board), original)
+                walk(board, 2, lambda b: self.assertEqual(scores(b), compute_scores(b), b.generate_fen()))
+                self.assertEqual(scores(board), original)
+
+    def test_symmetric(self):
+        board = create_board()
+        self.assertEqual(evaluate(board), 0)
+        self.assertEqual(board.phase, MAX_PHASE)
+        for fen in fens:
+            board.setup_board(fen, assign=False)
+            score = evaluate(board)
+            board.setup_board(flip(fen), assign=False)
+            with self.subTest(fen=fen):
+                self.assertEqual(evaluate(board), score)
+
+    def test_tapered(self):
+        # Bare kings: phase 0, so only the endgame tables count.
+        board = create_board("8/8/8/3k4/8/8/8/K7 w - - 0 1", "board")
+        self.assertEqual(board.phase, 0)
+        self.assertEqual(evaluate(board), EG_SCORES[WHITE | KING][56] + EG_SCORES[BLACK | KING][27])
+        # The score is the same either way round, from the side to move's point of view.
+        board.setup_board("8/8/8/3k4/8/8/8/KQ6 w - - 0 1", assign=False)
+        self.assertEqual(board.phase, 4)
+        white = evaluate(board)
+        self.assertGreater(white, 800)
+        board.setup_board("8/8/8/3k4/8/8/8/KQ6 b - - 0 1", assign=False)
+        self.assertEqual(evaluate(board), -white)
+
+if __name__ == "__main__":
+    unittest.main()
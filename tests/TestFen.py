@@ -0,0 +1,70 @@
+"""
+This file tests FEN loading and writing: round trips on both backends,
+EPD-style FENs without clocks, and reuse of pooled pieces across loads.
+"""
+
+from Engine.backends import create_board
+from Engine.zobrist import compute_hash
+from Engine.fen_utils import validate_fen
+import unittest
+
+fens = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R w KQ - 3 17",
+    "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+]
+
+class TestFen(unittest.TestCase):
+    def test_round_trip(self):
+        board = create_board()
+        for fen in fens:
+            board.setup_board(fen)
+            with self.subTest(fen=fen):
+                self.assertEqual(board.generate_fen(), fen)
+                self.assertEqual(board.hash, compute_hash(board))
+                self.assertEqual(create_board(fen, "bitboard").generate_fen(), fen)
+
+    def test_epd_fields(self):
+        for backend in ("board", "bitboard"):
+            board = create_board("4k3/8/8/8/8/8/8/4K2R w K -", backend)
+            with self.subTest(backend=backend):
+                self.assertEqual(board.generate_fen(), "4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+
+    def test_validate_fen(self):
+        for fen in fens + ["4k3/8/8/8/8/8/8/4K2R w K -"]:
+            validate_fen(fen)
+        for fen in ("8/8/8/8/8/8/8/8 w - - 0 1", "4k3/8/8/8/8/8/8/8 w - - 0 1", "4k3/8/8/8/8/8/8/3KK3 w - - 0 1",
+                    "4k3/8/8/8/8/8/8/4K3 x - - 0 1", "4k3/8/8/8/8/8/4K3 w - - 0 1", "4k3/9/8/8/8/8/8/4K3 w - - 0 1",
+                    "4k3/8/8/8/8/8/8/4K2X w - - 0 1", "4k3/8/8/8/8/8/8/4K3 w"):
+            with self.subTest(fen=fen), self.assertRaises(ValueError):
+                validate_fen(fen)
+
+    def test_pieces_are_reused(self):
+        def every_piece(board):
+            spares = [piece for pool in board.spare_pieces.values() for piece in pool]
+            history = [piece for record in board.moves for piece in (record.captured, record.piece)]
+            return {id(piece) for piece in board.pieces + spares + history if piece is not None}
+
+        board = create_board(fens[1])
+        board.setup_board(fens[3])
+        # A capturing promotion leaves the rook and the pawn only in the history.
+        board.make_move((1, 1), (0, 0), "knight")
+        known = every_piece(board)
+        for fen in fens + fens:
+            board.setup_board(fen)
+            with self.subTest(fen=fen):
+                self.assertEqual(every_piece(board), known)
+                for piece in board.pieces:
+                    self.assertIs(board.get_piece(piece.pos), piece)
+                self.assertEqual(board.generate_fen(), fen)
+
+    def test_bulk_load_without_moves(self):
+        board = create_board()
+        board.setup_board(fens[1], assign=False)
+        self.assertTrue(all(piece.legal_moves == [] for piece in board.pieces))
+        self.assertEqual(len(board.generate_moves()), 48)
+
+if __name__ == "__main__":
+    unittest.main()
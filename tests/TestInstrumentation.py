@@ -0,0 +1,62 @@
+"""
+This file tests the opt-in instrumentation: calls are counted and timed
+while it is enabled, results don't change, and disabling puts the original
+functions back.
+"""
+
+from Engine import instrumentation
+from Engine.backends import create_board
+from Engine.board import Board
+from Engine.pieces import Knight
+import Engine.move_assignment as move_assignment
+import json
+import os
+import tempfile
+import unittest
+
+kiwipete = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_counts_calls(self):
+        board = create_board(kiwipete)
+        instrumentation.enable()
+        self.assertEqual(board.perft(2), 2039)
+        board.make_move((4, 7), (6, 7))
+        board.setup_board(kiwipete)
+        stats = instrumentation.stats
+        self.assertEqual(stats["Board.push"].calls, 49)
+        self.assertEqual(stats["Board.pop"].calls, 48)
+        self.assertEqual(stats["Board.setup_board"].calls, 1)
+        self.assertGreaterEqual(stats["assign_moves"].calls, 2)
+        self.assertGreater(stats["Knight.get_moves"].calls, 0)
+        self.assertEqual(sum(stats["Board.push"].buckets), 49)
+        self.assertIn("Board.push", instrumentation.report())
+
+    def test_disable_restores_originals(self):
+        originals = (Board.push, Knight.get_moves, move_assignment.assign_moves)
+        instrumentation.enable()
+        self.assertIsNot(Board.push, originals[0])
+        instrumentation.disable()
+        self.assertEqual((Board.push, Knight.get_moves, move_assignment.assign_moves), originals)
+        board = create_board(kiwipete)
+        board.perft(1)
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_export_json(self):
+        instrumentation.enable()
+        create_board(kiwipete).perft(2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            instrumentation.export_json(path)
+            with open(path) as file:
+                data = json.load(file)
+        push = data["functions"]["Board.push"]
+        self.assertEqual(push["calls"], 48)
+        self.assertEqual(sum(push["histogram_us"].values()), 48)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ depth==1 (non-depth tests) and one for deeper tests.
 
 import Engine.board as Board
 import Engine.pieces
+from Engine.backends import create_board
+from Engine.positions import MOVE_GENERATION_POSITIONS as test_positions
 import unittest
 
 def draw_board(fen):
@@ -32,33 +34,6 @@ def draw_board(fen):
         board_with_borders += horizontal_border + '\n'
     return board_with_borders
 
-# Test positions for both groups
-test_positions = [
-    {"depth": 1, "nodes": 8, "fen": "r6r/1b2k1bq/8/8/7B/8/8/R3K2R b KQ - 3 2"},
-    {"depth": 1, "nodes": 8, "fen": "8/8/8/2k5/2pP4/8/B7/4K3 b - d3 0 3"},
-    {"depth": 1, "nodes": 19, "fen": "r1bqkbnr/pppppppp/n7/8/8/P7/1PPPPPPP/RNBQKBNR w KQkq - 2 2"},
-    {"depth": 1, "nodes": 5, "fen": "r3k2r/p1pp1pb1/bn2Qnp1/2qPN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQkq - 3 2"},
-    {"depth": 1, "nodes": 44, "fen": "2kr3r/p1ppqpb1/bn2Qnp1/3PN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQ - 3 2"},
-    {"depth": 1, "nodes": 39, "fen": "rnb2k1r/pp1Pbppp/2p5/q7/2B5/8/PPPQNnPP/RNB1K2R w KQ - 3 9"},
-    {"depth": 1, "nodes": 9, "fen": "2r5/3pk3/8/2P5/8/2K5/8/8 w - - 5 4"},
-    {"depth": 3, "nodes": 62379, "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8"},
-    {"depth": 3, "nodes": 89890, "fen": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"},
-    {"depth": 6, "nodes": 1134888, "fen": "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1"},
-    {"depth": 6, "nodes": 1015133, "fen": "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1"},
-    {"depth": 6, "nodes": 1440467, "fen": "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1"},
-    {"depth": 6, "nodes": 661072, "fen": "5k2/8/8/8/8/8/8/4K2R w K - 0 1"},
-    {"depth": 6, "nodes": 803711, "fen": "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1"},
-    {"depth": 4, "nodes": 1274206, "fen": "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1"},
-    {"depth": 4, "nodes": 1720476, "fen": "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1"},
-    {"depth": 6, "nodes": 3821001, "fen": "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1"},
-    {"depth": 5, "nodes": 1004658, "fen": "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1"},
-    {"depth": 6, "nodes": 217342, "fen": "4k3/1P6/8/8/8/8/K7/8 w - - 0 1"},
-    {"depth": 6, "nodes": 92683, "fen": "8/P1k5/K7/8/8/8/8/8 w - - 0 1"},
-    {"depth": 6, "nodes": 2217, "fen": "K1k5/8/P7/8/8/8/8/8 w - - 0 1"},
-    {"depth": 7, "nodes": 567584, "fen": "8/k1P5/8/1K6/8/8/8/8 w - - 0 1"},
-    {"depth": 4, "nodes": 23527, "fen": "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1"}
-]
-
 # Split tests into those with depth==1 and those with deeper searches.
 depth_one_tests = [pos for pos in test_positions if pos["depth"] == 1]
 deeper_tests = [pos for pos in test_positions if pos["depth"] != 1]
@@ -67,12 +42,12 @@ deeper_tests = [pos for pos in test_positions if pos["depth"] != 1]
 # Tests for positions with depth==1 (non-depth tests)
 ###############################################################################
 class TestMoveGenerationDepthOne(unittest.TestCase):
+    backend = "board"
+
     def _run_board_test(self, fen, expected_nodes):
-        board = Board.Board(600, 600, config=fen)
-        board.assign_moves(board.turn)
-        total_moves = sum(
-            len(piece.legal_moves) for piece in board.pieces if piece.color == board.turn
-        )
+        board = create_board(fen, self.backend)
+        # get_legal_moves runs assign_moves and counts each promotion choice separately.
+        total_moves = len(board.get_legal_moves(board.turn))
         error_msg = (
             f"Failed for board:\n{draw_board(fen)}\n"
             f"Expected {expected_nodes} moves, got {total_moves}"
@@ -110,11 +85,11 @@ class TestMoveGenerationDepthOne(unittest.TestCase):
 ###############################################################################
 # Tests for positions with depth > 1 (deeper tests)
 ###############################################################################
-@unittest.skip("Depth tests are not set up yet")
 class TestMoveGenerationDeeper(unittest.TestCase):
+    backend = "board"
+
     def _run_board_test(self, fen, expected_nodes, depth):
-        board = Board.Board(600, 600, config=fen)
-        # Assume board.perft(depth) returns the total node count at the given depth.
+        board = create_board(fen, self.backend)
         total_nodes = board.perft(depth)
         error_msg = (
             f"Failed for board:\n{draw_board(fen)}\n"
@@ -186,5 +161,72 @@ class TestMoveGenerationDeeper(unittest.TestCase):
         pos = deeper_tests[15]
         self._run_board_test(pos["fen"], pos["nodes"], pos["depth"])
 
+###############################################################################
+# The bitboard backend runs the same suites and must agree with Board
+###############################################################################
+class TestBitboardDepthOne(TestMoveGenerationDepthOne):
+    backend = "bitboard"
+
+class TestBitboardDeeper(TestMoveGenerationDeeper):
+    backend = "bitboard"
+
+class TestPinsAndChecks(unittest.TestCase):
+    def test_pinned_piece_stays_on_ray(self):
+        # The e2 rook is pinned by the e8 rook; the d2 bishop by the a5 bishop.
+        board = create_board("4r1k1/8/8/b7/8/8/3BR3/4K3 w - - 0 1")
+        board.assign_moves("white")
+        self.assertEqual(sorted(board.get_piece((4, 6)).legal_moves), [(4, y) for y in range(6)])
+        self.assertEqual(sorted(board.get_piece((3, 6)).legal_moves), [(0, 3), (1, 4), (2, 5)])
+
+    def test_double_check_only_king_moves(self):
+        board = create_board("4k3/8/8/8/1b6/8/3N4/r3K2R w K - 0 1")
+        board.assign_moves("white")
+        self.assertEqual(board.get_piece((3, 6)).legal_moves, [])
+        self.assertEqual(board.get_piece((7, 7)).legal_moves, [])
+        self.assertEqual(sorted(board.white_king.legal_moves), [(4, 6), (5, 6)])
+
+    def test_en_passant_discovered_check(self):
+        # Taking d3 would empty the fourth rank between the king and the rook.
+        board = create_board("8/8/8/8/k2pP2R/8/8/4K3 b - e3 0 1")
+        board.assign_moves("black")
+        self.assertNotIn((4, 5), board.get_piece((3, 4)).legal_moves)
+
+class TestBackendsAgree(unittest.TestCase):
+    def test_same_moves_and_state(self):
+        for pos in test_positions:
+            board = create_board(pos["fen"], "board")
+            bitboard = create_board(pos["fen"], "bitboard")
+            with self.subTest(fen=pos["fen"]):
+                board.assign_moves(board.turn)
+                board_moves = {piece.pos: sorted(piece.legal_moves) for piece in board.get_allied_pieces(board.turn) if piece.legal_moves}
+                bitboard_moves = {start: sorted(ends) for start, ends in bitboard.assign_moves(bitboard.turn).items()}
+                self.assertEqual(board_moves, bitboard_moves)
+                self.assertEqual(board.generate_fen(), bitboard.generate_fen())
+                self.assertEqual(board.in_check(board.turn), bitboard.in_check(bitboard.turn))
+                self.assertEqual(board.in_checkmate(board.turn), bitboard.in_checkmate(bitboard.turn))
+
+    def test_same_packed_moves(self):
+        # Flags included, so a move generated by one backend can be pushed on the other.
+        for pos in test_positions:
+            board = create_board(pos["fen"], "board")
+            bitboard = create_board(pos["fen"], "bitboard")
+            with self.subTest(fen=pos["fen"]):
+                moves = board.generate_moves()
+                self.assertEqual(sorted(moves), sorted(bitboard.generate_moves()))
+                for move in moves:
+                    board.push(move)
+                    bitboard.push(move)
+                    self.assertEqual(board.generate_fen(), bitboard.generate_fen())
+                    self.assertEqual(board.pop(), bitboard.pop())
+
+    def test_make_unmake_round_trip(self):
+        for pos in test_positions:
+            bitboard = create_board(pos["fen"], "bitboard")
+            with self.subTest(fen=pos["fen"]):
+                for start, end, promotion in bitboard.get_legal_moves(bitboard.turn):
+                    bitboard.make_move(start, end, promotion)
+                    bitboard.unmake_move()
+                    self.assertEqual(bitboard.generate_fen(), pos["fen"])
+
 if __name__ == "__main__":
     unittest.main()
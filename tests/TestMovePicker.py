@@ -0,0 +1,70 @@
+"""
+This file tests the staged move picker: it yields exactly the legal moves
+generate_moves finds, whatever hash move and killers it is handed, in stage
+order (hash move, captures by MVV-LVA, killers, quiet moves by history), and
+it only generates quiet moves once the captures run out.
+"""
+
+import random
+from Engine.backends import create_board
+from Engine.mailbox import MAILBOX, EMPTY
+from Engine.moves import EN_PASSANT
+from Engine.move_picker import pick_moves, is_quiet
+from Engine.positions import MOVE_GENERATION_POSITIONS as test_positions
+import unittest
+
+def is_capture(board, move):
+    return (move >> 12) & 7 == 4 or move >> 15 == EN_PASSANT or board.mailbox[MAILBOX[(move >> 6) & 63]] != EMPTY
+
+class TestMovePicker(unittest.TestCase):
+    def test_agrees_with_generate_moves(self):
+        board = create_board()
+        rng = random.Random(7)
+        for position in test_positions:
+            board.setup_board(position["fen"])
+            for _ in range(20):
+                legal = sorted(board.generate_moves())
+                if not legal:
+                    break
+                fen = board.generate_fen()
+                # Hash moves and killers from elsewhere may not be legal, or moves at all.
+                tt_move = rng.choice(legal + [rng.getrandbits(18)])
+                killers = [rng.getrandbits(18), rng.choice(legal)]
+                with self.subTest(fen=fen):
+                    self.assertEqual(sorted(pick_moves(board, tt_move, killers, [0] * 4096)), legal)
+                    self.assertEqual(sorted(pick_moves(board, captures_only=True)), [move for move in legal if is_capture(board, move)])
+                    self.assertEqual(board.generate_fen(), fen)
+                board.push(rng.choice(legal))
+
+    def test_stage_order(self):
+        board = create_board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        legal = list(board.generate_moves())
+        tt_move = board.encode_move((0, 6), (0, 5))
+        killer = board.encode_move((6, 6), (6, 5))
+        history = [0] * 4096
+        favourite = board.encode_move((1, 6), (1, 5))
+        history[favourite & 4095] = 100
+        moves = list(pick_moves(board, tt_move, [killer], history))
+        self.assertEqual(moves[0], tt_move)
+        captures = [move for move in moves[1:] if not is_quiet(board, move)]
+        self.assertEqual(moves[1:len(captures) + 1], captures)
+        # Bishop takes bishop before queen takes knight; the most valuable victims come first throughout.
+        self.assertEqual(captures[:2], [board.encode_move((4, 6), (0, 2)), board.encode_move((5, 5), (5, 2))])
+        victims = [board.piece_at[MAILBOX[(move >> 6) & 63]] for move in captures]
+        values = [victim.value if victim is not None else 1 for victim in victims]
+        self.assertEqual(values, sorted(values, reverse=True))
+        self.assertEqual(moves[len(captures) + 1:len(captures) + 3], [killer, favourite])
+        self.assertEqual(sorted(moves), sorted(legal))
+
+    def test_cutoff_skips_quiet_moves(self):
+        board = create_board()
+        board.setup_board("rnb1kbnr/pppp1ppp/8/4p1q1/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 1", assign=False)
+        picker = pick_moves(board)
+        self.assertEqual(next(picker), board.encode_move((2, 7), (6, 3)))
+        # Generating quiet moves is what fills in psudo_legal_moves.
+        self.assertFalse(any(piece.psudo_legal_moves for piece in board.pieces))
+        list(picker)
+        self.assertTrue(all(piece.psudo_legal_moves for piece in board.white_pieces if piece.type in ("knight", "queen")))
+
+if __name__ == "__main__":
+    unittest.main()
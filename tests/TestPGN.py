@@ -0,0 +1,85 @@
+"""
+This file tests the PGN reader and writer: streaming several games with
+comments, variations and NAGs, SAN to packed moves and back (castling,
+promotion, disambiguation, check and mate), replay against the legal move
+generator, and write_game round trips.
+"""
+
+import io
+from Engine.backends import create_board
+from Engine.pgn import read_games, replay, replay_stream, san_to_move, move_to_san, write_game
+import unittest
+
+GAMES = """[Event "Casual"]
+[White "Tom \\"Blitz\\" Jones"]
+[Black "Ann"]
+[Result "1-0"]
+
+1. e4 {best by test} e5 2. Bc4 $1 (2. Nf3 Nc6 (2... d6) 3. Bb5) 2... Nc6
+3. Qh5 Nf6?? ; overlooks the mate
+4. Qxf7# 1-0
+
+[Event "Second"]
+[SetUp "1"]
+[FEN "4k3/P7/8/8/8/8/8/4K2R w K - 0 1"]
+
+1. a8=Q+ Kd7 2. O-O *
+"""
+
+class TestPGN(unittest.TestCase):
+    def test_read_games(self):
+        first, second = read_games(io.StringIO(GAMES))
+        self.assertEqual(first.headers["White"], 'Tom "Blitz" Jones')
+        self.assertEqual(first.moves, ["e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6??", "Qxf7#"])
+        self.assertEqual(first.result, "1-0")
+        self.assertEqual(second.fen, "4k3/P7/8/8/8/8/8/4K2R w K - 0 1")
+        self.assertEqual(second.moves, ["a8=Q+", "Kd7", "O-O"])
+
+    def test_replay(self):
+        first, second = read_games(io.StringIO(GAMES))
+        self.assertEqual(replay(first).generate_fen(), "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4")
+        self.assertEqual(replay(second).generate_fen(), "Q7/3k4/8/8/8/8/8/5RK1 b - - 2 2")
+
+        illegal = next(read_games(io.StringIO("1. e4 e5 2. Ke3 *")))
+        with self.assertRaisesRegex(ValueError, r"Move 2\. Ke3"):
+            replay(illegal)
+
+    def test_san(self):
+        # Knights on b1 and f3 can both reach d2; rooks on a1 and a5 both reach a3.
+        board = create_board("4k3/8/8/R7/8/5N2/8/RN2K3 w - - 0 1")
+        for san in ("Nbd2", "Nfd2", "R1a3", "R5a3", "Rb5", "Ne5"):
+            move = san_to_move(board, san)
+            self.assertEqual(move_to_san(board, move), san)
+        with self.assertRaisesRegex(ValueError, "Ambiguous"):
+            san_to_move(board, "Nd2")
+        with self.assertRaisesRegex(ValueError, "Illegal"):
+            san_to_move(board, "Qd2")
+
+        board = create_board("4k3/1P6/8/8/8/8/8/R3K3 w Q - 0 1")
+        self.assertEqual(move_to_san(board, san_to_move(board, "b8=N")), "b8=N")
+        self.assertEqual(move_to_san(board, san_to_move(board, "O-O-O")), "O-O-O")
+        self.assertEqual(move_to_san(board, san_to_move(board, "Ra8+")), "Ra8+")
+
+    def test_write_game(self):
+        first, second = read_games(io.StringIO(GAMES))
+        board = replay(first)
+        fen = board.generate_fen()
+        text = write_game(board, first.headers)
+        self.assertEqual(board.generate_fen(), fen)
+        self.assertIn('[White "Tom \\"Blitz\\" Jones"]', text)
+        self.assertTrue(text.endswith("1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0\n"))
+
+        board = replay(second)
+        game = next(read_games(io.StringIO(write_game(board))))
+        self.assertEqual(game.headers["FEN"], "4k3/P7/8/8/8/8/8/4K2R w K - 0 1")
+        self.assertEqual(game.moves, ["a8=Q+", "Kd7", "O-O"])
+        self.assertEqual(replay(game).generate_fen(), board.generate_fen())
+
+    def test_replay_stream(self):
+        games = list(read_games(io.StringIO(GAMES * 5 + "1. e4 e5 2. Ke3 *\n")))
+        for workers in (1, 2):
+            results = [(played, error is None) for _, played, error in replay_stream(iter(games), workers, batch_size=3)]
+            self.assertEqual(results, [(7, True), (3, True)] * 5 + [(2, False)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+This file tests that perft split across a process pool gives the same divide
+table as the serial perft, and that EPD perft suites are read and checked.
+"""
+
+import os
+import tempfile
+from Engine.backends import create_board
+from Engine.parallel_perft import parallel_perft, parallel_perft_divide, run_epd_suite
+import unittest
+
+class TestParallelPerft(unittest.TestCase):
+    def test_divide_matches_serial(self):
+        fen = "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1"
+        serial = create_board(fen, "bitboard").perft_divide(3, verbose=False)
+        for split_depth in (1, 2):
+            with self.subTest(split_depth=split_depth):
+                self.assertEqual(parallel_perft_divide(fen, 3, workers=2, split_depth=split_depth, backend="bitboard"), serial)
+
+    def test_board_backend(self):
+        self.assertEqual(parallel_perft("8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", 3, workers=2, backend="board"), 1928)
+
+    def test_shallow_depths(self):
+        fen = "4k3/8/8/8/8/8/8/4K2R w K - 0 1"
+        for backend in ("board", "bitboard"):
+            board = create_board(fen, backend)
+            with self.subTest(backend=backend):
+                self.assertEqual(board.perft(0), 1)
+                self.assertEqual(sum(board.perft_divide(1, verbose=False).values()), 15)
+                for depth in (0, -1):
+                    with self.assertRaises(ValueError):
+                        board.perft_divide(depth, verbose=False)
+                    with self.assertRaises(ValueError):
+                        parallel_perft_divide(fen, depth, workers=1, backend=backend)
+        self.assertEqual(parallel_perft(fen, 0, workers=1), 1)
+
+    def test_epd_suite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "suite.epd")
+            with open(path, "w") as epd:
+                epd.write("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - ;D1 20 ;D2 400 ;D3 8902\n")
+                epd.write("4k3/8/8/8/8/8/8/4K2R w K - 0 1 ;D1 15 ;D2 66\n")
+            self.assertEqual(run_epd_suite(path, max_depth=2, workers=2, backend="bitboard"), [])
+
+if __name__ == "__main__":
+    unittest.main()
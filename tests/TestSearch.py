@@ -0,0 +1,56 @@
+"""
+This file tests the alpha-beta search: it finds mates and wins material,
+stops on its node and time budgets, and leaves the board as it found it.
+"""
+
+import time
+from Engine.backends import create_board
+from Engine.search import Search, MATE_SCORE
+import unittest
+
+class TestSearch(unittest.TestCase):
+    def test_mate_in_one(self):
+        board = create_board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        result = Search(board).search(max_depth=3)
+        self.assertEqual(result.best_move, ((0, 7), (0, 0), None))
+        self.assertEqual(result.score, MATE_SCORE - 1)
+        self.assertEqual(result.mate_in, 1)
+
+    def test_wins_hanging_queen(self):
+        board = create_board("rnb1kbnr/pppp1ppp/8/4p1q1/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 1")
+        result = Search(board).search(max_depth=2)
+        self.assertEqual(result.best_move, ((2, 7), (6, 3), None))
+        self.assertGreaterEqual(result.score, 800)
+
+    def test_pv_is_playable(self):
+        board = create_board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        result = Search(board).search(max_depth=2)
+        self.assertEqual(result.pv[0], result.best_move)
+        for move in result.pv:
+            self.assertIn(move, board.get_legal_moves(board.turn))
+            board.make_move(*move)
+
+    def test_node_budget(self):
+        board = create_board()
+        result = Search(board).search(node_limit=2000)
+        self.assertIsNotNone(result.best_move)
+        self.assertLess(result.nodes, 2000 + 128)
+        self.assertGreaterEqual(result.depth, 1)
+
+    def test_time_budget(self):
+        board = create_board()
+        start = time.perf_counter()
+        result = Search(board).search(time_limit=0.5)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(result.best_move, board.get_legal_moves(board.turn))
+
+    def test_board_restored(self):
+        board = create_board("8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1")
+        fen, hash = board.generate_fen(), board.hash
+        Search(board).search(max_depth=3)
+        self.assertEqual(board.generate_fen(), fen)
+        self.assertEqual(board.hash, hash)
+        self.assertEqual(len(board.moves), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+This file tests the multi-game server: the line protocol on a local
+instance, engine moves from the process pool, games private to their
+connection, latency stats, and a small run of the load-test client.
+"""
+
+import asyncio
+import json
+from Engine.server import GameServer
+from Engine.loadtest import run_load_test
+import unittest
+
+async def request(reader, writer, line):
+    writer.write((line + "\n").encode())
+    await writer.drain()
+    return (await reader.readline()).decode().strip()
+
+class TestServer(unittest.TestCase):
+    def run_with_server(self, test):
+        async def main():
+            server = GameServer(workers=1, movetime=20)
+            await server.start("127.0.0.1", 0)
+            try:
+                return await test(server)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_protocol(self):
+        async def test(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            reply = await request(reader, writer, "new 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+            game_id = reply.split()[1]
+            self.assertEqual(reply, f"ok {game_id} 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+            self.assertIn("a1a8", (await request(reader, writer, f"legal {game_id}")).split())
+            self.assertEqual(await request(reader, writer, f"move {game_id} a1b8"), "error illegal move a1b8")
+            self.assertEqual(await request(reader, writer, f"go {game_id}"), "ok a1a8 R5k1/5ppp/8/8/8/8/8/6K1 b - - 1 1 checkmate white")
+            self.assertEqual(await request(reader, writer, f"go {game_id}"), "error game is over")
+            stats = json.loads((await request(reader, writer, f"stats {game_id}"))[3:])
+            self.assertEqual(stats["moves"], 1)
+            self.assertEqual(stats["latency"]["go"]["calls"], 2)
+
+            # Another connection can't see this game.
+            other_reader, other_writer = await asyncio.open_connection("127.0.0.1", server.port)
+            self.assertEqual(await request(other_reader, other_writer, f"fen {game_id}"), "error no such game")
+            other_writer.close()
+
+            self.assertEqual(await request(reader, writer, "quit"), "ok")
+            self.assertEqual(await reader.readline(), b"")
+            writer.close()
+            await asyncio.sleep(0.05)
+            self.assertEqual(server.games, {})
+        self.run_with_server(test)
+
+    def test_bad_fen(self):
+        async def test(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            for fen in ("8/8/8/8/8/8/8/8 w - - 0 1", "4k3/8/8/8/8/8/8/8 w - - 0 1", "4k3/8/8/8/8/8/8/4K3 x - - 0 1"):
+                with self.subTest(fen=fen):
+                    self.assertTrue((await request(reader, writer, f"new {fen}")).startswith("error "))
+            # The connection is still served.
+            self.assertTrue((await request(reader, writer, "new")).startswith("ok "))
+            for verb in ("frobnicate", "xyzzy"):
+                self.assertEqual(await request(reader, writer, verb), f"error unknown command {verb}")
+            self.assertEqual(set(server.latency), {"new"})
+            writer.close()
+        self.run_with_server(test)
+
+    def test_load_test_client(self):
+        async def test(server):
+            return await run_load_test("127.0.0.1", server.port, games=6, concurrency=3, plies=4, movetime=5)
+        report = self.run_with_server(test)
+        self.assertEqual(report["plies"], 24)
+        self.assertEqual(report["latency"]["go"]["calls"], 12)
+        self.assertEqual(report["latency"]["new"]["calls"], 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+This file tests the endgame tablebases on the tables up to three pieces:
+the longest mates against the known ones, probes of flipped and unprobeable
+positions, every probed value against the best of its children on the Board
+move generator, and the search playing from the tables.
+
+KPvKP, with en passant and the four-piece tables it captures and promotes
+into, takes minutes to build, so it is only tested with
+CHESS_TABLEBASES=DIR set; tables already in DIR are read, not rebuilt.
+"""
+
+import os
+import random
+import tempfile
+from Engine.backends import create_board
+from Engine.search import Search
+import unittest
+
+try:
+    from Engine.tablebase import Tablebase, Material, Generator, generate, ILLEGAL, LETTERS, WHITE, PAWN
+    import numpy
+except ImportError:
+    numpy = None
+
+def expected(board, tablebase):
+    """(result, plies) from the best move, with the children probed."""
+    moves = board.generate_moves()
+    if not moves:
+        return (-1, 0) if board.in_check(board.turn) else (0, 0)
+    best = None
+    for move in moves:
+        board.push(move)
+        result, plies = tablebase.probe(board)
+        board.pop()
+        found = (-result, plies + 1) if result else (0, 0)
+        # Win soonest, lose latest.
+        rank = (found[0], -found[0] * found[1])
+        if best is None or rank > best[0]:
+            best = rank, found
+    return best[1]
+
+def random_fens(name, values, count, rng, blocks=None):
+    """count legal positions from the table, drawn from the given range of its blocks (all of them if None)."""
+    material = Material(name)
+    generator = Generator(material, {})
+    blocks = blocks or range(material.blocks)
+    fens = []
+    while len(fens) < count:
+        index = rng.randrange(blocks.start * material.block_size, blocks.stop * material.block_size)
+        if values[index] == ILLEGAL:
+            continue
+        block = index // material.block_size
+        turn = block % 2
+        squares = generator.decode(numpy.array([index - block * material.block_size]))[:, 0]
+        rows = [[''] * 8 for _ in range(8)]
+        for (color, ptype), sq in zip(material.pieces, squares):
+            rows[sq // 8][sq % 8] = LETTERS[ptype] if color == WHITE else LETTERS[ptype].lower()
+        placement = '/'.join(''.join(letter or '1' for letter in row) for row in rows)
+        en_passant = '-'
+        if block >= 2:
+            # The square the enemy pawn just passed over.
+            pawn = int(squares[material.pieces.index((turn ^ 1, PAWN))]) + (-8 if turn == WHITE else 8)
+            en_passant = "abcdefgh"[pawn % 8] + str(8 - pawn // 8)
+        board = create_board(f"{placement} {'wb'[turn]} - {en_passant} 0 1")
+        fens.append(board.generate_fen())
+    return fens
+
+# (fen, probed, probed with the en passant square taken out): capturing en passant wins or saves these.
+EN_PASSANT_CASES = (
+    ("K7/8/8/3k2Pp/8/8/8/8 w - h6 0 1", (1, 23), (-1, 32)),
+    ("8/8/8/8/6pP/8/k2K4/8 b - h3 0 1", (1, 23), (-1, 32)),
+    ("8/5k2/8/6pP/8/K7/8/8 w - g6 0 1", (0, 0), (-1, 30)),
+    # No pawn beside the one that moved, so the square changes nothing.
+    ("8/5k2/8/6p1/8/K7/7P/8 w - g6 0 1", (0, 0), (0, 0)),
+)
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.tables = generate(cls.directory.name, max_pieces=3)
+        cls.tablebase = Tablebase(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        cls.directory.cleanup()
+
+    def test_longest_mates(self):
+        # Mate in 10 moves with a queen, 16 with a rook, 28 with a pawn; none with a lone minor piece.
+        for name, plies in (("KQvK", 19), ("KRvK", 31), ("KPvK", 55), ("KBvK", None), ("KNvK", None)):
+            values = self.tables[name]
+            wins = values[(values >= 2) & (values % 2 == 1)]
+            self.assertEqual(int(wins.max()) - 2 if len(wins) else None, plies, name)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(name + ".tb" for name in self.tables))
+
+    def test_probe(self):
+        probe = self.tablebase.probe_fen
+        self.assertEqual(probe("4k3/1P6/8/8/8/8/K7/8 w - - 0 1"), (1, 17))
+        self.assertEqual(probe("K1k5/8/P7/8/8/8/8/8 w - - 0 1"), (0, 0))
+        # Colours the other way round are looked up flipped.
+        self.assertEqual(probe("8/k7/8/8/8/8/1p6/4K3 b - - 0 1"), (1, 17))
+        self.assertEqual(probe("R6k/8/6K1/8/8/8/8/8 b - - 0 1"), (-1, 0))
+        self.assertEqual(probe("7k/8/6QK/8/8/8/8/8 b - - 0 1"), (0, 0))
+        # Castling rights, too many pieces, or the side not to move in check: not in the tables.
+        self.assertIsNone(probe("4k3/8/8/8/8/8/8/4K2R w K - 0 1"))
+        self.assertIsNone(probe("4k3/8/8/8/8/8/8/R3K2R w - - 0 1"))
+        self.assertIsNone(probe("R3k3/8/8/8/8/8/8/4K3 w - - 0 1"))
+
+    def test_agrees_with_move_generator(self):
+        rng = random.Random(7)
+        board = create_board()
+        for name in ("KQvK", "KRvK", "KPvK", "KNvK"):
+            for fen in random_fens(name, self.tables[name], 60, rng):
+                board.setup_board(fen)
+                with self.subTest(fen=fen):
+                    self.assertEqual(self.tablebase.probe(board), expected(board, self.tablebase))
+
+    def test_search(self):
+        board = create_board("4k3/1P6/8/8/8/8/K7/8 w - - 0 1")
+        result = Search(board, tablebase=self.tablebase).search(time_limit=5)
+        self.assertEqual(result.depth, 1)
+        self.assertEqual(result.mate_in, 9)
+        self.assertEqual(result.best_move, ((1, 1), (1, 0), "queen"))
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+@unittest.skipUnless(os.environ.get("CHESS_TABLEBASES"), "set CHESS_TABLEBASES=DIR to build and test the four-piece tables")
+class TestFourPieces(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        directory = os.environ["CHESS_TABLEBASES"]
+        cls.tables = generate(directory, ["KPvKP"])
+        cls.tablebase = Tablebase(directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+
+    def test_agrees_with_move_generator(self):
+        rng = random.Random(7)
+        board = create_board()
+        values = self.tables["KPvKP"]
+        # The en passant blocks are drawn from on their own: few of their positions are legal.
+        for blocks in (range(2), range(2, 4)):
+            for fen in random_fens("KPvKP", values, 60, rng, blocks):
+                board.setup_board(fen)
+                with self.subTest(fen=fen):
+                    self.assertEqual(self.tablebase.probe(board), expected(board, self.tablebase))
+
+    def test_en_passant(self):
+        probe = self.tablebase.probe_fen
+        board = create_board()
+        for fen, with_capture, without in EN_PASSANT_CASES:
+            board.setup_board(fen)
+            with self.subTest(fen=fen):
+                self.assertEqual(probe(fen), with_capture)
+                self.assertEqual(probe(fen), expected(board, self.tablebase))
+                fields = fen.split()
+                fields[3] = '-'
+                self.assertEqual(probe(' '.join(fields)), without)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+This file tests the transposition table: packing round trips, the memory
+budget, each replacement scheme and the hit/miss/overwrite counters.
+"""
+
+from Engine.transposition import TranspositionTable, EXACT, LOWER, UPPER, ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER
+import unittest
+
+class TestTranspositionTable(unittest.TestCase):
+    def colliding_keys(self, table, count):
+        """Distinct keys that all map to bucket 0."""
+        return [table.buckets * (i + 1) for i in range(count)]
+
+    def test_round_trip(self):
+        table = TranspositionTable(1)
+        key = 0xDEADBEEFCAFEF00D
+        table.store(key, 7, -31000, UPPER, move=0x3FFFF)
+        self.assertEqual(table.probe(key), (7, -31000, UPPER, 0x3FFFF))
+        table.store(key, 8, 250, EXACT)
+        # A result without a best move keeps the one already stored.
+        self.assertEqual(table.probe(key), (8, 250, EXACT, 0x3FFFF))
+        self.assertIsNone(table.probe(key ^ 1))
+
+    def test_memory_budget(self):
+        for size_mb in (1, 4, 0.5):
+            for replacement in (ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER):
+                table = TranspositionTable(size_mb, replacement)
+                self.assertLessEqual(table.memory_bytes, size_mb * 1024 * 1024)
+                self.assertGreater(table.memory_bytes, size_mb * 1024 * 1024 * 0.99)
+
+    def test_always_replace(self):
+        table = TranspositionTable(1, ALWAYS_REPLACE)
+        deep, shallow = self.colliding_keys(table, 2)
+        table.store(deep, 10, 0, EXACT)
+        table.store(shallow, 1, 0, EXACT)
+        self.assertIsNone(table.probe(deep))
+        self.assertIsNotNone(table.probe(shallow))
+        self.assertEqual(table.overwrites, 1)
+
+    def test_depth_preferred(self):
+        table = TranspositionTable(1, DEPTH_PREFERRED)
+        deep, shallow, deeper = self.colliding_keys(table, 3)
+        table.store(deep, 10, 0, EXACT)
+        self.assertFalse(table.store(shallow, 1, 0, EXACT))
+        self.assertIsNotNone(table.probe(deep))
+        self.assertTrue(table.store(deeper, 12, 0, LOWER))
+        self.assertIsNone(table.probe(deep))
+        # Entries from an older search give way regardless of depth.
+        table.new_search()
+        self.assertTrue(table.store(shallow, 1, 0, EXACT))
+
+    def test_two_tier(self):
+        table = TranspositionTable(1, TWO_TIER)
+        deep, shallow, other = self.colliding_keys(table, 3)
+        table.store(deep, 10, 0, EXACT)
+        table.store(shallow, 1, 0, EXACT)
+        self.assertIsNotNone(table.probe(deep))
+        self.assertIsNotNone(table.probe(shallow))
+        table.store(other, 2, 0, EXACT)
+        self.assertIsNotNone(table.probe(deep))
+        self.assertIsNone(table.probe(shallow))
+        self.assertIsNotNone(table.probe(other))
+
+    def test_counters(self):
+        table = TranspositionTable(1)
+        table.store(1, 3, 0, EXACT)
+        table.probe(1)
+        table.probe(2)
+        stats = table.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        table.clear()
+        self.assertIsNone(table.probe(1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+This file tests the UCI front end: the handshake, position with moves,
+bestmove after go, and stop/isready answered while a search is running.
+"""
+
+import io
+import time
+from Engine.uci import UCIEngine, parse_go, time_budget
+import unittest
+
+class TestUCI(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.engine = UCIEngine(self.output)
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def lines(self):
+        return self.output.getvalue().splitlines()
+
+    def test_handshake(self):
+        self.engine.handle("uci")
+        self.engine.handle("isready")
+        self.assertIn("uciok", self.lines())
+        self.assertEqual(self.lines()[-1], "readyok")
+
+    def test_position_with_moves(self):
+        self.engine.handle("position startpos moves e2e4 e7e5 e1e2")
+        self.assertEqual(self.engine.board.generate_fen(), "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 1 2")
+        self.engine.handle("position fen 4k3/8/8/8/8/8/8/4K2R w K - 0 1 moves e1g1")
+        self.assertEqual(self.engine.board.generate_fen(), "4k3/8/8/8/8/8/8/5RK1 b - - 1 1")
+        self.engine.handle("position startpos moves e2e5")
+        self.assertTrue(self.lines()[-1].startswith("info string bad position"))
+        self.assertEqual(self.engine.board.generate_fen(), "4k3/8/8/8/8/8/8/5RK1 b - - 1 1")
+
+    def test_position_without_kings(self):
+        self.engine.handle("position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        for fen in ("8/8/8/8/8/8/8/8 w - - 0 1", "4k3/8/8/8/8/8/8/8 w - - 0 1"):
+            self.engine.handle(f"position fen {fen}")
+            self.assertTrue(self.lines()[-1].startswith("info string bad position"))
+        self.assertEqual(self.engine.board.generate_fen(), "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        self.engine.handle("go depth 1")
+        self.engine.thread.join(10)
+        self.assertEqual(self.lines()[-1], "bestmove a1a8")
+
+    def test_bad_numbers_are_ignored(self):
+        table = self.engine.tt
+        self.engine.handle("setoption name Hash value abc")
+        self.assertEqual(self.lines()[-1], "info string Hash needs a number, not 'abc'")
+        self.assertIs(self.engine.tt, table)
+        self.assertTrue(self.engine.handle("go depth x"))
+        self.assertEqual(self.lines()[-1], "info string bad go: depth needs a number, not 'x'")
+        self.assertIsNone(self.engine.thread)
+        self.engine.handle("isready")
+        self.assertEqual(self.lines()[-1], "readyok")
+
+    def test_go_depth(self):
+        self.engine.handle("position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        self.engine.handle("go depth 3")
+        self.engine.thread.join(10)
+        lines = self.lines()
+        self.assertTrue(any(line.startswith("info depth 1 ") for line in lines))
+        self.assertIn("score mate 1", lines[-2])
+        self.assertEqual(lines[-1], "bestmove a1a8")
+
+    def test_stop_and_isready_during_search(self):
+        self.engine.handle("position startpos")
+        self.engine.handle("go infinite")
+        time.sleep(0.2)
+        start_time = time.perf_counter()
+        self.engine.handle("isready")
+        self.assertEqual(self.lines()[-1], "readyok")
+        self.engine.handle("stop")
+        self.assertLess(time.perf_counter() - start_time, 0.5)
+        self.assertTrue(self.lines()[-1].startswith("bestmove "))
+        self.assertEqual(self.engine.board.generate_fen(), "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+
+    def test_time_budget(self):
+        self.assertAlmostEqual(time_budget(parse_go(["movetime", "500"]), "white"), 0.49)
+        self.assertIsNone(time_budget(parse_go(["depth", "4"]), "white"))
+        budget = time_budget(parse_go(["wtime", "60000", "btime", "1000", "movestogo", "20"]), "white")
+        self.assertAlmostEqual(budget, 2.95)
+        self.assertLess(time_budget(parse_go(["wtime", "60000", "btime", "1000"]), "black"), 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+This file tests the undo stack: unmake_move, takeback and save/restore_state
+put back the exact position (pieces, castling, en passant, clocks, hash)
+without rebuilding the board, and setup_board doesn't leak old pieces.
+"""
+
+from Engine.backends import create_board
+from Engine.zobrist import castling_rights
+import unittest
+
+class TestUndo(unittest.TestCase):
+    def test_setup_board_does_not_leak(self):
+        board = create_board()
+        board.make_move((4, 6), (4, 4))
+        for _ in range(3):
+            board.setup_board("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+        self.assertEqual(len(board.pieces), 3)
+        self.assertEqual(len(board.white_pieces) + len(board.black_pieces), 3)
+        self.assertEqual(board.moves, [])
+
+    def test_restore_state_keeps_piece_objects(self):
+        board = create_board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        fen, hash, pieces = board.generate_fen(), board.hash, list(board.pieces)
+        state = board.save_state()
+        # Castling, two captures and a pawn push.
+        for start, end in [((4, 7), (6, 7)), ((0, 2), (4, 6)), ((2, 5), (4, 6)), ((1, 4), (1, 5))]:
+            board.make_move(start, end)
+        board.restore_state(state)
+        self.assertEqual(board.generate_fen(), fen)
+        self.assertEqual(board.hash, hash)
+        self.assertCountEqual([id(piece) for piece in board.pieces], [id(piece) for piece in pieces])
+        # The mailbox holds exactly the pieces in the piece lists, plus the untouched sentinels.
+        self.assertEqual(board.mailbox, create_board(fen).mailbox)
+        for piece in board.pieces:
+            self.assertIs(board.get_piece(piece.pos), piece)
+
+    def test_castling_rights_restored(self):
+        board = create_board("r3k2r/8/8/8/8/8/6b1/R3K2R b KQkq - 0 1")
+        # Bishop takes the h1 rook: white loses kingside castling.
+        board.make_move((6, 6), (7, 7))
+        self.assertEqual(board.castling, castling_rights(board))
+        self.assertEqual(board.castling & 1, 0)
+        board.make_move((4, 7), (3, 7))
+        self.assertEqual(board.castling, 12)
+        board.unmake_move()
+        board.unmake_move()
+        self.assertEqual(board.castling, 15)
+        self.assertEqual(board.generate_fen(), "r3k2r/8/8/8/8/8/6b1/R3K2R b KQkq - 0 1")
+
+    def test_takeback(self):
+        board = create_board("8/8/1k6/8/2p5/8/3P4/5K2 w - - 0 1")
+        self.assertFalse(board.takeback())
+        board.make_move((3, 6), (3, 4))
+        board.make_move((2, 4), (3, 5))
+        self.assertEqual(len(board.pieces), 3)
+        self.assertTrue(board.takeback())
+        self.assertEqual(board.generate_fen(), "8/8/1k6/8/2pP4/8/8/5K2 b - d3 0 1")
+        self.assertIn((3, 5), board.get_piece((2, 4)).legal_moves)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+This file checks that the incrementally updated Zobrist hash always equals a
+hash computed from scratch, on both backends, and that it identifies positions
+rather than move orders.
+"""
+
+from Engine.backends import create_board
+from Engine.zobrist import compute_hash
+from Engine.positions import INCREMENTAL_POSITIONS as fens, walk
+import unittest
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental_matches_full_hash(self):
+        for fen in fens:
+            board = create_board(fen, "board")
+            original = board.hash
+            with self.subTest(fen=fen):
+                walk(board, 2, lambda b: self.assertEqual(b.hash, compute_hash(b), b.generate_fen()))
+                self.assertEqual(board.hash, original)
+
+    def test_backends_agree(self):
+        for fen in fens:
+            board = create_board(fen, "board")
+            bitboard = create_board(fen, "bitboard")
+            self.assertEqual(board.hash, bitboard.hash)
+            for start, end, promotion in board.get_legal_moves(board.turn):
+                board.make_move(start, end, promotion)
+                bitboard.make_move(start, end, promotion)
+                with self.subTest(fen=board.generate_fen()):
+                    self.assertEqual(board.hash, bitboard.hash)
+                    self.assertEqual(bitboard.hash, bitboard.compute_hash())
+                board.unmake_move()
+                bitboard.unmake_move()
+
+    def test_transposition_has_same_hash(self):
+        first = create_board("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", "board")
+        second = create_board("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", "board")
+        for start, end in [((6, 7), (5, 5)), ((6, 0), (5, 2)), ((1, 7), (2, 5))]:
+            first.make_move(start, end)
+        for start, end in [((1, 7), (2, 5)), ((6, 0), (5, 2)), ((6, 7), (5, 5))]:
+            second.make_move(start, end)
+        self.assertEqual(first.hash, second.hash)
+        # Same pieces, other side to move.
+        first.make_move((5, 2), (6, 0))
+        self.assertNotEqual(first.hash, second.hash)
+
+if __name__ == "__main__":
+    unittest.main()